@@ -8,15 +8,24 @@ import pandas as pd
 import json
 import logging
 import os
+import uuid
 import graphviz
-from openai import OpenAI
-from src.books import load_books, get_hint_for_category, get_purchase_url, DataLoadingError
+from src.books import get_hint_for_category, get_purchase_url, DataLoadingError
+from src.catalog import get_catalog
+from src.client_registry import get_client_registry
 from src.exports import build_markdown_export, build_pdf_export
-from src.llm_client import LLMClientError, get_chat_completion, get_sequence_rationale
+from src.history import compact_history
+from src.intent_parser import get_intent_vocabulary, parse_intent
+from src.llm_client import LLMClientError, aget_chat_completion, aget_sequence_rationale, estimate_tokens, get_system_prompt, get_tools
+from src.llm_runtime import LLMCallCancelled, get_async_runner
+from src.orchestration import assemble_path_extras
+from src.rationale_cache import get_rationale_cache, get_rationale_store
 from src.path_editor import get_replacement_candidates, move_book, remove_book, replace_book
 from src.recommendations import execute_recommendation
 from src.roi import load_stats
-from src.utils import fetch_book_cover
+from src.tracing import configure_from_env as configure_tracing, span, start_trace
+from src.cover_cache import get_cover_cache
+from src.utils import fetch_book_covers
 
 
 logger = logging.getLogger(__name__)
@@ -45,7 +54,7 @@ with st.sidebar:
         books_placeholder = st.empty()
         
     def update_stats_display():
-        """Reloads stats and updates the sidebar placeholders."""
+        """Updates the sidebar placeholders; load_stats only touches disk when stats changed."""
         current_stats = load_stats()
         paths_placeholder.metric("Paths", f"{current_stats.get('paths_generated', 0)} linked")
         books_placeholder.metric("Books", f"{current_stats.get('books_recommended', 0)} recommended")
@@ -93,16 +102,35 @@ with st.sidebar:
         key="temperature_slider"
     )
 
-# Initialize OpenAI Client
-client = OpenAI(api_key=api_key)
+    connection_report = get_client_registry().report()
+    if connection_report["reuse_rate"] is not None:
+        st.caption(
+            f"OpenAI connections reused for {connection_report['reuse_rate']:.0%} "
+            f"of {connection_report['requests']:.0f} requests"
+        )
+
+# Initialize OpenAI Client; the registry keeps it, and its open connections,
+# across reruns and sessions.
+client = get_client_registry().get(api_key)
+# Chat and rationale refreshes run on the process-wide loop; a new message
+# from this session cancels whatever call it still has in flight.
+llm_runner = get_async_runner()
+# Tracing stays off unless HALCHEMY_TRACE_FILE or HALCHEMY_METRICS_PORT is set.
+configure_tracing()
 
 # --- State Management ---
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
+# The catalog is shared by every session in this server process; never mutate it.
+# The watcher applies edits to books.csv in the background; each run reads one snapshot.
 try:
-    if "books_df" not in st.session_state:
-        st.session_state.books_df = load_books()
+    catalog = get_catalog()
+    catalog_snapshot = catalog.current()
+    books_df = catalog_snapshot.books
+    catalog.start_watching()
 except DataLoadingError as e:
     st.error(f"🚨 System Error: {e}")
     st.info("Please ensure 'data/books.csv' exists and is correctly formatted.")
@@ -122,6 +150,18 @@ def update_current_path_books(books):
     st.session_state.current_path_data["books"] = books
     st.session_state.current_path_data["rationale_stale"] = True
 
+def get_path_covers(books):
+    """
+    Fetches covers for a path in one concurrent batch, reusing ones this
+    session already has. Only definitive results come back, so a lookup that
+    failed or timed out is tried again on the next render.
+    """
+    covers = st.session_state.setdefault("cover_urls", {})
+    missing = [book for book in books if (str(book["title"]), str(book["author"])) not in covers]
+    if missing:
+        covers.update(fetch_book_covers(missing, cache=get_cover_cache()))
+    return covers
+
 def render_roadmap(path):
     """Generates a Graphviz visualization of the learning path."""
     if path.empty:
@@ -161,17 +201,19 @@ def render_books(path, category):
     st.markdown("### 🎯 Your Custom Reading Path")
     
     # 1. Render Visual Roadmap
-    roadmap = render_roadmap(path)
+    with span("render_roadmap", books=len(path)):
+        roadmap = render_roadmap(path)
     if roadmap:
         with st.expander("🗺️ View Learning Map", expanded=True):
             st.graphviz_chart(roadmap)
     
+    covers = get_path_covers(path.to_dict('records'))
     for i, (idx, book) in enumerate(path.iterrows(), 1):
         with st.container(border=True):
             col0, col1, col2 = st.columns([1, 3, 1])
             
             with col0:
-                cover_url = fetch_book_cover(book['title'], book['author'])
+                cover_url = covers.get((str(book['title']), str(book['author'])))
                 if cover_url:
                     st.image(cover_url, use_container_width=True)
                 else:
@@ -204,7 +246,7 @@ def render_path_editor(data):
     """Renders manual controls for editing the current reading path."""
     books = data["books"]
     replacement_candidates = get_replacement_candidates(
-        st.session_state.books_df,
+        books_df,
         books,
         category=data["category"],
         subcategory=data.get("subcategory"),
@@ -261,12 +303,21 @@ def render_path_editor(data):
         st.warning("The rationale was generated before your edits.")
         if st.button("Refresh rationale"):
             with st.spinner("Refreshing rationale..."):
-                data["rationale"] = get_sequence_rationale(
-                    client,
-                    data.get("user_query", "this learning goal"),
-                    data["books"],
-                    model=st.session_state.model,
-                )
+                try:
+                    with span("get_sequence_rationale", model=st.session_state.model, refresh=True):
+                        data["rationale"] = llm_runner.run(
+                            aget_sequence_rationale(
+                                llm_runner.client(api_key),
+                                data.get("user_query", "this learning goal"),
+                                data["books"],
+                                model=st.session_state.model,
+                                cache=get_rationale_cache(),
+                                store=get_rationale_store(),
+                            ),
+                            session_id=st.session_state.session_id,
+                        )
+                except LLMCallCancelled:
+                    st.stop()
                 data["rationale_stale"] = False
                 st.session_state.current_path_data = data
                 st.rerun()
@@ -327,29 +378,45 @@ if prompt := st.chat_input("What do you want to learn?"):
 
     # 2. Call LLM
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
+        with st.spinner("Thinking..."), start_trace("chat_turn", session_id=st.session_state.session_id):
             try:
-                # Prepare messages for API (exclude tool_output artifacts if we were strictly adhering to history, 
-                # but for this simple loop, we send the full conversation state)
-                # We need to be careful about serializing the history correctly if we had previous tool calls.
-                # For MVP simplicity, we'll just send the text messages to keep context clear, 
-                # or we need to handle the full tool-call/tool-response lifecycle.
-                # Let's use a simplified history for the context window to avoid "invalid role" errors 
-                # if we don't strictly pair tool calls with tool outputs in the list.
-                
-                # Actually, let's just filter for text for the context to be safe, 
-                # unless we strictly manage the tool lifecycle.
-                
-                api_messages = [
-                    {"role": m["role"], "content": m["content"]} 
-                    for m in st.session_state.messages 
-                    if m.get("content") is not None
-                ]
-                
-                response_message = get_chat_completion(client, api_messages, model=st.session_state.model, temperature=st.session_state.temperature)
+                # Unambiguous requests ("beginner python, tactical, short") are
+                # parsed locally and skip the LLM round trip entirely.
+                with span("parse_intent"):
+                    intent = parse_intent(
+                        prompt, get_intent_vocabulary(books_df, catalog_snapshot.version)
+                    )
+                args = intent.args if intent.confident else None
+                response_message = None
+
+                if args is None:
+                    # Send only the text messages: tool calls and their outputs aren't
+                    # stored as pairs, and unpaired ones are rejected as invalid roles.
+                    api_messages = [
+                        {"role": m["role"], "content": m["content"]}
+                        for m in st.session_state.messages
+                        if m.get("content") is not None
+                    ]
+                    # Older turns are folded into a summary of the gathered slots so
+                    # the request stays bounded however long the session runs.
+                    api_messages = compact_history(
+                        api_messages,
+                        get_intent_vocabulary(books_df, catalog_snapshot.version),
+                        reserved_tokens=estimate_tokens(get_system_prompt()) + estimate_tokens(get_tools()),
+                    )
+
+                    with span("get_chat_completion", model=st.session_state.model):
+                        response_message = llm_runner.run(
+                            aget_chat_completion(
+                                llm_runner.client(api_key),
+                                api_messages,
+                                model=st.session_state.model,
+                                temperature=st.session_state.temperature,
+                            ),
+                            session_id=st.session_state.session_id,
+                        )
 
-                # 3. Handle Response
-                if response_message.tool_calls:
+                if response_message is not None and response_message.tool_calls:
                     # The LLM wants to run the search!
                     tool_call = response_message.tool_calls[0]
                     try:
@@ -362,9 +429,11 @@ if prompt := st.chat_input("What do you want to learn?"):
                             "content": "I couldn't read the model's search parameters. Please try rephrasing your request."
                         })
                         st.stop()
-                    
+
+                # 3. Handle Response
+                if args is not None:
                     # Execute Logic
-                    result = execute_recommendation(st.session_state.books_df, args)
+                    result = execute_recommendation(books_df, args, path_table=catalog_snapshot.path_table)
                     path = result.path
                     category = result.category
                     depth = result.depth
@@ -378,14 +447,23 @@ if prompt := st.chat_input("What do you want to learn?"):
                     # Generate Rationale
                     rationale_text = ""
                     if not path.empty:
-                        with st.spinner("Analyzing your path..."):
-                            rationale_text = get_sequence_rationale(
-                                client, 
-                                prompt, 
-                                path.to_dict('records'), 
-                                model=st.session_state.model
-                            )
-                            st.info(f"🤔 **Why this path?**\n\n{rationale_text}")
+                        rationale_box = st.empty()
+                        rationale_box.info("🤔 **Why this path?**\n\nAnalyzing your path...")
+                        # Covers are fetched while the rationale streams, so the
+                        # rerun below renders the path without further lookups.
+                        extras = assemble_path_extras(
+                            client,
+                            prompt,
+                            path.to_dict('records'),
+                            model=st.session_state.model,
+                            rationale_cache=get_rationale_cache(),
+                            rationale_store=get_rationale_store(),
+                            cover_cache=get_cover_cache(),
+                            on_rationale=lambda text: rationale_box.info(f"🤔 **Why this path?**\n\n{text}▌"),
+                        )
+                        rationale_text = extras.rationale
+                        rationale_box.info(f"🤔 **Why this path?**\n\n{rationale_text}")
+                        st.session_state.setdefault("cover_urls", {}).update(extras.covers)
 
                         # Save to session state for export
                         st.session_state.current_path_data = {
@@ -420,6 +498,9 @@ if prompt := st.chat_input("What do you want to learn?"):
                     st.markdown(content)
                     st.session_state.messages.append({"role": "assistant", "content": content})
             
+            except LLMCallCancelled:
+                # A newer message from this session is already being handled.
+                st.stop()
             except LLMClientError as e:
                 st.error(e.user_message)
                 st.session_state.messages.append({"role": "assistant", "content": e.user_message})
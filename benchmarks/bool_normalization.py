@@ -0,0 +1,70 @@
+"""
+Benchmarks boolean normalization of the level columns.
+
+Compares the per-cell _parse_bool/isinstance path that normalize_books and
+validate_books used to take with the vectorized parse_bool_column path.
+
+    python -m benchmarks.bool_normalization
+    python -m benchmarks.bool_normalization --rows 10000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.books import BOOL_COLS, _parse_bool, normalize_books, parse_bool_column
+
+
+TOKENS = ["True", "False", "TRUE", "false", "1", "0", "yes", "no", "Y", "n", ""]
+
+
+def make_level_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Builds a frame of CSV-style boolean tokens for the level columns."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        col: pd.Series(rng.choice(TOKENS, size=rows), dtype=object)
+        for col in BOOL_COLS
+    })
+
+
+def _per_cell(df: pd.DataFrame) -> None:
+    for col in BOOL_COLS:
+        parsed = df[col].map(_parse_bool)
+        parsed.map(lambda value: isinstance(value, bool)).all()
+
+
+def _vectorized(df: pd.DataFrame) -> None:
+    normalized = normalize_books(df)
+    for col in BOOL_COLS:
+        pd.api.types.is_bool_dtype(normalized[col])
+
+
+def _best_of(func, df: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}  {'per-cell (s)':>12}  {'vectorized (s)':>14}  {'speedup':>8}")
+    for rows in args.rows:
+        df = make_level_frame(rows)
+        for col in BOOL_COLS:
+            assert parse_bool_column(df[col]).tolist() == df[col].map(_parse_bool).tolist()
+
+        per_cell = _best_of(_per_cell, df, args.repeat)
+        vectorized = _best_of(_vectorized, df, args.repeat)
+        print(f"{rows:>10}  {per_cell:>12.4f}  {vectorized:>14.4f}  {per_cell / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
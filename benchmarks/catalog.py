@@ -0,0 +1,239 @@
+"""
+Benchmarks the catalog functions on synthetic catalogs of realistic shape.
+
+Synthetic catalogs follow the books.csv schema. Rows are resampled from
+data/books.csv, so the category, subcategory, style and level mixes match
+the curated library, and a long tail of extra subcategories grows with the
+catalog. For each size, filter_books, sequence_books,
+get_replacement_candidates and load_books are timed over a fixed query mix
+and reported as throughput and p50/p99 latency. Results are compared with a
+JSON baseline, and the run exits non-zero if any function regressed by more
+than the threshold.
+
+    python -m benchmarks.catalog                        # compare with the baseline
+    python -m benchmarks.catalog --sizes 1000 100000 --save-baseline
+    python -m benchmarks.catalog --threshold 0.5
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.books import LEVELS, STYLES, filter_books, get_book_index, load_books, sequence_books
+from src.metrics import Histogram
+from src.path_editor import get_replacement_candidates
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "data", "catalog_baseline.json")
+SIZES = [1_000, 100_000, 1_000_000]
+THRESHOLD = 0.25
+QUERIES = 50
+# Share of synthetic rows moved to a long-tail subcategory of their category.
+TAIL_FRACTION = 0.2
+# Latencies below this are dominated by timer noise and never count as regressions.
+NOISE_FLOOR_MS = 0.05
+
+Result = Dict[str, float]
+
+
+def make_catalog(rows: int, seed: int = 0, source: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Builds a books.csv-shaped catalog of `rows` books.
+
+    Each row copies the category, subcategory, difficulty, style, learning
+    type and level flags of a random curated book, so their joint
+    distribution matches the real library. TAIL_FRACTION of rows then move
+    to a Zipf-distributed long-tail subcategory whose count scales with
+    `rows`. Titles, authors, URLs and IDs are synthetic and unique.
+    """
+    source = load_books() if source is None else source
+    rng = np.random.default_rng(seed)
+    df = source.iloc[rng.integers(len(source), size=rows)].reset_index(drop=True)
+
+    ids = pd.Series(np.arange(1, rows + 1))
+    id_text = ids.astype(str)
+    tail = rng.random(rows) < TAIL_FRACTION
+    tail_rank = np.minimum(rng.zipf(1.5, size=rows), max(1, rows // 1000))
+    base_topic = df['subcategory'].fillna(df['category']).astype(str)
+    tail_topic = base_topic + "-" + pd.Series(tail_rank).astype(str)
+
+    df['id'] = ids
+    df['title'] = "Synthetic Book " + id_text
+    df['author'] = "Author " + pd.Series(rng.integers(1, max(2, rows // 3), size=rows)).astype(str)
+    df['subcategory'] = df['subcategory'].where(~tail, tail_topic)
+    df['short_description'] = "A synthetic book used for benchmarking."
+    df['store_url'] = "https://example.com/books/" + id_text
+    df['affiliate_url'] = df['store_url'] + "?tag=benchmark"
+    return df
+
+
+def sample_queries(df: pd.DataFrame, count: int = QUERIES, seed: int = 1) -> List[Dict[str, Optional[str]]]:
+    """Draws tool-call args the way users would hit the catalog: popular categories more often."""
+    rng = np.random.default_rng(seed)
+    rows = df.iloc[rng.integers(len(df), size=count)]
+    queries = []
+    for (_, book), use_subcategory in zip(rows.iterrows(), rng.random(count) < 0.5):
+        subcategory = book['subcategory'] if use_subcategory and pd.notna(book['subcategory']) else None
+        queries.append({
+            "category": book['category'],
+            "subcategory": subcategory,
+            "level": LEVELS[rng.integers(len(LEVELS))],
+            "style": [None, *STYLES][rng.integers(len(STYLES) + 1)],
+            "depth": "short" if rng.random() < 0.5 else "deep",
+        })
+    return queries
+
+
+def time_calls(calls: Sequence[Callable[[], Any]], repeat: int = 1) -> Result:
+    """Runs every call `repeat` times; returns throughput (calls/s) and p50/p99 latency in ms."""
+    histogram = Histogram(max_samples=len(calls) * repeat)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for call in calls:
+            call_started = time.perf_counter()
+            call()
+            histogram.observe(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    summary = histogram.summary()
+    return {
+        "calls": summary["count"],
+        "throughput": summary["count"] / elapsed,
+        "p50_ms": summary["p50"] * 1000,
+        "p99_ms": summary["p99"] * 1000,
+    }
+
+
+def run_size(rows: int, repeat: int = 4, seed: int = 0, source: Optional[pd.DataFrame] = None) -> Dict[str, Result]:
+    """Benchmarks every function on one synthetic catalog of `rows` books."""
+    df = make_catalog(rows, seed, source)
+    get_book_index(df)
+    queries = sample_queries(df)
+    filtered = [
+        filter_books(df, q["category"], q["subcategory"], q["level"], q["style"]) for q in queries
+    ]
+    paths = [sequence_books(frame, q["depth"]).to_dict('records') for frame, q in zip(filtered, queries)]
+
+    results = {
+        "filter_books": time_calls([
+            lambda q=q: filter_books(df, q["category"], q["subcategory"], q["level"], q["style"])
+            for q in queries
+        ], repeat),
+        "sequence_books": time_calls([
+            lambda frame=frame, q=q: sequence_books(frame, q["depth"])
+            for frame, q in zip(filtered, queries)
+        ], repeat),
+        "get_replacement_candidates": time_calls([
+            lambda q=q, path=path: get_replacement_candidates(
+                df, path, q["category"], q["subcategory"], q["level"], q["style"]
+            )
+            for q, path in zip(queries, paths)
+        ], repeat),
+    }
+
+    load_repeat = max(3, min(20, 300_000 // rows))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "books.csv")
+        df.to_csv(path, index=False)
+        results["load_books_uncached"] = time_calls([lambda: load_books(path, use_cache=False)], load_repeat)
+        load_books(path)  # compiles the cached copy
+        results["load_books"] = time_calls([lambda: load_books(path)], load_repeat)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, Result]],
+    baseline: Dict[str, Dict[str, Result]],
+    threshold: float = THRESHOLD,
+) -> List[str]:
+    """Lists every (size, function) whose latency or throughput is worse than the baseline by more than `threshold`."""
+    regressions = []
+    for size, functions in results.items():
+        for name, result in functions.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            for key in ("p50_ms", "p99_ms"):
+                if result[key] > NOISE_FLOOR_MS and result[key] > base[key] * (1 + threshold):
+                    regressions.append(f"{size} rows {name}: {key} {result[key]:.3f} vs {base[key]:.3f}")
+            if base["p50_ms"] > NOISE_FLOOR_MS and result["throughput"] * (1 + threshold) < base["throughput"]:
+                regressions.append(
+                    f"{size} rows {name}: throughput {result['throughput']:.1f}/s vs {base['throughput']:.1f}/s"
+                )
+    return regressions
+
+
+def load_baseline(path: str = BASELINE_FILE) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(results: Dict[str, Dict[str, Result]], path: str = BASELINE_FILE) -> None:
+    rounded = {
+        size: {name: {key: round(value, 4) for key, value in result.items()} for name, result in functions.items()}
+        for size, functions in results.items()
+    }
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "created": date.today().isoformat(), "results": rounded}, f, indent=2)
+        f.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=4, help="Passes over the query mix per function")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Allowed slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument("--save-baseline", action="store_true", help="Record this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    source = load_books()
+    results: Dict[str, Dict[str, Result]] = {}
+    print(f"{'rows':>9}  {'function':<28} {'calls/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for rows in args.sizes:
+        results[str(rows)] = run_size(rows, args.repeat, source=source)
+        for name, result in results[str(rows)].items():
+            print(
+                f"{rows:>9}  {name:<28} {result['throughput']:>10.1f} "
+                f"{result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f}"
+            )
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 0
+    if baseline.get("environment") != environment():
+        print(f"Note: baseline was recorded on {baseline.get('environment')}, this is {environment()}")
+    regressions = compare(results, baseline["results"], args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regressions past {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
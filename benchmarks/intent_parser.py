@@ -0,0 +1,112 @@
+"""
+Benchmarks the local intent parser against a labelled prompt corpus.
+
+Each corpus line holds a prompt and the query_library args it should map
+to, or null when the message should be left to the LLM. Reports how many
+prompts bypass the model, how many of those bypasses are correct, how
+many should have gone to the model, and per-message parse latency.
+
+    python -m benchmarks.intent_parser
+    python -m benchmarks.intent_parser --corpus my_prompts.jsonl --repeat 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from src.books import load_books
+from src.intent_parser import IntentVocabulary, parse_intent
+
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "data", "intent_corpus.jsonl")
+ARG_KEYS = ("category", "subcategory", "level", "style", "depth")
+
+
+def load_corpus(path: str = CORPUS_FILE) -> List[Dict[str, object]]:
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _same_args(actual: Dict[str, Optional[str]], expected: Dict[str, Optional[str]]) -> bool:
+    def norm(value):
+        return str(value).lower() if value else None
+
+    return all(norm(actual.get(key)) == norm(expected.get(key)) for key in ARG_KEYS)
+
+
+def evaluate(corpus: List[Dict[str, object]], vocab: IntentVocabulary) -> Dict[str, object]:
+    """Scores parse_intent on a corpus; `errors` lists every prompt handled wrongly."""
+    correct = wrong = false_bypass = missed = 0
+    errors = []
+    for case in corpus:
+        parsed = parse_intent(case["prompt"], vocab)
+        expected = case["expected"]
+        if not parsed.confident:
+            if expected is not None:
+                missed += 1
+            continue
+        if expected is None:
+            false_bypass += 1
+            errors.append({"prompt": case["prompt"], "got": parsed.args, "expected": None})
+        elif _same_args(parsed.args, expected):
+            correct += 1
+        else:
+            wrong += 1
+            errors.append({"prompt": case["prompt"], "got": parsed.args, "expected": expected})
+
+    bypassed = correct + wrong + false_bypass
+    return {
+        "prompts": len(corpus),
+        "bypassed": bypassed,
+        "bypass_precision": correct / bypassed if bypassed else 1.0,
+        "bypass_recall": correct / (correct + wrong + missed) if correct + wrong + missed else 1.0,
+        "wrong_args": wrong,
+        "false_bypass": false_bypass,
+        "missed": missed,
+        "errors": errors,
+    }
+
+
+def time_parses(corpus: List[Dict[str, object]], vocab: IntentVocabulary, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        for case in corpus:
+            start = time.perf_counter()
+            parse_intent(case["prompt"], vocab)
+            timings.append(time.perf_counter() - start)
+    return sorted(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=CORPUS_FILE)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    books = load_books()
+    start = time.perf_counter()
+    vocab = IntentVocabulary.from_books(books)
+    build = time.perf_counter() - start
+
+    report = evaluate(corpus, vocab)
+    timings = time_parses(corpus, vocab, args.repeat)
+
+    print(f"prompts:           {report['prompts']}")
+    print(f"bypassed LLM:      {report['bypassed']} ({report['bypassed'] / report['prompts']:.0%})")
+    print(f"bypass precision:  {report['bypass_precision']:.1%}")
+    print(f"bypass recall:     {report['bypass_recall']:.1%}")
+    print(f"wrong args:        {report['wrong_args']}")
+    print(f"false bypasses:    {report['false_bypass']}")
+    print(f"vocabulary build:  {build * 1000:.1f} ms")
+    print(f"parse p50 / p99:   {timings[len(timings) // 2] * 1e6:.0f} / "
+          f"{timings[int(len(timings) * 0.99)] * 1e6:.0f} us")
+    for error in report["errors"]:
+        print(f"  {error['prompt']!r}: got {error['got']}, expected {error['expected']}")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Generates rationales offline for every precomputed path.
+
+    python -m src.batch_rationales                          # all paths in data/books.paths.json
+    python -m src.batch_rationales --base-url http://127.0.0.1:8080/v1 --concurrency 16
+
+Results go to the rationale store, which the serving path reads before the
+per-query cache. Each rationale is committed as soon as it arrives, and
+paths already in the store are skipped, so an interrupted run resumes where
+it stopped.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from openai import AsyncOpenAI, OpenAIError
+
+from src.books import load_books
+from src.llm_client import (
+    MAX_RETRIES,
+    REQUESTS_PER_MINUTE,
+    TOKENS_PER_MINUTE,
+    RequestScheduler,
+    estimate_message_tokens,
+    rationale_messages,
+)
+from src.path_table import build_path_table, load_path_table
+from src.rationale_cache import (
+    RATIONALE_STORE_FILE,
+    STORE_MAX_ENTRIES,
+    STORE_TTL_SECONDS,
+    RationaleCache,
+    rationale_key,
+)
+from src.recommendations import QueryKey
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+QUERY_TEMPLATE = "I want a {depth} reading path on {topic} at the {level} level{style}."
+
+
+@dataclass(frozen=True)
+class RationaleJob:
+    """One path to explain, with the query shown to the model."""
+    query: str
+    books: Tuple[Dict[str, Any], ...]
+
+    def book_ids(self) -> List[object]:
+        return [b.get('id', f"{b['title']}|{b['author']}") for b in self.books]
+
+
+@dataclass
+class BatchReport:
+    total: int
+    skipped: int = 0
+    generated: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    failures: List[str] = field(default_factory=list)
+
+    @property
+    def completed(self) -> int:
+        return self.skipped + self.generated + self.failed
+
+    @property
+    def throughput(self) -> float:
+        """Generated rationales per second."""
+        return self.generated / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.completed}/{self.total} paths: {self.generated} generated, "
+            f"{self.skipped} already stored, {self.failed} failed "
+            f"in {self.elapsed:.1f}s ({self.throughput:.1f}/s)"
+        )
+
+
+def format_query(query: QueryKey, template: str = QUERY_TEMPLATE) -> str:
+    """Renders a normalized path-table query as a user request."""
+    category, subcategory, level, style, depth = query
+    topic = f"{subcategory} ({category})" if subcategory else (category or "any topic")
+    return template.format(
+        level=level,
+        depth=depth,
+        topic=topic,
+        style=f", {style} style" if style else "",
+    )
+
+
+def jobs_from_path_table(
+    paths: Dict[QueryKey, Tuple[object, ...]],
+    df: pd.DataFrame,
+    template: str = QUERY_TEMPLATE,
+) -> List[RationaleJob]:
+    """
+    Builds one job per distinct non-empty path.
+
+    Many queries share a path; the first query seen for it stands in for
+    the rest, since stored rationales are keyed by path alone.
+    """
+    by_id = df.drop_duplicates('id').set_index('id')[['title', 'author']]
+    jobs: Dict[Tuple[object, ...], RationaleJob] = {}
+    for query, ids in paths.items():
+        if not ids or ids in jobs:
+            continue
+        books = tuple(
+            {"id": book_id, "title": by_id.at[book_id, 'title'], "author": by_id.at[book_id, 'author']}
+            for book_id in ids
+            if book_id in by_id.index
+        )
+        if len(books) == len(ids):
+            jobs[ids] = RationaleJob(format_query(query, template), books)
+    return list(jobs.values())
+
+
+async def _complete(client: AsyncOpenAI, job: RationaleJob, model: str, scheduler: RequestScheduler) -> str:
+    messages = rationale_messages(job.query, list(job.books))
+    response = await scheduler.acall(
+        lambda: client.chat.completions.create(model=model, messages=messages, temperature=0.7),
+        estimated_tokens=estimate_message_tokens(messages),
+    )
+    return response.choices[0].message.content or ""
+
+
+async def generate_rationales(
+    client: AsyncOpenAI,
+    jobs: Sequence[RationaleJob],
+    store: RationaleCache,
+    model: str = "gpt-4o-mini",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    requests_per_minute: float = REQUESTS_PER_MINUTE,
+    tokens_per_minute: float = TOKENS_PER_MINUTE,
+    max_retries: int = MAX_RETRIES,
+    on_progress: Optional[Callable[[BatchReport], None]] = None,
+    rng: Callable[[], float] = random.random,
+    scheduler: Optional[RequestScheduler] = None,
+) -> BatchReport:
+    """
+    Generates and stores a rationale for every job not yet in `store`.
+
+    Requests go through a RequestScheduler built for the batch limits (or
+    `scheduler`, if given), so at most `concurrency` are in flight, the
+    request and token rates are respected, and retryable OpenAI errors are
+    retried with jittered backoff. A job that still fails is counted and
+    left out of the store so the next run tries it again.
+    `on_progress` is called after each job with the running report.
+    """
+    report = BatchReport(total=len(jobs))
+    started = time.perf_counter()
+    if scheduler is None:
+        scheduler = RequestScheduler(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            max_concurrency=max(1, concurrency),
+            max_retries=max_retries,
+            rng=rng,
+        )
+    queue: "asyncio.Queue[Tuple[str, RationaleJob]]" = asyncio.Queue()
+
+    def progress() -> None:
+        report.elapsed = time.perf_counter() - started
+        if on_progress is not None:
+            on_progress(report)
+
+    for job in jobs:
+        key = rationale_key(job.query, job.book_ids(), model, path_only=True)
+        if await asyncio.to_thread(store.get, key) is not None:
+            report.skipped += 1
+        else:
+            queue.put_nowait((key, job))
+    if report.skipped:
+        progress()
+
+    async def worker() -> None:
+        while True:
+            try:
+                key, job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                rationale = await _complete(client, job, model, scheduler)
+                if not rationale:
+                    raise ValueError("empty completion")
+                await asyncio.to_thread(store.put, key, rationale)
+                report.generated += 1
+            except (OpenAIError, ValueError) as exc:
+                logger.warning("Rationale for %r failed: %s", job.query, exc)
+                report.failed += 1
+                report.failures.append(job.query)
+            progress()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute rationales for every stored path.")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests-per-minute", type=float, default=REQUESTS_PER_MINUTE)
+    parser.add_argument("--tokens-per-minute", type=float, default=TOKENS_PER_MINUTE)
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible endpoint, e.g. a local server")
+    parser.add_argument("--store", default=RATIONALE_STORE_FILE)
+    parser.add_argument("--limit", type=int, default=None, help="Only process the first N paths")
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key and args.base_url is None:
+        print("OPENAI_API_KEY is not set")
+        return 1
+
+    df = load_books()
+    table = load_path_table(df) or build_path_table(df)
+    jobs = jobs_from_path_table(table.paths, df)[:args.limit]
+    step = max(1, len(jobs) // 20)
+
+    def on_progress(report: BatchReport) -> None:
+        if report.completed % step == 0 and report.completed < report.total:
+            print(report.summary(), flush=True)
+
+    client = AsyncOpenAI(api_key=api_key or "unused", base_url=args.base_url, max_retries=0)
+    report = asyncio.run(generate_rationales(
+        client,
+        jobs,
+        RationaleCache(args.store, max_entries=STORE_MAX_ENTRIES, ttl=STORE_TTL_SECONDS),
+        model=args.model,
+        concurrency=args.concurrency,
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+        on_progress=on_progress,
+    ))
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,45 @@
+import numpy as np
 import pandas as pd
 import os
 import re
-from typing import List, Mapping, Optional
+import itertools
+import weakref
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from src.catalog_cache import TEXT_DTYPE, load_compiled
 
 # Constants for file paths
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
 BOOKS_FILE = os.path.join(DATA_DIR, 'books.csv')
 BOOL_COLS = ['is_beginner_friendly', 'is_intermediate', 'is_advanced']
+INT_COLS = ['id', 'difficulty', 'readability']
+RANGE_COLS = ['difficulty', 'readability']
+REQUIRED_COLS = [
+    'id', 'title', 'author', 'category', 'subcategory', 
+    'difficulty', 'readability', 'style', 'learning_type',
+    'short_description', 'store_url',
+    'is_beginner_friendly', 'is_intermediate', 'is_advanced'
+]
+LEVEL_COLS = {
+    'beginner': 'is_beginner_friendly',
+    'intermediate': 'is_intermediate',
+    'advanced': 'is_advanced',
+}
+# Values the query_library tool accepts for the non-category parameters.
+LEVELS = list(LEVEL_COLS)
+STYLES = ['story-driven', 'tactical/how-to', 'academic', 'reference']
+DEPTHS = ['short', 'deep']
 
 class DataLoadingError(Exception):
     """Exception raised for errors in loading the books dataset."""
     pass
 
 
+TRUE_TOKENS = frozenset({"true", "1", "yes", "y"})
+FALSE_TOKENS = frozenset({"false", "0", "no", "n", ""})
+_BOOL_TOKENS = {**{token: True for token in TRUE_TOKENS}, **{token: False for token in FALSE_TOKENS}}
+
+
 def _parse_bool(value: object) -> bool:
     """Parses CSV-friendly boolean values without treating every string as true."""
     if isinstance(value, bool):
@@ -21,65 +48,404 @@ def _parse_bool(value: object) -> bool:
         return False
 
     normalized = str(value).strip().lower()
-    if normalized in {"true", "1", "yes", "y"}:
+    if normalized in TRUE_TOKENS:
         return True
-    if normalized in {"false", "0", "no", "n", ""}:
+    if normalized in FALSE_TOKENS:
         return False
 
     raise ValueError(f"Invalid boolean value: {value}")
 
 
+def parse_bool_tokens(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized _parse_bool that reports failures instead of raising.
+
+    Each distinct value is normalized once (a categorical lookup), so the
+    cost per row is an array take rather than a Python call. Returns the
+    parsed values and a mask of rows holding unrecognized tokens.
+    """
+    if pd.api.types.is_bool_dtype(series):
+        values = series.astype("boolean").fillna(False).to_numpy(dtype=bool)
+        return values, np.zeros(len(series), dtype=bool)
+
+    values = np.zeros(len(series), dtype=bool)
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if not len(uniques):
+        return values, np.zeros(len(series), dtype=bool)
+
+    tokens = pd.Series(uniques, dtype=object).astype(str).str.strip().str.lower()
+    parsed = tokens.map(_BOOL_TOKENS)
+
+    present = codes >= 0
+    unique_invalid = parsed.isna().to_numpy()
+    invalid = present & unique_invalid[np.where(present, codes, 0)]
+    truth = (parsed == True).to_numpy(dtype=bool)
+    values[present] = truth[codes[present]]
+    return values, invalid
+
+
+def parse_bool_column(series: pd.Series) -> pd.Series:
+    """
+    Vectorized _parse_bool for a whole column.
+
+    Raises the same ValueError as _parse_bool, naming the column and the
+    first failing row.
+    """
+    values, invalid = parse_bool_tokens(series)
+    failed = np.flatnonzero(invalid)
+    if len(failed):
+        row = failed[0]
+        raise ValueError(
+            f"Invalid boolean value: {series.iloc[row]} "
+            f"(column '{series.name}', row {series.index[row]})"
+        )
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def find_invalid_rows(df: pd.DataFrame) -> List[Tuple[str, str, np.ndarray]]:
+    """
+    Applies the per-row catalog rules to raw (CSV text) or typed columns.
+
+    Returns (column, problem, row mask) for every rule that some rows break:
+    IDs must be whole numbers, difficulty and readability whole numbers from
+    1 to 5, and level flags recognizable boolean tokens. ID uniqueness is left
+    to the caller, which knows whether it is checking a frame or a whole file.
+    """
+    checks = []
+    ids = pd.to_numeric(df['id'], errors='coerce')
+    checks.append(('id', "non-integer book IDs", (ids.isna() | (ids % 1 != 0)).to_numpy()))
+
+    for col in RANGE_COLS:
+        values = pd.to_numeric(df[col], errors='coerce')
+        outside = ~values.between(1, 5)
+        checks.append((col, "values outside 1-5 range", outside.to_numpy()))
+        checks.append((col, "non-integer values", (~outside & (values % 1 != 0)).to_numpy()))
+
+    for col in BOOL_COLS:
+        _, invalid = parse_bool_tokens(df[col])
+        checks.append((col, "non-boolean values", invalid))
+    return [(col, problem, mask) for col, problem, mask in checks if mask.any()]
+
+
+def _to_int64(series: pd.Series) -> pd.Series:
+    if series.dtype == object:
+        try:
+            # Plain digit strings take numpy's fast parse; "5.0" and bad values fall through.
+            return series.astype(np.int64)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    values = pd.to_numeric(series, errors='coerce')
+    if values.notna().all() and (values % 1 == 0).all():
+        return values.astype(np.int64)
+    return series
+
+
 def normalize_books(df: pd.DataFrame) -> pd.DataFrame:
-    """Normalizes loaded book data into the types expected by the recommender."""
+    """
+    Converts loaded book data into the catalog dtypes.
+
+    IDs and ratings become int64 (left as they are if some rows break the
+    rules, so validate_books can report them), level flags become bools and
+    text columns become TEXT_DTYPE, the dtype the compiled catalog reads
+    back. load_books and ingest both go through here.
+    """
     normalized = df.copy()
+    for col in INT_COLS:
+        if col in normalized.columns:
+            normalized[col] = _to_int64(normalized[col])
     for col in BOOL_COLS:
         if col in normalized.columns:
-            normalized[col] = normalized[col].map(_parse_bool)
+            normalized[col] = parse_bool_column(normalized[col])
+    for col in normalized.columns[normalized.dtypes == object]:
+        if pd.api.types.infer_dtype(normalized[col], skipna=True) in ("string", "empty"):
+            normalized[col] = normalized[col].astype(TEXT_DTYPE)
     return normalized
 
 
 def validate_books(df: pd.DataFrame) -> None:
-    """Validates the books DataFrame schema and content."""
-    required_cols = [
-        'id', 'title', 'author', 'category', 'subcategory', 
-        'difficulty', 'readability', 'style', 'learning_type',
-        'short_description', 'store_url',
-        'is_beginner_friendly', 'is_intermediate', 'is_advanced'
-    ]
-    
+    """
+    Validates the books DataFrame schema and content.
+
+    IDs, difficulty and readability must be whole numbers ("3.0" is fine,
+    2.5 is not), since the compiled catalog stores them as int64.
+    """
     # Check missing columns
-    missing = [c for c in required_cols if c not in df.columns]
+    missing = [c for c in REQUIRED_COLS if c not in df.columns]
     if missing:
         raise ValueError(f"Dataset missing required columns: {missing}")
 
-    # Check numeric ranges
-    if not df['difficulty'].between(1, 5).all():
-        raise ValueError("Column 'difficulty' contains values outside 1-5 range")
-        
-    if not df['readability'].between(1, 5).all():
-        raise ValueError("Column 'readability' contains values outside 1-5 range")
+    violations = find_invalid_rows(df)
+    if violations:
+        col, problem, _mask = violations[0]
+        raise ValueError(f"Column '{col}' contains {problem}")
 
     # Check unique IDs
     if not df['id'].is_unique:
         raise ValueError("Duplicate book IDs found")
 
     for col in BOOL_COLS:
-        if not df[col].map(lambda value: isinstance(value, bool)).all():
+        if pd.api.types.is_bool_dtype(df[col]) and not df[col].hasnans:
+            continue
+        if pd.api.types.infer_dtype(df[col], skipna=False) not in ("boolean", "empty"):
             raise ValueError(f"Column '{col}' contains non-boolean values")
 
-def load_books() -> pd.DataFrame:
-    """Loads and validates the books dataset from the CSV file."""
-    if not os.path.exists(BOOKS_FILE):
-        raise DataLoadingError(f"Books data file not found at: {BOOKS_FILE}")
+def _read_books_csv(path: str) -> pd.DataFrame:
+    # Read as text like ingest does, so both apply the same dtype conversion.
+    df = normalize_books(pd.read_csv(path, dtype=str))
+    validate_books(df)
+    return df
+
+
+def load_books(path: Optional[str] = None, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Loads and validates the books dataset from the CSV file.
+
+    With use_cache, a compiled copy of the CSV is kept next to it and reused
+    (without re-validating) until the CSV itself changes. The BookIndex is
+    built on first use rather than here.
+    """
+    path = path or BOOKS_FILE
+    if not os.path.exists(path):
+        raise DataLoadingError(f"Books data file not found at: {path}")
 
     try:
-        df = normalize_books(pd.read_csv(BOOKS_FILE))
-        
-        validate_books(df)
-        return df
+        if use_cache:
+            return load_compiled(path, lambda: _read_books_csv(path))
+        return _read_books_csv(path)
     except Exception as e:
         raise DataLoadingError(f"Failed to load books library: {e}")
 
+def _lookup_keys(series: pd.Series) -> np.ndarray:
+    """Lowercases a column the same way filter_books compares user input to it."""
+    return series.fillna('').str.lower().to_numpy(dtype=object)
+
+
+_index_versions = itertools.count(1)
+
+
+def _update_postings(
+    postings: Dict[object, np.ndarray],
+    remap: np.ndarray,
+    touched: np.ndarray,
+    touched_keys: object,
+) -> Dict[object, np.ndarray]:
+    """Moves surviving positions to their new slots and files touched rows under their new keys."""
+    updated = {}
+    for key, positions in postings.items():
+        moved = remap[positions]
+        moved = moved[moved >= 0]
+        if len(moved):
+            updated[key] = moved
+
+    if len(touched):
+        grouped = pd.Series(touched).groupby(touched_keys, sort=False).indices
+        for key, rows in grouped.items():
+            existing = updated.get(key, np.empty(0, dtype=touched.dtype))
+            updated[key] = np.sort(np.concatenate([existing, touched[rows]]))
+    return updated
+
+
+def update_array(old: np.ndarray, remap: np.ndarray, touched: np.ndarray, touched_values: np.ndarray) -> np.ndarray:
+    """
+    Carries a per-row array over to a new row order: `remap` gives each old
+    row's new position (-1 if dropped), and rows at `touched` get
+    `touched_values`.
+    """
+    kept = remap >= 0
+    updated = np.empty(len(remap[kept]) + len(touched), dtype=old.dtype)
+    updated[remap[kept]] = old[kept]
+    updated[touched] = touched_values
+    return updated
+
+
+class BookIndex:
+    """
+    Precomputed lookup structure for filter_books.
+
+    Keys are normalized exactly like the original column scans (nulls become
+    '', values are lowercased but not stripped), and every bucket stores row
+    positions in frame order so lookups can rebuild the same slice with
+    DataFrame.take. The frame the index was built from is treated as
+    read-only. Every index gets a new version number, which caches keyed on
+    catalog contents use as their invalidation stamp.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.version = next(_index_versions)
+        self.size = len(df)
+        self.ids = df['id'].to_numpy() if 'id' in df.columns else None
+        self._positions_by_id: Optional[pd.Index] = None
+
+        positions = pd.Series(np.arange(self.size))
+        category_keys = _lookup_keys(df['category'])
+        self._by_category: Dict[str, np.ndarray] = positions.groupby(
+            category_keys, sort=False
+        ).indices
+
+        self._by_subcategory: Dict[Tuple[str, str], np.ndarray] = {}
+        if 'subcategory' in df.columns:
+            subcategory_keys = _lookup_keys(df['subcategory'])
+            self._by_subcategory = positions.groupby(
+                [category_keys, subcategory_keys], sort=False
+            ).indices
+
+        self._level_masks: Dict[str, np.ndarray] = {
+            col: (df[col] == True).to_numpy(dtype=bool)
+            for col in BOOL_COLS
+            if col in df.columns
+        }
+        self._style_keys = _lookup_keys(df['style']) if 'style' in df.columns else None
+
+    def lookup(
+        self,
+        category: str,
+        subcategory: Optional[str] = None,
+        level: str = "beginner",
+        style_pref: Optional[str] = None,
+    ) -> np.ndarray:
+        """Returns the row positions filter_books would select, in frame order."""
+        empty = np.empty(0, dtype=np.intp)
+        if not category:
+            return empty
+
+        category_key = str(category).strip().lower()
+        selected = self._by_category.get(category_key, empty)
+
+        if subcategory and len(selected):
+            subcategory_key = str(subcategory).strip().lower()
+            sub_matches = self._by_subcategory.get((category_key, subcategory_key))
+            if sub_matches is not None and len(sub_matches):
+                selected = sub_matches
+
+        if len(selected):
+            level_col = LEVEL_COLS.get(str(level or "").strip().lower())
+            if level_col is not None:
+                if level_col not in self._level_masks:
+                    raise KeyError(level_col)
+                selected = selected[self._level_masks[level_col][selected]]
+
+        if style_pref and len(selected):
+            if self._style_keys is None:
+                raise KeyError('style')
+            style_key = str(style_pref).strip().lower()
+            style_matches = selected[self._style_keys[selected] == style_key]
+            if len(style_matches) >= 3:
+                selected = style_matches
+
+        return selected
+
+    @property
+    def has_unique_ids(self) -> bool:
+        """Whether rows can be addressed by book ID (always true for validated catalogs)."""
+        if self.ids is None:
+            return False
+        if self._positions_by_id is None:
+            self._positions_by_id = pd.Index(self.ids)
+        return self._positions_by_id.is_unique
+
+    def positions_for_ids(self, ids: Sequence[object]) -> Optional[np.ndarray]:
+        """Maps book IDs back to row positions, or None if any ID cannot be resolved."""
+        if not self.has_unique_ids:
+            return None
+        positions = self._positions_by_id.get_indexer(list(ids))
+        if (positions < 0).any():
+            return None
+        return positions
+
+    def updated(self, df: pd.DataFrame, remap: np.ndarray, touched: np.ndarray) -> "BookIndex":
+        """
+        Derives the index for an edited copy of the frame without rescanning it.
+
+        remap gives each old row position its new position, or -1 if the row
+        was removed or changed. touched holds the new positions of changed
+        and added rows; only those rows are re-keyed. This index is left
+        untouched so readers of the previous frame are unaffected.
+        """
+        index = BookIndex.__new__(BookIndex)
+        index.version = next(_index_versions)
+        index.size = len(df)
+        index.ids = df['id'].to_numpy() if 'id' in df.columns else None
+        index._positions_by_id = None
+
+        rows = df.take(touched)
+        category_keys = _lookup_keys(rows['category'])
+        index._by_category = _update_postings(self._by_category, remap, touched, category_keys)
+        index._by_subcategory = {}
+        if 'subcategory' in df.columns:
+            index._by_subcategory = _update_postings(
+                self._by_subcategory,
+                remap,
+                touched,
+                [category_keys, _lookup_keys(rows['subcategory'])],
+            )
+
+        index._level_masks = {
+            col: update_array(mask, remap, touched, (rows[col] == True).to_numpy(dtype=bool))
+            for col, mask in self._level_masks.items()
+        }
+        index._style_keys = None
+        if self._style_keys is not None:
+            index._style_keys = update_array(self._style_keys, remap, touched, _lookup_keys(rows['style']))
+        return index
+
+
+# Columns BookIndex reads; get_book_index rebuilds when any of them is replaced.
+INDEXED_COLS = ['id', 'category', 'subcategory', 'style', *BOOL_COLS]
+
+
+def _column_buffers(df: pd.DataFrame) -> Tuple[object, ...]:
+    """Returns the arrays backing the indexed columns, so a replaced column shows up as a new object."""
+    buffers = []
+    for col in INDEXED_COLS:
+        if col not in df.columns:
+            buffers.append(None)
+            continue
+        values = df[col].values
+        buffer = getattr(values, '_pa_array', None)
+        if buffer is None:
+            buffer = np.asarray(values)
+            while isinstance(buffer.base, np.ndarray):
+                buffer = buffer.base
+        buffers.append(buffer)
+    return tuple(buffers)
+
+
+_INDEX_CACHE: Dict[int, Tuple["weakref.ref[pd.DataFrame]", Tuple[object, ...], BookIndex]] = {}
+
+
+def _drop_cached_index(key: int) -> None:
+    _INDEX_CACHE.pop(key, None)
+
+
+def register_book_index(df: pd.DataFrame, index: BookIndex) -> None:
+    """
+    Associates a prebuilt (e.g. incrementally updated) index with a frame.
+    """
+    key = id(df)
+    buffers = _column_buffers(df)
+    _INDEX_CACHE[key] = (weakref.ref(df, lambda _ref: _drop_cached_index(key)), buffers, index)
+
+
+def get_book_index(df: pd.DataFrame) -> BookIndex:
+    """
+    Returns the BookIndex for this frame, building it on first use.
+
+    The cached index is reused only while the frame still holds the same
+    column arrays; replacing an indexed column gets a fresh index (and with
+    it a new version for caches keyed on it). Writes into an indexed column
+    in place (df.loc[...] = ...) keep the same arrays and are not noticed.
+    """
+    cached = _INDEX_CACHE.get(id(df))
+    if cached is not None and cached[0]() is df and cached[2].size == len(df):
+        buffers = _column_buffers(df)
+        if all(old is new for old, new in zip(cached[1], buffers)):
+            return cached[2]
+
+    index = BookIndex(df)
+    register_book_index(df, index)
+    return index
+
+
 def filter_books(
     df: pd.DataFrame,
     category: str,
@@ -93,51 +459,23 @@ def filter_books(
     Args:
         df: The full books DataFrame.
         category: Main topic (e.g., 'habits', 'coding').
-        subcategory: Specific topic (e.g., 'python').
+        subcategory: Specific topic (e.g., 'python'). Ignored if it has no matches.
         level: User's skill level ('beginner', 'intermediate', 'advanced').
         style_pref: Preferred style (e.g., 'tactical/how-to', 'story-driven').
+            Soft filter: only applied when at least 3 books match it.
     """
     if df.empty:
         return df
     if not category:
         return df.iloc[0:0].copy()
 
-    # 1. Filter by Category
-    # Case-insensitive matching
-    category_key = str(category).strip().lower()
-    filtered = df[df['category'].fillna('').str.lower() == category_key].copy()
-    
-    # 2. Filter by Subcategory (if provided and exists in data)
-    if subcategory and not filtered.empty:
-        # Only filter if the subcategory actually has matches, otherwise stay broad
-        subcategory_key = str(subcategory).strip().lower()
-        sub_matches = filtered[filtered['subcategory'].fillna('').str.lower() == subcategory_key]
-        if not sub_matches.empty:
-            filtered = sub_matches
-
-    # 3. Filter by Level (inclusive)
-    # If beginner, we want is_beginner_friendly = True
-    # If intermediate, we want is_intermediate = True
-    # If advanced, we want is_advanced = True
-    if not filtered.empty:
-        level_key = str(level or "").strip().lower()
-        if level_key == "beginner":
-            filtered = filtered[filtered['is_beginner_friendly'] == True]
-        elif level_key == "intermediate":
-            filtered = filtered[filtered['is_intermediate'] == True]
-        elif level_key == "advanced":
-            filtered = filtered[filtered['is_advanced'] == True]
-
-    # 4. Filter by Style (soft filter - prefer if possible, but don't empty the list)
-    if style_pref and not filtered.empty:
-        style_key = str(style_pref).strip().lower()
-        style_matches = filtered[filtered['style'].fillna('').str.lower() == style_key]
-        # If we have enough matches with the style, use them. 
-        # Otherwise, keep the mixed bag so we don't return 0 results.
-        if len(style_matches) >= 3:
-            filtered = style_matches
-
-    return filtered
+    positions = get_book_index(df).lookup(
+        category,
+        subcategory=subcategory,
+        level=level,
+        style_pref=style_pref,
+    )
+    return df.take(positions)
 
 def sequence_books(
     df: pd.DataFrame,
@@ -0,0 +1,258 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.books import BOOKS_FILE, BookIndex, get_book_index, load_books, register_book_index, update_array
+from src.path_table import PathTable, load_path_table, row_hashes
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """An immutable view of the catalog shared by every session in the process."""
+    books: pd.DataFrame
+    index: BookIndex
+    version: int
+    path_table: Optional[PathTable] = None
+    # Per-row content hashes behind the path table fingerprint, when one was checked.
+    row_hashes: Optional[np.ndarray] = None
+
+
+@dataclass(frozen=True)
+class CatalogDiff:
+    """Book IDs that differ between two versions of the catalog."""
+    added: Tuple[object, ...] = ()
+    changed: Tuple[object, ...] = ()
+    removed: Tuple[object, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def _rows_equal(old: pd.DataFrame, new: pd.DataFrame) -> np.ndarray:
+    """Compares aligned rows column by column, treating missing values as equal."""
+    same = (old == new) | (old.isna() & new.isna())
+    return same.all(axis=1).to_numpy()
+
+
+def _apply_changes(
+    old: pd.DataFrame,
+    old_index: BookIndex,
+    new: pd.DataFrame,
+    old_hashes: Optional[np.ndarray] = None,
+) -> Tuple[pd.DataFrame, BookIndex, CatalogDiff, Optional[np.ndarray]]:
+    old_ids = pd.Index(old['id'])
+    new_ids = pd.Index(new['id'])
+    new_position = new_ids.get_indexer(old_ids)
+
+    kept = np.flatnonzero(new_position >= 0)
+    matched = new_position[kept]
+    added = np.flatnonzero(old_ids.get_indexer(new_ids) < 0)
+
+    same_layout = list(old.columns) == list(new.columns)
+    changed = np.zeros(len(kept), dtype=bool)
+    if same_layout:
+        changed = ~_rows_equal(
+            old.take(kept).reset_index(drop=True),
+            new.take(matched).reset_index(drop=True),
+        )
+    else:
+        changed[:] = True
+
+    diff = CatalogDiff(
+        added=tuple(new_ids[added]),
+        changed=tuple(old_ids[kept[changed]]),
+        removed=tuple(old_ids[new_position < 0]),
+    )
+    if not diff:
+        return old, old_index, diff, old_hashes
+
+    books = new.take(np.concatenate([matched, added])).reset_index(drop=True)
+    if not same_layout:
+        return books, get_book_index(books), diff, None
+
+    remap = np.full(len(old), -1, dtype=np.intp)
+    remap[kept] = np.arange(len(kept))
+    remap[kept[changed]] = -1
+    touched = np.concatenate([np.flatnonzero(changed), np.arange(len(kept), len(books))])
+    index = old_index.updated(books, remap, touched)
+    register_book_index(books, index)
+    hashes = None
+    # Row hashes depend on dtypes, so old ones only carry over if those match.
+    if old_hashes is not None and old.dtypes.equals(books.dtypes):
+        hashes = update_array(old_hashes, remap, touched, row_hashes(books.take(touched)))
+    return books, index, diff, hashes
+
+
+def apply_changes(
+    old: pd.DataFrame,
+    old_index: BookIndex,
+    new: pd.DataFrame,
+) -> Tuple[pd.DataFrame, BookIndex, CatalogDiff]:
+    """
+    Applies the rows of `new` that differ from `old` (matched by id).
+
+    Unchanged and edited books keep their position, removed books are
+    dropped and new books are appended in file order, so the result matches
+    a full reload unless curators reordered existing rows. Only touched rows
+    are re-keyed in the derived BookIndex; `new` itself is never indexed.
+    """
+    books, index, diff, _hashes = _apply_changes(old, old_index, new)
+    return books, index, diff
+
+
+class Catalog:
+    """
+    Process-wide holder for the books catalog.
+
+    Every caller gets the same DataFrame instead of its own copy, so memory
+    stays flat as sessions are added. Snapshots must be treated as read-only.
+    swap() publishes a new snapshot atomically and never modifies the old
+    one, so a request that read current() keeps a consistent view for as
+    long as it holds the reference. refresh() (or the background watcher)
+    only applies the rows that changed on disk.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        loader: Callable[[str], pd.DataFrame] = load_books,
+    ):
+        self.path = path or BOOKS_FILE
+        self.paths_file = os.path.splitext(self.path)[0] + ".paths.json"
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._current: Optional[CatalogSnapshot] = None
+        self._source_stat: Optional[Tuple[int, int]] = None
+        self._version = 0
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def current(self) -> CatalogSnapshot:
+        """Returns the live snapshot, loading the catalog on first use."""
+        snapshot = self._current
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._current is None:
+                source_stat = self._stat()
+                self.swap(self._loader(self.path))
+                self._source_stat = source_stat
+            return self._current
+
+    def swap(
+        self,
+        books: pd.DataFrame,
+        index: Optional[BookIndex] = None,
+        hashes: Optional[np.ndarray] = None,
+    ) -> CatalogSnapshot:
+        """
+        Publishes a new catalog version; snapshots already handed out are unaffected.
+
+        `hashes` are the frame's row_hashes when the caller could derive
+        them from the previous version; otherwise they are computed here,
+        and only if there is a path table to check.
+        """
+        with self._lock:
+            if hashes is None and os.path.exists(self.paths_file):
+                hashes = row_hashes(books)
+            self._version += 1
+            snapshot = CatalogSnapshot(
+                books=books,
+                index=index or get_book_index(books),
+                version=self._version,
+                path_table=load_path_table(books, self.paths_file, hashes) if hashes is not None else None,
+                row_hashes=hashes,
+            )
+            self._current = snapshot
+            return snapshot
+
+    def update(self, books: pd.DataFrame) -> CatalogDiff:
+        """Applies the differences between `books` and the live catalog."""
+        with self._lock:
+            current = self.current()
+            merged, index, diff, hashes = _apply_changes(current.books, current.index, books, current.row_hashes)
+            if diff:
+                self.swap(merged, index, hashes)
+            return diff
+
+    def refresh(self) -> bool:
+        """Applies on-disk changes to the catalog. Returns True on swap."""
+        source_stat = self._stat()
+        if self._current is not None and source_stat == self._source_stat:
+            return False
+        with self._lock:
+            if self._current is not None and source_stat == self._source_stat:
+                return False
+            if self._current is None:
+                self.current()
+                return True
+            try:
+                books = self._loader(self.path)
+            finally:
+                # A file that fails to load is not retried until it is edited again.
+                self._source_stat = source_stat
+            diff = self.update(books)
+            if diff:
+                logger.info(
+                    "Catalog reloaded: %d added, %d changed, %d removed",
+                    len(diff.added), len(diff.changed), len(diff.removed),
+                )
+            return bool(diff)
+
+    def start_watching(self, interval: float = 2.0) -> None:
+        """Polls the source file in a daemon thread and applies changes as they land."""
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._stop_watching.clear()
+            self._watcher = threading.Thread(
+                target=self._watch,
+                args=(interval,),
+                name="catalog-watcher",
+                daemon=True,
+            )
+            self._watcher.start()
+
+    def stop_watching(self) -> None:
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            self._stop_watching.set()
+            watcher.join()
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop_watching.wait(interval):
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the last good snapshot while curators fix the file.
+                logger.warning("Catalog reload failed; keeping the current version", exc_info=True)
+
+
+_catalog: Optional[Catalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """Returns the catalog shared by every session and module in this process."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = Catalog()
+    return _catalog
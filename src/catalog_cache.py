@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the artifact layout or the normalization applied before writing changes.
+FORMAT_VERSION = 2
+# Text columns are kept in Arrow memory; missing values still read back as NaN.
+TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+_ARROW_TYPES = {pa.string(): TEXT_DTYPE, pa.large_string(): TEXT_DTYPE}
+
+
+@dataclass(frozen=True)
+class SourceFingerprint:
+    size: int
+    mtime_ns: int
+    sha256: Optional[str] = None
+
+
+def compiled_path(source_path: str) -> str:
+    """Returns the compiled Parquet artifact path stored next to the CSV."""
+    return os.path.splitext(source_path)[0] + ".catalog.parquet"
+
+
+def meta_path(source_path: str) -> str:
+    """Returns the sidecar file recording which CSV the artifact was built from."""
+    return os.path.splitext(source_path)[0] + ".catalog.json"
+
+
+def file_sha256(path: str) -> str:
+    """Hashes a file in chunks so large catalogs are not read into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(source_path: str, with_hash: bool = False) -> SourceFingerprint:
+    """Captures the size/mtime (and optionally content hash) of a source file."""
+    stat = os.stat(source_path)
+    return SourceFingerprint(
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        sha256=file_sha256(source_path) if with_hash else None,
+    )
+
+
+def _read_meta(source_path: str) -> Optional[dict]:
+    try:
+        with open(meta_path(source_path), "r") as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if meta.get("format_version") != FORMAT_VERSION:
+        return None
+    return meta
+
+
+def _write_atomic(path: str, write: Callable[[str], None]) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_meta(source_path: str, source: SourceFingerprint) -> None:
+    """Records the source fingerprint a freshly written artifact was built from."""
+    payload = {"format_version": FORMAT_VERSION, "source": asdict(source)}
+
+    def write(tmp_path: str) -> None:
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f, indent=4)
+
+    _write_atomic(meta_path(source_path), write)
+
+
+def write_compiled(source_path: str, df: pd.DataFrame, source: SourceFingerprint) -> None:
+    """Writes the compiled artifact and its sidecar, each via atomic rename."""
+    _write_atomic(compiled_path(source_path), lambda tmp_path: df.to_parquet(tmp_path, index=True))
+    write_meta(source_path, source)
+
+
+def read_compiled(source_path: str) -> pd.DataFrame:
+    """
+    Reads the compiled artifact.
+
+    Text columns stay in Arrow buffers (TEXT_DTYPE) instead of being turned
+    into one Python object per cell, which is most of the cost of a load.
+    """
+    table = pq.read_table(compiled_path(source_path), memory_map=True)
+    return table.to_pandas(types_mapper=_ARROW_TYPES.get)
+
+
+def load_compiled(source_path: str, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Returns the catalog from the compiled artifact when it matches the source.
+
+    The artifact is trusted when the CSV's size and mtime match the sidecar.
+    If only those changed (e.g. the file was touched or checked out again),
+    the content hash decides whether a rebuild is needed. Otherwise `build`
+    parses and validates the CSV and the result is compiled for next time.
+    """
+    current = fingerprint(source_path)
+    meta = _read_meta(source_path)
+
+    if meta is not None and os.path.exists(compiled_path(source_path)):
+        recorded = SourceFingerprint(**meta["source"])
+        stat_matches = (recorded.size, recorded.mtime_ns) == (current.size, current.mtime_ns)
+        if not stat_matches:
+            current = fingerprint(source_path, with_hash=True)
+        if stat_matches or recorded.sha256 == current.sha256:
+            try:
+                df = read_compiled(source_path)
+            except Exception as exc:
+                logger.warning("Ignoring unreadable compiled catalog for %s: %s", source_path, exc)
+            else:
+                if current.sha256 is not None:
+                    _write_quietly(lambda: write_meta(source_path, current), source_path)
+                return df
+
+    if current.sha256 is None:
+        current = fingerprint(source_path, with_hash=True)
+    df = build()
+    _write_quietly(lambda: write_compiled(source_path, df, current), source_path)
+    return df
+
+
+def _write_quietly(write: Callable[[], None], source_path: str) -> None:
+    # A read-only data directory or an unserializable column should cost us
+    # the cache, not the load.
+    try:
+        write()
+    except Exception as exc:
+        logger.warning("Could not write compiled catalog for %s: %s", source_path, exc)
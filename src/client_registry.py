@@ -0,0 +1,186 @@
+"""
+Process-wide OpenAI clients, so HTTP connections survive Streamlit reruns.
+
+Clients are keyed by (API key, base URL) and share a keep-alive connection
+pool of `pool_size` connections each. Every request and every newly opened
+connection is counted in `metrics`, which gives the connection reuse rate.
+Since every distinct user-supplied key gets its own clients, at most
+`max_clients` of each kind are kept, least recently used first out, and
+clients idle for `idle_seconds` are dropped; evicted clients are closed.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from src.metrics import METRICS, MetricsRegistry
+
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.environ.get("OPENAI_POOL_SIZE", "20"))
+KEEPALIVE_SECONDS = 60.0
+MAX_CLIENTS = 32
+CLIENT_IDLE_SECONDS = 15 * 60.0
+
+REQUESTS_METRIC = "openai.http.requests"
+CONNECTIONS_METRIC = "openai.http.connections"
+HANDSHAKES_METRIC = "openai.http.tls_handshakes"
+EVICTIONS_METRIC = "openai.clients.evicted"
+
+ClientKey = Tuple[str, Optional[str]]
+C = TypeVar("C")
+
+
+class ClientRegistry:
+    """Hands out one sync and one async client per (API key, base URL)."""
+
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        keepalive_expiry: float = KEEPALIVE_SECONDS,
+        metrics: MetricsRegistry = METRICS,
+        max_clients: int = MAX_CLIENTS,
+        idle_seconds: float = CLIENT_IDLE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.metrics = metrics
+        self.max_clients = max_clients
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        # Ordered from least to most recently used, with the time of last use.
+        self._clients: "OrderedDict[ClientKey, Tuple[OpenAI, float]]" = OrderedDict()
+        self._async_clients: "OrderedDict[ClientKey, Tuple[AsyncOpenAI, float]]" = OrderedDict()
+        # Evicted async clients wait here to be closed on the loop that used them.
+        self._retired_async: List[AsyncOpenAI] = []
+        self._lock = threading.Lock()
+
+    def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        # httpcore reports each connection it opens; reused ones skip these events.
+        if event_name == "connection.connect_tcp.complete":
+            self.metrics.increment(CONNECTIONS_METRIC)
+        elif event_name == "connection.start_tls.complete":
+            self.metrics.increment(HANDSHAKES_METRIC)
+
+    async def _atrace(self, event_name: str, info: Dict[str, Any]) -> None:
+        self._trace(event_name, info)
+
+    def _on_request(self, request: httpx.Request) -> None:
+        self.metrics.increment(REQUESTS_METRIC)
+        request.extensions["trace"] = self._trace
+
+    async def _on_async_request(self, request: httpx.Request) -> None:
+        self.metrics.increment(REQUESTS_METRIC)
+        request.extensions["trace"] = self._atrace
+
+    def _checkout(
+        self,
+        clients: "OrderedDict[ClientKey, Tuple[C, float]]",
+        key: ClientKey,
+        create: Callable[[], C],
+    ) -> Tuple[C, List[C]]:
+        """Returns the client for `key` (created if needed) and the clients evicted to make room; hold _lock."""
+        now = self._clock()
+        entry = clients.pop(key, None)
+        client = entry[0] if entry is not None else create()
+        clients[key] = (client, now)
+        evicted = []
+        for old_key, (old_client, last_used) in list(clients.items()):
+            if old_key == key or (len(clients) <= self.max_clients and now - last_used < self.idle_seconds):
+                break
+            del clients[old_key]
+            evicted.append(old_client)
+        if evicted:
+            self.metrics.increment(EVICTIONS_METRIC, len(evicted))
+        return client, evicted
+
+    def get(self, api_key: str, base_url: Optional[str] = None) -> OpenAI:
+        """Returns the shared sync client for this key and endpoint."""
+
+        def create() -> OpenAI:
+            http_client = DefaultHttpxClient(limits=self.limits, event_hooks={"request": [self._on_request]})
+            return OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+        with self._lock:
+            client, evicted = self._checkout(self._clients, (api_key, base_url), create)
+        for old in evicted:
+            old.close()
+        return client
+
+    def get_async(self, api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+        """
+        Returns the shared async client for this key and endpoint.
+
+        Its connections belong to the event loop that first uses it, so only
+        one loop (the AsyncLLMRunner's) should call this registry's async clients.
+        Evicted async clients are handed to that loop through take_retired().
+        """
+
+        def create() -> AsyncOpenAI:
+            http_client = DefaultAsyncHttpxClient(limits=self.limits, event_hooks={"request": [self._on_async_request]})
+            return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+        with self._lock:
+            client, evicted = self._checkout(self._async_clients, (api_key, base_url), create)
+            self._retired_async.extend(evicted)
+        return client
+
+    def take_retired(self) -> List[AsyncOpenAI]:
+        """Returns the evicted async clients not yet closed; the caller closes them on their loop."""
+        with self._lock:
+            retired, self._retired_async = self._retired_async, []
+        return retired
+
+    def reuse_rate(self) -> Optional[float]:
+        """Share of requests sent over an already open connection, or None before any request."""
+        requests = self.metrics.counter(REQUESTS_METRIC)
+        if not requests:
+            return None
+        return max(0.0, 1.0 - self.metrics.counter(CONNECTIONS_METRIC) / requests)
+
+    def report(self) -> Dict[str, Optional[float]]:
+        return {
+            "requests": self.metrics.counter(REQUESTS_METRIC),
+            "connections": self.metrics.counter(CONNECTIONS_METRIC),
+            "tls_handshakes": self.metrics.counter(HANDSHAKES_METRIC),
+            "reuse_rate": self.reuse_rate(),
+        }
+
+    def close(self) -> None:
+        """Closes the sync clients; async clients are closed by the loop that uses them."""
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clients = [client for client, _ in self._async_clients.values()]
+            self._async_clients.clear()
+        for client in clients + self.take_retired():
+            await client.close()
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Returns the registry shared by every session in this process."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
@@ -0,0 +1,152 @@
+"""
+Persistent cover URL cache shared by every server process.
+
+    python -m src.cover_cache prewarm   # look up every catalog book offline
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from src.books import DATA_DIR, load_books
+
+
+COVER_CACHE_FILE = os.path.join(DATA_DIR, 'cover_cache.sqlite3')
+HIT_TTL_SECONDS = 30 * 24 * 3600
+MISS_TTL_SECONDS = 24 * 3600
+
+CoverKey = Tuple[str, str]
+
+
+class CoverCache:
+    """
+    SQLite-backed cache of Google Books cover lookups keyed by (title, author).
+
+    Both found covers and confirmed "no cover" results are stored, each with
+    its own TTL. Each call opens a short-lived connection in WAL mode, so
+    several Streamlit workers can read and write the same file safely.
+    """
+
+    def __init__(
+        self,
+        path: str = COVER_CACHE_FILE,
+        hit_ttl: float = HIT_TTL_SECONDS,
+        miss_ttl: float = MISS_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self._clock = clock
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    with conn:
+                        conn.execute(
+                            "CREATE TABLE IF NOT EXISTS covers ("
+                            "title TEXT NOT NULL, author TEXT NOT NULL, url TEXT, "
+                            "fetched_at REAL NOT NULL, PRIMARY KEY (title, author))"
+                        )
+                    self._initialized = True
+        return conn
+
+    def _is_fresh(self, url: Optional[str], fetched_at: float) -> bool:
+        ttl = self.hit_ttl if url else self.miss_ttl
+        return self._clock() - fetched_at <= ttl
+
+    def get_many(self, keys: Iterable[CoverKey]) -> Dict[CoverKey, Optional[str]]:
+        """Returns fresh entries only; a None value is a cached "no cover" result."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        found = {}
+        with closing(self._connect()) as conn:
+            for title, author in keys:
+                row = conn.execute(
+                    "SELECT url, fetched_at FROM covers WHERE title = ? AND author = ?",
+                    (title, author),
+                ).fetchone()
+                if row is not None and self._is_fresh(*row):
+                    found[(title, author)] = row[0]
+        return found
+
+    def put_many(self, covers: Mapping[CoverKey, Optional[str]]) -> None:
+        if not covers:
+            return
+        now = self._clock()
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO covers (title, author, url, fetched_at) VALUES (?, ?, ?, ?)",
+                    [(title, author, url, now) for (title, author), url in covers.items()],
+                )
+
+    def purge_expired(self) -> int:
+        """Deletes stale rows; returns how many were removed."""
+        now = self._clock()
+        with closing(self._connect()) as conn:
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM covers WHERE "
+                    "(url IS NOT NULL AND fetched_at < ?) OR (url IS NULL AND fetched_at < ?)",
+                    (now - self.hit_ttl, now - self.miss_ttl),
+                )
+                return cursor.rowcount
+
+
+_cover_cache: Optional[CoverCache] = None
+_cover_cache_lock = threading.Lock()
+
+
+def get_cover_cache() -> CoverCache:
+    """Returns the cover cache for this process, stored under data/."""
+    global _cover_cache
+    if _cover_cache is None:
+        with _cover_cache_lock:
+            if _cover_cache is None:
+                _cover_cache = CoverCache()
+    return _cover_cache
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # Imported here: src.utils depends on this module for its cache.
+    from src.utils import fetch_book_covers
+
+    parser = argparse.ArgumentParser(description="Manage the persistent cover URL cache.")
+    parser.add_argument("command", choices=["prewarm", "purge"])
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    cache = get_cover_cache()
+    if args.command == "purge":
+        print(f"Removed {cache.purge_expired()} expired entries")
+        return 0
+
+    books = load_books()[["title", "author"]].astype(str).to_dict("records")
+    cached = cache.get_many((book["title"], book["author"]) for book in books)
+    pending = [book for book in books if (book["title"], book["author"]) not in cached]
+    print(f"{len(cached)} of {len(books)} books already cached; fetching {len(pending)}")
+
+    fetched = 0
+    for start in range(0, len(pending), args.batch_size):
+        batch = pending[start:start + args.batch_size]
+        covers = fetch_book_covers(batch, deadline=60, max_workers=args.workers, cache=cache)
+        fetched += len(covers)
+        print(f"{start + len(batch)}/{len(pending)} looked up")
+    print(f"Done: {fetched} lookups completed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Keeps the chat history sent to the LLM bounded in long sessions.
+"""
+from typing import Any, Dict, List, Optional
+
+from src.intent_parser import IntentVocabulary, parse_intent
+from src.llm_client import estimate_message_tokens
+
+
+KEEP_TURNS = 4
+MAX_HISTORY_TOKENS = 2000
+
+SLOT_LABELS = (
+    ("category", "topic"),
+    ("subcategory", "niche"),
+    ("level", "level"),
+    ("style", "style"),
+    ("depth", "depth"),
+)
+
+
+def _turn_starts(messages: List[Dict[str, Any]]) -> List[int]:
+    return [i for i, m in enumerate(messages) if m.get("role") == "user"]
+
+
+def gather_slots(messages: List[Dict[str, Any]], vocab: IntentVocabulary) -> Dict[str, str]:
+    """Collects the path preferences users stated, later messages overriding earlier ones."""
+    slots: Dict[str, str] = {}
+    for message in messages:
+        if message.get("role") != "user" or not message.get("content"):
+            continue
+        found = parse_intent(message["content"], vocab).slots
+        if "category" in found:
+            # A new topic makes an earlier niche meaningless.
+            slots.pop("subcategory", None)
+        slots.update(found)
+    return slots
+
+
+def summarize_slots(slots: Dict[str, str], folded: int) -> str:
+    gathered = "; ".join(f"{label}: {slots[key]}" for key, label in SLOT_LABELS if key in slots)
+    return (
+        f"Summary of the {folded} earlier messages in this conversation. "
+        f"Preferences gathered so far: {gathered or 'none yet'}."
+    )
+
+
+def compact_history(
+    messages: List[Dict[str, Any]],
+    vocab: IntentVocabulary,
+    keep_turns: int = KEEP_TURNS,
+    max_tokens: Optional[int] = MAX_HISTORY_TOKENS,
+    reserved_tokens: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Returns the messages to send: recent turns verbatim, older ones folded.
+
+    The last `keep_turns` user turns (each with the replies that followed
+    it) are kept as-is. Everything before them becomes one system message
+    listing the slots gathered so far. If the result plus
+    `reserved_tokens` (system prompt, tool schema) still exceeds
+    `max_tokens`, more of the oldest turns are folded, down to the latest
+    turn, which is always sent whole.
+    """
+    starts = _turn_starts(messages)
+    if not starts:
+        return list(messages)
+
+    keep_from = starts[max(0, len(starts) - keep_turns)] if keep_turns > 0 else starts[-1]
+    while True:
+        compacted = _fold(messages, keep_from, vocab)
+        if max_tokens is None or estimate_message_tokens(compacted) + reserved_tokens <= max_tokens:
+            return compacted
+        later = [start for start in starts if start > keep_from]
+        if not later:
+            return compacted
+        keep_from = later[0]
+
+
+def _fold(messages: List[Dict[str, Any]], keep_from: int, vocab: IntentVocabulary) -> List[Dict[str, Any]]:
+    older, recent = messages[:keep_from], messages[keep_from:]
+    if not older:
+        return list(recent)
+    summary = summarize_slots(gather_slots(older, vocab), len(older))
+    return [{"role": "system", "content": summary}] + list(recent)
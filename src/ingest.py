@@ -0,0 +1,163 @@
+"""
+Streaming ingestion for large catalogs.
+
+Reads books.csv in chunks, validates every row and collects all problems in
+one report instead of failing on the first one. When the whole file is valid
+the rows are written as the same compiled catalog load_books() reuses.
+
+    python -m src.ingest [path/to/books.csv] [--chunksize N] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Iterator, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.books import BOOKS_FILE, BOOL_COLS, INT_COLS, REQUIRED_COLS, find_invalid_rows, normalize_books
+from src.catalog_cache import compiled_path, fingerprint, write_meta
+
+
+@dataclass(frozen=True)
+class RowError:
+    row: Optional[int]
+    column: str
+    message: str
+    book_id: Optional[str] = None
+
+
+@dataclass
+class IngestReport:
+    source_path: str
+    rows_read: int = 0
+    rows_valid: int = 0
+    errors: List[RowError] = field(default_factory=list)
+    output_path: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "ok": self.ok}
+
+
+def _schema(columns: List[str]) -> pa.Schema:
+    fields = []
+    for col in columns:
+        if col in INT_COLS:
+            fields.append(pa.field(col, pa.int64()))
+        elif col in BOOL_COLS:
+            fields.append(pa.field(col, pa.bool_()))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+
+def _check_chunk(chunk: pd.DataFrame, seen_ids: Set[int]) -> Iterator[RowError]:
+    """Yields row errors for one chunk: the rules validate_books applies, plus IDs repeated across chunks."""
+    raw_ids = chunk['id']
+    bad_id = np.zeros(len(chunk), dtype=bool)
+    for col, problem, mask in find_invalid_rows(chunk):
+        if col == 'id':
+            bad_id = mask
+        for row in chunk.index[mask]:
+            yield RowError(int(row), col, f"Column '{col}' contains {problem} (got {chunk.at[row, col]})", raw_ids[row])
+
+    id_values = pd.to_numeric(raw_ids.where(~bad_id, -1)).astype(np.int64)
+    seen_before = np.fromiter((value in seen_ids for value in id_values), dtype=bool, count=len(id_values))
+    duplicate = ~bad_id & (id_values.duplicated().to_numpy() | seen_before)
+    for row in chunk.index[duplicate]:
+        yield RowError(int(row), 'id', f"Duplicate book ID: {id_values[row]}", raw_ids[row])
+    seen_ids.update(id_values[~bad_id].tolist())
+
+
+def ingest_books(
+    source_path: Optional[str] = None,
+    output_path: Optional[str] = None,
+    chunksize: int = 50_000,
+) -> IngestReport:
+    """
+    Validates a books CSV chunk by chunk and compiles it when it is clean.
+
+    Peak memory is one chunk plus the set of IDs seen so far. Row numbers in
+    the report are 0-based data rows, matching the index load_books() assigns.
+    The compiled catalog (and its fingerprint sidecar, when writing next to the
+    source) is only published if no row failed validation.
+    """
+    source_path = source_path or BOOKS_FILE
+    report = IngestReport(source_path=source_path)
+    source = fingerprint(source_path, with_hash=True)
+    publish_meta = output_path is None
+    output_path = output_path or compiled_path(source_path)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+
+    writer = None
+    seen_ids: Set[int] = set()
+    try:
+        for chunk in pd.read_csv(source_path, dtype=str, chunksize=chunksize):
+            if writer is None:
+                missing = [c for c in REQUIRED_COLS if c not in chunk.columns]
+                if missing:
+                    report.errors.append(RowError(None, ', '.join(missing), f"Dataset missing required columns: {missing}"))
+                    return report
+                schema = _schema(list(chunk.columns))
+                writer = pq.ParquetWriter(tmp_path, schema)
+
+            chunk.index = pd.RangeIndex(report.rows_read, report.rows_read + len(chunk))
+            report.rows_read += len(chunk)
+            chunk_errors = sorted(_check_chunk(chunk, seen_ids), key=lambda error: error.row)
+            report.errors.extend(chunk_errors)
+
+            failed_rows = {error.row for error in chunk_errors}
+            valid = normalize_books(chunk[~chunk.index.isin(failed_rows)])
+            report.rows_valid += len(valid)
+            writer.write_table(pa.Table.from_pandas(valid, schema=schema, preserve_index=False))
+
+        if writer is None:
+            report.errors.append(RowError(None, '', "Dataset is empty"))
+            return report
+
+        writer.close()
+        writer = None
+        if report.ok:
+            os.replace(tmp_path, output_path)
+            report.output_path = output_path
+            if publish_meta:
+                write_meta(source_path, source)
+        return report
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate and compile a books CSV in chunks.")
+    parser.add_argument("source", nargs="?", default=BOOKS_FILE)
+    parser.add_argument("--output", help="Write the compiled catalog here instead of next to the CSV.")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    args = parser.parse_args(argv)
+
+    report = ingest_books(args.source, output_path=args.output, chunksize=args.chunksize)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=4, default=str))
+    else:
+        for error in report.errors:
+            location = f"row {error.row}" if error.row is not None else "header"
+            print(f"{location}: {error.message}")
+        print(f"{report.rows_valid}/{report.rows_read} rows valid, {len(report.errors)} errors")
+        if report.output_path:
+            print(f"Compiled catalog written to {report.output_path}")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
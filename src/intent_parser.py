@@ -0,0 +1,260 @@
+"""
+Deterministic parser for chat messages that fully specify a reading path.
+
+Maps messages like "beginner python, tactical, short" onto the
+`query_library` tool arguments so the app can skip the LLM round trip.
+Anything ambiguous, negated or partly unrecognized gets a low confidence
+and is left to the model.
+"""
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from src.books import DEPTHS, LEVELS, get_unique_values
+
+
+CONFIDENCE_THRESHOLD = 0.8
+
+CATEGORY_SYNONYMS = {
+    "art": ["arts", "artist"],
+    "biography": ["biographies", "memoirs"],
+    "business": ["entrepreneur", "company", "companies"],
+    "coding": ["code", "programming", "programmer", "software", "developer", "software engineering"],
+    "communication": ["communicating", "conversation", "conversations", "public speaking"],
+    "cooking": ["cook", "cuisine", "culinary", "recipes"],
+    "creativity": ["creative"],
+    "finance": ["money", "investing", "personal finance"],
+    "habits": ["habit"],
+    "health": ["healthy", "wellness"],
+    "history": ["historical"],
+    "philosophy": ["philosophical"],
+    "productivity": ["productive", "time management"],
+    "psychology": ["psychological"],
+    "science": ["scientific"],
+    "social": ["society", "sociology"],
+}
+
+SUBCATEGORY_SYNONYMS = {
+    "ai": ["machine learning", "artificial intelligence", "ml"],
+    "cold-war": ["cold war"],
+    "cs": ["computer science"],
+    "japanese-cooking": ["japanese food", "japanese cuisine"],
+    "stats": ["statistics", "statistical"],
+    "stoicism": ["stoic", "stoics"],
+    "ux": ["user experience"],
+    "web-dev": ["web development", "web dev", "webdev", "frontend"],
+    "wwii": ["ww2", "world war 2", "world war ii", "second world war"],
+}
+
+LEVEL_SYNONYMS = {
+    "beginner": [
+        "beginner", "beginners", "novice", "newbie", "new to", "just starting", "starting out",
+        "intro", "introduction", "introductory", "basics", "from scratch", "entry level",
+    ],
+    "intermediate": ["intermediate", "some experience", "mid level", "mid-level"],
+    "advanced": ["advanced", "expert", "experienced", "mastery", "senior"],
+}
+
+STYLE_SYNONYMS = {
+    "story-driven": ["story-driven", "story driven", "story", "stories", "narrative", "narratives", "storytelling"],
+    "tactical/how-to": [
+        "tactical", "how-to", "how to", "practical", "hands-on", "hands on", "actionable", "step-by-step",
+    ],
+    "academic": ["academic", "theoretical", "theory", "rigorous", "scholarly", "textbook", "textbooks"],
+    "reference": ["reference", "references", "handbook", "manual"],
+}
+
+DEPTH_SYNONYMS = {
+    "short": ["short", "quick", "brief", "concise", "three books", "3 books"],
+    "deep": ["deep", "deep dive", "deep-dive", "in-depth", "in depth", "comprehensive", "thorough", "extensive", "long"],
+}
+
+NEGATIONS = {"not", "no", "dont", "don't", "without", "avoid", "except", "never", "nothing", "neither", "nor"}
+
+STOPWORDS = {
+    "a", "about", "an", "and", "any", "at", "be", "book", "books", "but", "can", "do", "for", "get", "give",
+    "i", "i'd", "i'm", "im", "in", "into", "is", "it", "learn", "learning", "level", "like", "list",
+    "looking", "me", "my", "need", "of", "on", "or", "path", "please", "read", "reading", "recommend",
+    "recommendations", "show", "some", "something", "style", "the", "to", "topic", "want", "with",
+    "would", "depth", "am", "help", "teach", "study", "stuff", "things",
+}
+
+# Confidence multipliers for each way a parse can fall short of fully specified.
+_PENALTY_INFERRED_CATEGORY = 0.95
+_PENALTY_MISSING_LEVEL = 0.6
+_PENALTY_MISSING_STYLE = 0.9
+_PENALTY_MISSING_DEPTH = 0.9
+_PENALTY_CONFLICT = 0.3
+_PENALTY_NEGATION = 0.4
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'/+#-]*")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_TOKEN_RE.findall(str(text).lower().replace("\u2019", "'")))
+
+
+@dataclass(frozen=True)
+class IntentVocabulary:
+    """Phrase tables for one catalog: phrase -> values per slot."""
+
+    categories: Dict[str, str]
+    subcategories: Dict[str, FrozenSet[Tuple[str, str]]]
+    levels: Dict[str, str]
+    styles: Dict[str, str]
+    depths: Dict[str, str]
+    phrase_pattern: "re.Pattern[str]" = field(repr=False)
+
+    @classmethod
+    def from_books(cls, df: pd.DataFrame) -> "IntentVocabulary":
+        categories: Dict[str, str] = {}
+        subcategories: Dict[str, Set[Tuple[str, str]]] = {}
+        for category in get_unique_values(df, 'category'):
+            for phrase in [category] + CATEGORY_SYNONYMS.get(category.lower(), []):
+                categories[_normalize(phrase)] = category
+            in_category = df[df['category'] == category]
+            for subcategory in get_unique_values(in_category, 'subcategory'):
+                phrases = [subcategory, subcategory.replace("-", " ")]
+                phrases += SUBCATEGORY_SYNONYMS.get(subcategory.lower(), [])
+                for phrase in phrases:
+                    phrase = _normalize(phrase)
+                    # One-letter names (the C language) collide with ordinary words.
+                    if len(phrase) > 1:
+                        subcategories.setdefault(phrase, set()).add((category, subcategory))
+
+        levels = {_normalize(p): value for value, phrases in LEVEL_SYNONYMS.items() for p in phrases}
+        styles = {_normalize(p): value for value, phrases in STYLE_SYNONYMS.items() for p in phrases}
+        depths = {_normalize(p): value for value, phrases in DEPTH_SYNONYMS.items() for p in phrases}
+        phrases = set(categories) | set(subcategories) | set(levels) | set(styles) | set(depths)
+        # Longest phrases first so "deep dive" wins over "deep".
+        alternation = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+        pattern = re.compile(rf"(?<![a-z0-9'/+#-])(?:{alternation})(?![a-z0-9'/+#-])")
+        return cls(
+            categories=categories,
+            subcategories={phrase: frozenset(values) for phrase, values in subcategories.items()},
+            levels=levels,
+            styles=styles,
+            depths=depths,
+            phrase_pattern=pattern,
+        )
+
+
+@dataclass(frozen=True)
+class IntentParse:
+    args: Dict[str, Optional[str]]
+    confidence: float
+    unmatched: Tuple[str, ...] = ()
+    # Only the slots the message actually mentioned, without defaults.
+    slots: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def confident(self) -> bool:
+        return self.confidence >= CONFIDENCE_THRESHOLD
+
+
+def _pick(values: List[str]) -> Tuple[Optional[str], bool]:
+    """Returns (value, conflicting) for the distinct values one slot matched."""
+    distinct = list(dict.fromkeys(values))
+    if not distinct:
+        return None, False
+    return distinct[0], len(distinct) > 1
+
+
+def _resolve_topic(
+    vocab: IntentVocabulary, phrases: List[str]
+) -> Tuple[Optional[str], Optional[str], float]:
+    """Resolves category/subcategory from matched phrases; returns them with a confidence factor."""
+    named = list(dict.fromkeys(vocab.categories[p] for p in phrases if p in vocab.categories))
+    # Style/level/depth words such as "narrative" are never read as subcategories.
+    slot_words = set(vocab.levels) | set(vocab.styles) | set(vocab.depths)
+    sub_hits = [p for p in phrases if p in vocab.subcategories and p not in slot_words]
+
+    if len(named) == 2:
+        # "coding history" or "business psychology": one name is a subcategory of the other.
+        for category, other in (named, named[::-1]):
+            options = [sub for cat, sub in vocab.subcategories.get(_normalize(other), ()) if cat == category]
+            if options:
+                return category, options[0], 1.0
+        return None, None, 0.0
+    if len(named) > 2:
+        return None, None, 0.0
+
+    if named:
+        category = named[0]
+        subcategories = list(dict.fromkeys(
+            sub for phrase in sub_hits for cat, sub in vocab.subcategories[phrase]
+            if cat == category and phrase not in vocab.categories
+        ))
+        subcategory, conflict = _pick(subcategories)
+        return category, subcategory, _PENALTY_CONFLICT if conflict else 1.0
+
+    candidates = {pair for phrase in sub_hits for pair in vocab.subcategories[phrase]}
+    categories = {category for category, _ in candidates}
+    if len(categories) != 1:
+        return None, None, 0.0
+    subcategory, conflict = _pick([sub for _, sub in sorted(candidates)])
+    return categories.pop(), subcategory, _PENALTY_INFERRED_CATEGORY * (_PENALTY_CONFLICT if conflict else 1.0)
+
+
+def parse_intent(message: str, vocab: IntentVocabulary) -> IntentParse:
+    """
+    Maps a chat message onto query_library args with a confidence in [0, 1].
+
+    Confidence starts at 1 and is scaled down for each missing optional
+    slot, inferred or conflicting values, negations and the share of
+    content words that matched nothing. Without a category it is 0.
+    """
+    text = _normalize(message)
+    phrases = [match.group(0) for match in vocab.phrase_pattern.finditer(text)]
+    leftover = vocab.phrase_pattern.sub(" ", text).split()
+    unmatched = tuple(word for word in leftover if word not in STOPWORDS and word not in NEGATIONS)
+    negated = any(word in NEGATIONS for word in leftover)
+
+    category, subcategory, confidence = _resolve_topic(vocab, phrases)
+    level, level_conflict = _pick([vocab.levels[p] for p in phrases if p in vocab.levels])
+    style, style_conflict = _pick([vocab.styles[p] for p in phrases if p in vocab.styles])
+    depth, depth_conflict = _pick([vocab.depths[p] for p in phrases if p in vocab.depths])
+
+    if level is None:
+        confidence *= _PENALTY_MISSING_LEVEL
+    if style is None:
+        confidence *= _PENALTY_MISSING_STYLE
+    if depth is None:
+        confidence *= _PENALTY_MISSING_DEPTH
+    if level_conflict or style_conflict or depth_conflict:
+        confidence *= _PENALTY_CONFLICT
+    if negated:
+        confidence *= _PENALTY_NEGATION
+    content_words = len(unmatched) + len(phrases)
+    if content_words:
+        confidence *= 0.5 + 0.5 * len(phrases) / content_words
+
+    found = {
+        "category": category,
+        "subcategory": subcategory,
+        "level": level,
+        "style": style,
+        "depth": depth,
+    }
+    args = dict(found, level=level or LEVELS[0], depth=depth or DEPTHS[0])
+    slots = {key: value for key, value in found.items() if value}
+    return IntentParse(args=args, confidence=round(confidence, 4), unmatched=unmatched, slots=slots)
+
+
+_vocab_cache: Optional[Tuple[int, IntentVocabulary]] = None
+_vocab_cache_lock = threading.Lock()
+
+
+def get_intent_vocabulary(books: pd.DataFrame, version: int) -> IntentVocabulary:
+    """Returns the vocabulary for a catalog version, building it once per version."""
+    global _vocab_cache
+    cached = _vocab_cache
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _vocab_cache_lock:
+        if _vocab_cache is None or _vocab_cache[0] != version:
+            _vocab_cache = (version, IntentVocabulary.from_books(books))
+        return _vocab_cache[1]
@@ -1,13 +1,24 @@
+import asyncio
+import collections
+import json
 import logging
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 
-from openai import OpenAI, OpenAIError
-from typing import List, Dict, Any
+from openai import AsyncOpenAI, OpenAI, OpenAIError
+from typing import List, Dict, Any, Awaitable, Callable, Iterator, Optional, Tuple, TypeVar
 
-from src.books import load_books, get_unique_values
+from src.metrics import METRICS, MetricsRegistry
+from src.rationale_cache import RationaleCache, rationale_key
 
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class LLMClientError(RuntimeError):
     """Raised when an LLM request fails in a way the UI can explain."""
@@ -32,66 +43,389 @@ def _message_for_openai_error(exc: OpenAIError) -> str:
 
     return "The OpenAI request failed. Please try again."
 
-# Load data dynamically to constrain the LLM
-try:
-    _df = load_books()
-    _valid_categories = get_unique_values(_df, 'category')
-except Exception:
-    _df = None
-    _valid_categories = []
-
-# Fallback if data is missing (prevents crash on empty DB)
-if not _valid_categories:
-    _valid_categories = ["habits", "coding", "history", "cooking", "productivity", "business"]
-
-_categories_str = ", ".join([c.title() for c in _valid_categories])
-
-# Define the tool structure for OpenAI function calling
-TOOLS = [
-    {
-        "type": "function",
-        "function": {
-            "name": "query_library",
-            "description": "Search the Halchemy Library for a curated reading path based on user preferences. Call this ONLY when you have identified the topic, skill level, and style preferences.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "category": {
-                        "type": "string",
-                        "enum": _valid_categories,
-                        "description": "The main topic category."
-                    },
-                    "subcategory": {
-                        "type": "string",
-                        "description": "Specific niche (e.g., 'python', 'WWII', 'japanese-cooking'). Optional."
-                    },
-                    "level": {
-                        "type": "string",
-                        "enum": ["beginner", "intermediate", "advanced"],
-                        "description": "The user's current skill level."
-                    },
-                    "style": {
-                        "type": "string",
-                        "enum": ["story-driven", "tactical/how-to", "academic", "reference"],
-                        "description": "The preferred writing style of the books."
+# Client-side limits, kept below the account's OpenAI rate limits.
+REQUESTS_PER_MINUTE = 500
+TOKENS_PER_MINUTE = 200_000
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+# Upper bound on one async call, including time spent queued and retrying.
+LLM_TIMEOUT_SECONDS = 30.0
+CHARS_PER_TOKEN = 4
+# Rough per-message framing cost in the chat format (role, separators).
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_RETRYABLE_ERRORS = {"RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError"}
+_RETRYABLE_STATUSES = {408, 409, 429}
+
+
+def estimate_tokens(text: Any) -> int:
+    """Approximates the token count of text (or a JSON-serializable value) at ~4 chars per token."""
+    if not isinstance(text, str):
+        text = json.dumps(text)
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(estimate_tokens(m.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limits, timeouts, connection drops and 5xx responses are worth retrying."""
+    if not isinstance(exc, OpenAIError):
+        return False
+    if type(exc).__name__ in _RETRYABLE_ERRORS:
+        return True
+    status = getattr(exc, "status_code", None)
+    return status in _RETRYABLE_STATUSES or (status is not None and status >= 500)
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units a minute up to `capacity`.
+
+    reserve() always takes its units, letting the balance go negative, and
+    returns how long the caller must wait; callers therefore queue in
+    arrival order instead of racing for the next refill.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+
+class ConcurrencySlots:
+    """
+    A cap on requests in flight shared by threads and event loops.
+
+    Waiters are served first come, first served: release() hands the slot
+    straight to the oldest waiter, whether it is a thread blocked in
+    acquire() or a coroutine awaiting aacquire() on any loop.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._lock = threading.Lock()
+        self._waiters: "collections.deque[Any]" = collections.deque()
+
+    def _try_take(self) -> bool:
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._try_take():
+                return
+            handed_over = threading.Event()
+            self._waiters.append(handed_over)
+        handed_over.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_take():
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    queued = True
+                except ValueError:
+                    queued = False
+            if not queued:
+                # The slot was handed over as we were cancelled; pass it on.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                try:
+                    loop.call_soon_threadsafe(_hand_over, future)
+                except RuntimeError:
+                    continue  # its loop has closed
+                return
+            self.in_use -= 1
+
+
+def _hand_over(future: "asyncio.Future[None]") -> None:
+    # A cancelled waiter releases the slot itself; see aacquire().
+    if not future.done():
+        future.set_result(None)
+
+
+class RequestScheduler:
+    """
+    Shared gate in front of every OpenAI call in this process.
+
+    Each call waits for a concurrency slot and for room in the request and
+    token buckets, then runs with up to `max_retries` retries on retryable
+    errors, sleeping a fully jittered exponential backoff (or the server's
+    Retry-After, if longer) between attempts. Queue depth, wait time,
+    retries and failures are recorded in `metrics` under "llm.".
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = TOKENS_PER_MINUTE,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE_SECONDS,
+        backoff_max: float = BACKOFF_MAX_SECONDS,
+        metrics: MetricsRegistry = METRICS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Callable[[], float] = random.random,
+        async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = metrics
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng
+        self._async_sleep = async_sleep
+        self.max_concurrency = max_concurrency
+        # One pool for call(), stream() and acall(), so mixing them keeps the cap.
+        self._slots = ConcurrencySlots(max_concurrency)
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+
+    def backoff(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        delay = self._rng() * min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        retry_after = _retry_after(exc) if exc is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def _wait_for_capacity(self, estimated_tokens: int) -> None:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if wait > 0:
+            self._sleep(wait)
+
+    def _enqueue(self) -> None:
+        with self._lock:
+            self.queue_depth += 1
+            self.metrics.observe("llm.queue_depth", self.queue_depth)
+
+    def _dequeue(self) -> None:
+        with self._lock:
+            self.queue_depth -= 1
+
+    def _acquire(self, estimated_tokens: int) -> None:
+        """Takes a concurrency slot and waits for rate capacity; the caller releases the slot."""
+        queued_at = self._clock()
+        self._enqueue()
+        try:
+            self._slots.acquire()
+            try:
+                self._wait_for_capacity(estimated_tokens)
+            except BaseException:
+                self._slots.release()
+                raise
+        finally:
+            self._dequeue()
+        self.metrics.observe("llm.wait_seconds", self._clock() - queued_at)
+
+    def _attempt(self, func: Callable[[], T], estimated_tokens: int) -> T:
+        attempt = 0
+        while True:
+            self.metrics.increment("llm.requests")
+            try:
+                return func()
+            except Exception as exc:
+                if attempt >= self.max_retries or not is_retryable(exc):
+                    self.metrics.increment("llm.failures")
+                    raise
+                delay = self.backoff(attempt, exc)
+                logger.info("Retrying OpenAI request after %s in %.2fs", type(exc).__name__, delay)
+                self.metrics.increment("llm.retries")
+                self._sleep(delay)
+                self._wait_for_capacity(estimated_tokens)
+                attempt += 1
+
+    def call(self, func: Callable[[], T], estimated_tokens: int = 0) -> T:
+        """Runs `func` (one OpenAI request) under the limits; re-raises its last error."""
+        self._acquire(estimated_tokens)
+        try:
+            return self._attempt(func, estimated_tokens)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def stream(self, func: Callable[[], T], estimated_tokens: int = 0) -> Iterator[T]:
+        """
+        Opens a streamed response like call(), but keeps the concurrency slot
+        until the block exits, so a stream being read still counts against
+        `max_concurrency`. The response is closed on exit if it supports it.
+        """
+        self._acquire(estimated_tokens)
+        try:
+            response = self._attempt(func, estimated_tokens)
+            try:
+                yield response
+            finally:
+                close = getattr(response, "close", None)
+                if callable(close):
+                    close()
+        finally:
+            self._slots.release()
+
+    async def _await_capacity(self, estimated_tokens: int) -> None:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if wait > 0:
+            await self._async_sleep(wait)
+
+    async def acall(self, func: Callable[[], Awaitable[T]], estimated_tokens: int = 0) -> T:
+        """
+        Async variant of call(): shares the rate buckets and metrics, but
+        awaits instead of sleeping. Both draw on the same `max_concurrency`
+        slots. Cancelling the caller cancels the request in flight.
+        """
+        queued_at = self._clock()
+        self._enqueue()
+        try:
+            await self._slots.aacquire()
+        finally:
+            self._dequeue()
+
+        try:
+            await self._await_capacity(estimated_tokens)
+            self.metrics.observe("llm.wait_seconds", self._clock() - queued_at)
+            attempt = 0
+            while True:
+                self.metrics.increment("llm.requests")
+                try:
+                    return await func()
+                except Exception as exc:
+                    if attempt >= self.max_retries or not is_retryable(exc):
+                        self.metrics.increment("llm.failures")
+                        raise
+                    delay = self.backoff(attempt, exc)
+                    logger.info("Retrying OpenAI request after %s in %.2fs", type(exc).__name__, delay)
+                    self.metrics.increment("llm.retries")
+                    await self._async_sleep(delay)
+                    await self._await_capacity(estimated_tokens)
+                    attempt += 1
+        finally:
+            self._slots.release()
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """Returns the scheduler shared by every OpenAI call in this process."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler()
+    return _scheduler
+
+# Used if the catalog is missing or empty (prevents crash on empty DB)
+FALLBACK_CATEGORIES = ["habits", "coding", "history", "cooking", "productivity", "business"]
+
+_PromptCacheEntry = Tuple[int, Tuple[str, ...], List[Dict[str, Any]], str]
+_prompt_cache: Optional[_PromptCacheEntry] = None
+_prompt_cache_lock = threading.Lock()
+# After the catalog fails to load, the fallback prompt is served without
+# retrying the load until this monotonic time.
+CATALOG_RETRY_SECONDS = 30.0
+_catalog_retry_at = 0.0
+
+
+def _build_tools(categories: List[str]) -> List[Dict[str, Any]]:
+    """Defines the tool structure for OpenAI function calling."""
+    from src.books import DEPTHS, LEVELS, STYLES
+
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": "query_library",
+                "description": "Search the Halchemy Library for a curated reading path based on user preferences. Call this ONLY when you have identified the topic, skill level, and style preferences.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "category": {
+                            "type": "string",
+                            "enum": categories,
+                            "description": "The main topic category."
+                        },
+                        "subcategory": {
+                            "type": "string",
+                            "description": "Specific niche (e.g., 'python', 'WWII', 'japanese-cooking'). Optional."
+                        },
+                        "level": {
+                            "type": "string",
+                            "enum": LEVELS,
+                            "description": "The user's current skill level."
+                        },
+                        "style": {
+                            "type": "string",
+                            "enum": STYLES,
+                            "description": "The preferred writing style of the books."
+                        },
+                        "depth": {
+                            "type": "string",
+                            "enum": DEPTHS,
+                            "description": "Length of the path: 'short' (3 books) or 'deep' (5-7 books)."
+                        }
                     },
-                    "depth": {
-                        "type": "string",
-                        "enum": ["short", "deep"],
-                        "description": "Length of the path: 'short' (3 books) or 'deep' (5-7 books)."
-                    }
-                },
-                "required": ["category", "level"]
+                    "required": ["category", "level"]
+                }
             }
         }
-    }
-]
+    ]
+
 
-SYSTEM_PROMPT = f"""You are the Halchemy Library Librarian. Your goal is to help users learn new skills by recommending a "book path" (a sequence of books).
+def _build_system_prompt(categories: List[str]) -> str:
+    categories_str = ", ".join([c.title() for c in categories])
+    return f"""You are the Halchemy Library Librarian. Your goal is to help users learn new skills by recommending a "book path" (a sequence of books).
 
 You have access to a tool called `query_library`.
 To use it, you must first understand the user's:
-1. **Topic** (Must map to: {_categories_str}).
+1. **Topic** (Must map to: {categories_str}).
 2. **Current Level** (Beginner, Intermediate, Advanced).
 3. **Style Preference** (Story-driven/Narrative vs. Tactical/How-to).
 4. **Depth** (Short path vs. Deep dive).
@@ -104,26 +438,101 @@ To use it, you must first understand the user's:
 - Once you have enough info, CALL the `query_library` function. Do not just list book titles yourself.
 """
 
+
+def _catalog_prompt() -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Returns (tools, system prompt) for the live catalog.
+
+    Both are built on first use rather than at import, then memoized per
+    catalog version; a new version only rebuilds them if its categories
+    actually changed. If the catalog cannot be loaded, the fallback prompt
+    is reused for CATALOG_RETRY_SECONDS before loading is tried again.
+    """
+    global _prompt_cache, _catalog_retry_at
+    cached = _prompt_cache
+    if cached is not None and cached[0] == -1 and time.monotonic() < _catalog_retry_at:
+        return cached[2], cached[3]
+
+    # Imported here so importing this module never loads pandas or the catalog.
+    from src.books import get_unique_values
+    from src.catalog import get_catalog
+
+    try:
+        snapshot = get_catalog().current()
+        version = snapshot.version
+    except Exception:
+        logger.warning("Catalog unavailable; using fallback categories", exc_info=True)
+        snapshot, version = None, -1
+        _catalog_retry_at = time.monotonic() + CATALOG_RETRY_SECONDS
+
+    if cached is not None and cached[0] == version and version != -1:
+        return cached[2], cached[3]
+
+    with _prompt_cache_lock:
+        categories = []
+        if snapshot is not None:
+            try:
+                categories = get_unique_values(snapshot.books, 'category')
+            except Exception:
+                categories = []
+        if not categories:
+            categories = list(FALLBACK_CATEGORIES)
+
+        cached = _prompt_cache
+        if cached is not None and cached[1] == tuple(categories):
+            tools, prompt = cached[2], cached[3]
+        else:
+            tools, prompt = _build_tools(categories), _build_system_prompt(categories)
+        _prompt_cache = (version, tuple(categories), tools, prompt)
+        return tools, prompt
+
+
+def get_tools() -> List[Dict[str, Any]]:
+    """Returns the OpenAI tool schema, constrained to the live catalog's categories."""
+    return _catalog_prompt()[0]
+
+
+def get_system_prompt() -> str:
+    """Returns the librarian system prompt for the live catalog's categories."""
+    return _catalog_prompt()[1]
+
+
+def __getattr__(name: str) -> Any:
+    # TOOLS and SYSTEM_PROMPT used to be module constants built at import time.
+    if name == "TOOLS":
+        return get_tools()
+    if name == "SYSTEM_PROMPT":
+        return get_system_prompt()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def get_chat_completion(
     client: OpenAI,
     messages: List[Dict[str, Any]],
     model: str = "gpt-4o-mini",
-    temperature: float = 0.7
+    temperature: float = 0.7,
+    scheduler: Optional[RequestScheduler] = None,
 ) -> Any:
     """
     Sends the chat history to OpenAI and returns the response.
     The response might be a text message OR a tool call.
+    Goes through the shared RequestScheduler, so transient failures are
+    retried before they surface as an LLMClientError.
     """
     # Ensure system prompt is at the start
-    full_messages = [{"role": "system", "content": SYSTEM_PROMPT}] + messages
+    tools, system_prompt = _catalog_prompt()
+    full_messages = [{"role": "system", "content": system_prompt}] + messages
+    scheduler = scheduler or get_request_scheduler()
 
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=full_messages,
-            tools=TOOLS,
-            tool_choice="auto",
-            temperature=temperature
+        response = scheduler.call(
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=full_messages,
+                tools=tools,
+                tool_choice="auto",
+                temperature=temperature
+            ),
+            estimated_tokens=estimate_message_tokens(full_messages) + estimate_tokens(tools),
         )
     except OpenAIError as exc:
         logger.exception("OpenAI chat completion failed")
@@ -131,15 +540,56 @@ def get_chat_completion(
     
     return response.choices[0].message
 
-def get_sequence_rationale(
-    client: OpenAI,
-    user_query: str,
-    books: List[Dict[str, Any]],
-    model: str = "gpt-4o-mini"
-) -> str:
+TIMEOUT_MESSAGE = "OpenAI took too long to respond. Please try again."
+
+
+async def aget_chat_completion(
+    client: AsyncOpenAI,
+    messages: List[Dict[str, Any]],
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.7,
+    scheduler: Optional[RequestScheduler] = None,
+    timeout: float = LLM_TIMEOUT_SECONDS,
+) -> Any:
     """
-    Generates a short explanation for why this specific sequence of books was chosen.
+    Async variant of get_chat_completion.
+
+    Raises LLMClientError if no response arrives within `timeout` seconds,
+    queueing and retries included.
     """
+    tools, system_prompt = _catalog_prompt()
+    full_messages = [{"role": "system", "content": system_prompt}] + messages
+    scheduler = scheduler or get_request_scheduler()
+
+    try:
+        response = await asyncio.wait_for(
+            scheduler.acall(
+                lambda: client.chat.completions.create(
+                    model=model,
+                    messages=full_messages,
+                    tools=tools,
+                    tool_choice="auto",
+                    temperature=temperature
+                ),
+                estimated_tokens=estimate_message_tokens(full_messages) + estimate_tokens(tools),
+            ),
+            timeout,
+        )
+    except asyncio.TimeoutError as exc:
+        logger.warning("OpenAI chat completion timed out after %.1fs", timeout)
+        raise LLMClientError(TIMEOUT_MESSAGE) from exc
+    except OpenAIError as exc:
+        logger.exception("OpenAI chat completion failed")
+        raise LLMClientError(_message_for_openai_error(exc)) from exc
+
+    return response.choices[0].message
+
+RATIONALE_FALLBACK = "I couldn't generate a rationale right now, but your reading path is still ready."
+TTFT_METRIC = "rationale.time_to_first_token_seconds"
+
+
+def rationale_messages(user_query: str, books: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Builds the chat messages that ask for a rationale of `books` as a path for `user_query`."""
     book_titles = [f"{i+1}. {b['title']} by {b['author']}" for i, b in enumerate(books)]
     book_list_str = "\n".join(book_titles)
     
@@ -152,17 +602,195 @@ def get_sequence_rationale(
     Explain in 1-2 sentences why this specific sequence fits their goal. 
     Focus on the progression (e.g., "starts with X, moves to Y").
     """
-    
+    return [
+        {"role": "system", "content": "You are a helpful librarian explaining a reading list."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _cached_rationale(
+    cache: Optional[RationaleCache],
+    user_query: str,
+    books: List[Dict[str, Any]],
+    model: str,
+    path_only: bool,
+    store: Optional[RationaleCache] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Returns (cache key, stored rationale); the key is None without a cache.
+
+    The offline `store` is consulted first, by path alone, then the cache.
+    """
+    book_ids = [b.get('id', f"{b['title']}|{b['author']}") for b in books]
+    if store is not None:
+        try:
+            precomputed = store.get(rationale_key(user_query, book_ids, model, path_only=True))
+        except sqlite3.Error as exc:
+            logger.warning("Could not read the rationale store: %s", exc)
+            precomputed = None
+        if precomputed is not None:
+            return None, precomputed
+    if cache is None:
+        return None, None
+    key = rationale_key(user_query, book_ids, model, path_only=path_only)
+    try:
+        return key, cache.get(key)
+    except sqlite3.Error as exc:
+        logger.warning("Could not read the rationale cache: %s", exc)
+        return key, None
+
+
+def _store_rationale(cache: Optional[RationaleCache], key: Optional[str], rationale: Optional[str]) -> None:
+    if cache is None or key is None or not rationale:
+        return
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a helpful librarian explaining a reading list."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
+        cache.put(key, rationale)
+    except sqlite3.Error as exc:
+        logger.warning("Could not store the rationale in the cache: %s", exc)
+
+
+def get_sequence_rationale(
+    client: OpenAI,
+    user_query: str,
+    books: List[Dict[str, Any]],
+    model: str = "gpt-4o-mini",
+    cache: Optional[RationaleCache] = None,
+    path_only: bool = False,
+    scheduler: Optional[RequestScheduler] = None,
+    store: Optional[RationaleCache] = None,
+) -> str:
+    """
+    Generates a short explanation for why this specific sequence of books was chosen.
+
+    With a `cache`, a rationale already generated for the same query, book
+    order and model is returned without calling OpenAI; `path_only` ignores
+    the query when matching. A `store` of rationales precomputed offline by
+    src.batch_rationales is checked before the cache. Fallback messages are
+    never cached.
+    """
+    key, cached = _cached_rationale(cache, user_query, books, model, path_only, store)
+    if cached is not None:
+        return cached
+
+    messages = rationale_messages(user_query, books)
+    try:
+        response = (scheduler or get_request_scheduler()).call(
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.7
+            ),
+            estimated_tokens=estimate_message_tokens(messages),
         )
-        return response.choices[0].message.content
+        rationale = response.choices[0].message.content
     except OpenAIError as exc:
         logger.warning("OpenAI rationale generation failed: %s", exc, exc_info=True)
-        return "I couldn't generate a rationale right now, but your reading path is still ready."
+        return RATIONALE_FALLBACK
+
+    _store_rationale(cache, key, rationale)
+    return rationale
+
+
+def stream_sequence_rationale(
+    client: OpenAI,
+    user_query: str,
+    books: List[Dict[str, Any]],
+    model: str = "gpt-4o-mini",
+    cache: Optional[RationaleCache] = None,
+    path_only: bool = False,
+    metrics: MetricsRegistry = METRICS,
+    scheduler: Optional[RequestScheduler] = None,
+    store: Optional[RationaleCache] = None,
+) -> Iterator[str]:
+    """
+    Streaming variant of get_sequence_rationale; yields text as it arrives.
+
+    A stored or cached rationale is yielded whole. If OpenAI fails before or during the
+    stream, the fallback message is yielded (after a blank line if partial
+    text was already shown) and nothing is cached. Time to first token is
+    recorded in `metrics` under TTFT_METRIC.
+    """
+    key, cached = _cached_rationale(cache, user_query, books, model, path_only, store)
+    if cached is not None:
+        yield cached
+        return
+
+    started = time.perf_counter()
+    parts: List[str] = []
+    messages = rationale_messages(user_query, books)
+    try:
+        # Only opening the stream is retried; a stream that fails midway falls
+        # back instead of restarting. The slot is held until the stream is
+        # exhausted or this generator is closed.
+        with (scheduler or get_request_scheduler()).stream(
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.7,
+                stream=True,
+            ),
+            estimated_tokens=estimate_message_tokens(messages),
+        ) as stream:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if not text:
+                    continue
+                if not parts:
+                    metrics.observe(TTFT_METRIC, time.perf_counter() - started)
+                parts.append(text)
+                yield text
+    except OpenAIError as exc:
+        logger.warning("OpenAI rationale stream failed: %s", exc, exc_info=True)
+        metrics.increment("rationale.stream_errors")
+        yield f"\n\n{RATIONALE_FALLBACK}" if parts else RATIONALE_FALLBACK
+        return
+
+    if not parts:
+        yield RATIONALE_FALLBACK
+        return
+    _store_rationale(cache, key, "".join(parts))
+
+
+async def aget_sequence_rationale(
+    client: AsyncOpenAI,
+    user_query: str,
+    books: List[Dict[str, Any]],
+    model: str = "gpt-4o-mini",
+    cache: Optional[RationaleCache] = None,
+    path_only: bool = False,
+    scheduler: Optional[RequestScheduler] = None,
+    store: Optional[RationaleCache] = None,
+    timeout: float = LLM_TIMEOUT_SECONDS,
+) -> str:
+    """
+    Async variant of get_sequence_rationale.
+
+    A timeout yields the fallback message like any other failure. Cache
+    reads and writes run in a worker thread so SQLite never blocks the loop.
+    """
+    key, cached = await asyncio.to_thread(_cached_rationale, cache, user_query, books, model, path_only, store)
+    if cached is not None:
+        return cached
+
+    messages = rationale_messages(user_query, books)
+    try:
+        response = await asyncio.wait_for(
+            (scheduler or get_request_scheduler()).acall(
+                lambda: client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.7
+                ),
+                estimated_tokens=estimate_message_tokens(messages),
+            ),
+            timeout,
+        )
+        rationale = response.choices[0].message.content
+    except (OpenAIError, asyncio.TimeoutError) as exc:
+        logger.warning("OpenAI rationale generation failed: %r", exc, exc_info=True)
+        return RATIONALE_FALLBACK
+
+    await asyncio.to_thread(_store_rationale, cache, key, rationale)
+    return rationale
@@ -0,0 +1,110 @@
+"""
+One event loop per process for async OpenAI calls.
+
+Streamlit runs each session's script on its own thread with no event loop.
+Calls are submitted to a shared loop on a daemon thread and use the pooled
+async clients of the ClientRegistry, so many sessions can have requests in
+flight while only the loop thread does network I/O. A newer call from the
+same session cancels the one still running.
+"""
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+
+from openai import AsyncOpenAI
+
+from src.client_registry import ClientRegistry, get_client_registry
+from src.llm_client import LLMClientError
+
+
+T = TypeVar("T")
+
+
+class LLMCallCancelled(LLMClientError):
+    """Raised to the waiting thread when a newer call from its session replaced this one."""
+
+    def __init__(self):
+        super().__init__("This request was cancelled because a newer message arrived.")
+
+
+class AsyncLLMRunner:
+    """Runs coroutines on a private event loop and tracks the latest call per session."""
+
+    def __init__(self, name: str = "llm-loop", registry: Optional[ClientRegistry] = None):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+        self.registry = registry or get_client_registry()
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def client(self, api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+        """Returns the registry's async client; only this runner's loop uses it."""
+        client = self.registry.get_async(api_key, base_url)
+        for retired in self.registry.take_retired():
+            asyncio.run_coroutine_threadsafe(retired.close(), self.loop)
+        return client
+
+    def submit(self, coro: Coroutine[Any, Any, T], session_id: Optional[str] = None) -> "concurrent.futures.Future[T]":
+        """Schedules `coro` on the loop, cancelling the previous call from `session_id`."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if session_id is None:
+            return future
+        with self._lock:
+            previous = self._inflight.get(session_id)
+            self._inflight[session_id] = future
+        if previous is not None:
+            previous.cancel()
+        future.add_done_callback(lambda done: self._forget(session_id, done))
+        return future
+
+    def _forget(self, session_id: str, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            if self._inflight.get(session_id) is future:
+                del self._inflight[session_id]
+
+    def run(self, coro: Coroutine[Any, Any, T], session_id: Optional[str] = None) -> T:
+        """Submits `coro` and blocks until it finishes; raises LLMCallCancelled if it was replaced."""
+        future = self.submit(coro, session_id)
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError as exc:
+            raise LLMCallCancelled() from exc
+
+    def cancel(self, session_id: str) -> bool:
+        """Cancels the call in flight for `session_id`, if any."""
+        with self._lock:
+            future = self._inflight.pop(session_id, None)
+        return future is not None and future.cancel()
+
+    def close(self) -> None:
+        """Cancels pending calls, closes the registry's async clients and stops the loop."""
+        with self._lock:
+            self._inflight.clear()
+
+        async def shutdown() -> None:
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.registry.aclose()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+_runner: Optional[AsyncLLMRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_async_runner() -> AsyncLLMRunner:
+    """Returns the runner shared by every session in this process."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = AsyncLLMRunner()
+    return _runner
@@ -0,0 +1,141 @@
+"""
+In-process counters and latency histograms, with a Prometheus text view.
+"""
+import math
+import re
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional
+
+MAX_SAMPLES = 1024
+
+
+def _percentile(ordered, fraction: float) -> float:
+    # Nearest-rank percentile over sorted samples.
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Histogram:
+    """Keeps a total count and sum plus the most recent `max_samples` observations."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "p50": _percentile(ordered, 0.50),
+            "p95": _percentile(ordered, 0.95),
+            "p99": _percentile(ordered, 0.99),
+            "max": ordered[-1],
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe named counters and histograms for one process."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.max_samples)
+            histogram.observe(value)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def histogram(self, name: str) -> Dict[str, float]:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            return histogram.summary() if histogram is not None else {"count": 0}
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {name: h.summary() for name, h in self._histograms.items()},
+            }
+
+    def reset(self, prefix: Optional[str] = None) -> None:
+        with self._lock:
+            for store in (self._counters, self._histograms):
+                for name in [n for n in store if prefix is None or n.startswith(prefix)]:
+                    del store[name]
+
+
+METRICS = MetricsRegistry()
+
+
+def _metric_name(name: str, namespace: str) -> str:
+    return f"{namespace}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+
+def render_prometheus(registry: MetricsRegistry, namespace: str = "halchemy") -> str:
+    """
+    Formats a snapshot in the Prometheus text exposition format.
+
+    Counters become counters; histograms become summaries with the p50,
+    p95 and p99 of their recent samples plus the all-time sum and count.
+    """
+    snapshot = registry.snapshot()
+    lines: List[str] = []
+    for name, value in sorted(snapshot["counters"].items()):
+        metric = _metric_name(name, namespace)
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, summary in sorted(snapshot["histograms"].items()):
+        metric = _metric_name(name, namespace)
+        lines.append(f"# TYPE {metric} summary")
+        for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+            lines.append(f'{metric}{{quantile="{quantile}"}} {summary[key]}')
+        lines += [
+            f"{metric}_sum {summary['mean'] * summary['count']}",
+            f"{metric}_count {summary['count']}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(port: int, registry: MetricsRegistry = METRICS, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serves render_prometheus(registry) at /metrics from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus(registry).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,75 @@
+"""
+Runs the network work for a new reading path concurrently.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.cover_cache import CoverCache
+from src.llm_client import stream_sequence_rationale
+from src.rationale_cache import RationaleCache
+from src.tracing import in_current_context, span
+from src.utils import CoverKey, fetch_book_covers
+
+
+logger = logging.getLogger(__name__)
+
+# Cover batches fan out on their own pool; this one only runs the batch calls.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="path-extras")
+
+
+@dataclass(frozen=True)
+class PathExtras:
+    rationale: str
+    covers: Dict[CoverKey, Optional[str]]
+
+
+def assemble_path_extras(
+    client: Any,
+    user_query: str,
+    books: List[Dict[str, Any]],
+    model: str = "gpt-4o-mini",
+    rationale_cache: Optional[RationaleCache] = None,
+    rationale_store: Optional[RationaleCache] = None,
+    cover_cache: Optional[CoverCache] = None,
+    on_rationale: Optional[Callable[[str], None]] = None,
+    fetch_covers: Callable[..., Dict[CoverKey, Optional[str]]] = fetch_book_covers,
+    stream_rationale: Callable[..., Iterator[str]] = stream_sequence_rationale,
+) -> PathExtras:
+    """
+    Fetches every cover in the background while streaming the rationale.
+
+    The rationale is consumed on the calling thread so `on_rationale` can
+    update the UI with the text so far; covers are collected once it is
+    done. The total wait is the slower of the two rather than their sum.
+    A failed cover batch yields no covers, which the UI already handles.
+    """
+    with span("assemble_path_extras", books=len(books)):
+        covers_future = _executor.submit(in_current_context(_fetch_covers), fetch_covers, books, cover_cache)
+
+        rationale = ""
+        with span("get_sequence_rationale", model=model) as current:
+            for chunk in stream_rationale(
+                client, user_query, books, model=model, cache=rationale_cache, store=rationale_store
+            ):
+                rationale += chunk
+                if on_rationale is not None:
+                    on_rationale(rationale)
+            current.set(chars=len(rationale))
+
+        try:
+            covers = covers_future.result()
+        except Exception:
+            logger.warning("Cover prefetch failed", exc_info=True)
+            covers = {}
+        return PathExtras(rationale=rationale, covers=covers)
+
+
+def _fetch_covers(
+    fetch_covers: Callable[..., Dict[CoverKey, Optional[str]]],
+    books: List[Dict[str, Any]],
+    cover_cache: Optional[CoverCache],
+) -> Dict[CoverKey, Optional[str]]:
+    with span("fetch_book_covers", books=len(books)):
+        return fetch_covers(books, cache=cover_cache)
@@ -0,0 +1,151 @@
+"""
+Precomputed learning paths for every query the tool schema can express.
+
+    python -m src.path_table build   # write data/books.paths.json
+    python -m src.path_table check   # confirm it still matches the live logic
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.books import DATA_DIR, DEPTHS, LEVELS, STYLES, get_unique_values, load_books
+from src.recommendations import QueryKey, compute_path, normalize_query
+
+
+logger = logging.getLogger(__name__)
+
+PATHS_FILE = os.path.join(DATA_DIR, 'books.paths.json')
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Hashes each row's values; the catalog keeps these so edits only rehash the rows they touch."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def catalog_fingerprint(df: pd.DataFrame, hashes: Optional[np.ndarray] = None) -> str:
+    """Hashes catalog contents so a table is only used with the frame it was built from."""
+    digest = hashlib.sha256(",".join(map(str, df.columns)).encode("utf-8"))
+    digest.update((row_hashes(df) if hashes is None else hashes).tobytes())
+    return digest.hexdigest()
+
+
+def iter_queries(df: pd.DataFrame) -> Iterator[Dict[str, Optional[str]]]:
+    """Yields tool-call args for every category/subcategory/level/style/depth combination."""
+    for category in get_unique_values(df, 'category'):
+        in_category = df[df['category'] == category]
+        subcategories = [None] + get_unique_values(in_category, 'subcategory')
+        for subcategory, level, style, depth in itertools.product(
+            subcategories, LEVELS, [None] + STYLES, DEPTHS
+        ):
+            yield {
+                "category": category,
+                "subcategory": subcategory,
+                "level": level,
+                "style": style,
+                "depth": depth,
+            }
+
+
+class PathTable:
+    """Maps normalized queries to the book IDs of their learning path."""
+
+    def __init__(self, fingerprint: str, paths: Dict[QueryKey, Tuple[object, ...]]):
+        self.fingerprint = fingerprint
+        self.paths = paths
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def lookup(self, query: QueryKey) -> Optional[Tuple[object, ...]]:
+        return self.paths.get(query)
+
+    def to_dict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "paths": [list(query) + [list(ids)] for query, ids in self.paths.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PathTable":
+        paths = {tuple(entry[:-1]): tuple(entry[-1]) for entry in data["paths"]}
+        return cls(data["fingerprint"], paths)
+
+
+def build_path_table(df: pd.DataFrame) -> PathTable:
+    """Runs the live filter/sequence logic over the whole parameter space."""
+    paths = {}
+    for args in iter_queries(df):
+        path = compute_path(df, args)
+        paths[normalize_query(args)] = tuple(path['id'].tolist())
+    return PathTable(catalog_fingerprint(df), paths)
+
+
+def check_path_table(table: PathTable, df: pd.DataFrame) -> List[QueryKey]:
+    """Returns the queries whose stored path no longer matches the live logic."""
+    live = build_path_table(df)
+    if table.fingerprint != live.fingerprint:
+        logger.warning("Path table was built from a different catalog")
+    mismatched = [query for query, ids in live.paths.items() if table.lookup(query) != ids]
+    mismatched.extend(query for query in table.paths if query not in live.paths)
+    return mismatched
+
+
+def save_path_table(table: PathTable, path: str = PATHS_FILE) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(table.to_dict(), f)
+    os.replace(tmp_path, path)
+
+
+def load_path_table(
+    df: pd.DataFrame,
+    path: str = PATHS_FILE,
+    hashes: Optional[np.ndarray] = None,
+) -> Optional[PathTable]:
+    """Loads the table for this catalog, or None if it is missing or stale. Pass known row_hashes to skip rehashing."""
+    try:
+        with open(path, "r") as f:
+            table = PathTable.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if table.fingerprint != catalog_fingerprint(df, hashes):
+        return None
+    return table
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or verify the precomputed path table.")
+    parser.add_argument("command", choices=["build", "check"])
+    parser.add_argument("--output", default=PATHS_FILE)
+    args = parser.parse_args(argv)
+
+    df = load_books()
+    if args.command == "build":
+        table = build_path_table(df)
+        save_path_table(table, args.output)
+        print(f"Wrote {len(table)} paths to {args.output}")
+        return 0
+
+    try:
+        with open(args.output, "r") as f:
+            table = PathTable.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        print(f"Could not read path table {args.output}: {exc}")
+        return 1
+    mismatched = check_path_table(table, df)
+    for query in mismatched[:20]:
+        print(f"Mismatch: {query}")
+    print(f"{len(mismatched)} mismatched paths out of {len(table)}")
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Persistent cache of generated path rationales shared by every server process,
+plus the longer-lived store of rationales precomputed offline.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Callable, Dict, Iterable, Optional
+
+# Not imported from src.books: llm_client uses this module and must stay free of pandas.
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+RATIONALE_CACHE_FILE = os.path.join(DATA_DIR, 'rationale_cache.sqlite3')
+RATIONALE_TTL_SECONDS = 7 * 24 * 3600
+MAX_ENTRIES = 5000
+# Rationales precomputed offline by src.batch_rationales, one per distinct path.
+RATIONALE_STORE_FILE = os.path.join(DATA_DIR, 'rationale_store.sqlite3')
+STORE_TTL_SECONDS = 365 * 24 * 3600
+STORE_MAX_ENTRIES = 1_000_000
+# Eviction trims the table to this share of max_entries, so it runs rarely.
+LOW_WATER_FRACTION = 0.9
+# Last-used updates buffered per process before they are written.
+TOUCH_BATCH = 64
+
+
+def _normalize_query(user_query: str) -> str:
+    return " ".join(str(user_query).lower().split())
+
+
+def rationale_key(user_query: str, book_ids: Iterable[object], model: str, path_only: bool = False) -> str:
+    """
+    Hashes the inputs a rationale depends on.
+
+    The query is compared case- and whitespace-insensitively. With
+    `path_only` it is left out entirely, so any query that produced the same
+    ordered path with the same model shares one rationale.
+    """
+    query = "" if path_only else _normalize_query(user_query)
+    payload = json.dumps([model, [str(book_id) for book_id in book_ids], query, path_only])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RationaleCache:
+    """
+    SQLite-backed LRU cache of rationales with a TTL.
+
+    Reads don't write: last-used times are buffered in memory and written in
+    batches of `touch_batch`, or with the next put. Once more than
+    `max_entries` are stored, the least recently used are evicted down to
+    `low_water` (90% of max_entries by default). The row count is only checked
+    every few puts, so most writes are a single insert. Connections are
+    short-lived and in WAL mode, like the cover cache.
+    """
+
+    def __init__(
+        self,
+        path: str = RATIONALE_CACHE_FILE,
+        max_entries: int = MAX_ENTRIES,
+        ttl: float = RATIONALE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+        low_water: Optional[int] = None,
+        touch_batch: int = TOUCH_BATCH,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.low_water = int(max_entries * LOW_WATER_FRACTION) if low_water is None else low_water
+        self.ttl = ttl
+        self.touch_batch = touch_batch
+        self._clock = clock
+        # Several processes share the file, so overshoot stays well under the slack.
+        self._check_every = max(1, (max_entries - self.low_water) // 10)
+        self._puts_since_check = 0
+        self._touches: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    with conn:
+                        conn.execute(
+                            "CREATE TABLE IF NOT EXISTS rationales ("
+                            "key TEXT PRIMARY KEY, rationale TEXT NOT NULL, "
+                            "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+                        )
+                        conn.execute(
+                            "CREATE INDEX IF NOT EXISTS rationales_last_used ON rationales (last_used)"
+                        )
+                    self._initialized = True
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT rationale, created_at FROM rationales WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                with conn:
+                    conn.execute("DELETE FROM rationales WHERE key = ?", (key,))
+                return None
+        with self._lock:
+            self._touches[key] = now
+            flush = len(self._touches) >= self.touch_batch
+        if flush:
+            self.flush_touches()
+        return row[0]
+
+    def _take_touches(self) -> Dict[str, float]:
+        with self._lock:
+            touches, self._touches = self._touches, {}
+        return touches
+
+    @staticmethod
+    def _write_touches(conn: sqlite3.Connection, touches: Dict[str, float]) -> None:
+        conn.executemany(
+            "UPDATE rationales SET last_used = ? WHERE key = ? AND last_used < ?",
+            [(used, key, used) for key, used in touches.items()],
+        )
+
+    def flush_touches(self) -> None:
+        """Writes buffered last-used times."""
+        touches = self._take_touches()
+        if not touches:
+            return
+        with closing(self._connect()) as conn:
+            with conn:
+                self._write_touches(conn, touches)
+
+    def put(self, key: str, rationale: str) -> None:
+        now = self._clock()
+        touches = self._take_touches()
+        with self._lock:
+            self._puts_since_check += 1
+            check = self._puts_since_check >= self._check_every
+            if check:
+                self._puts_since_check = 0
+        with closing(self._connect()) as conn:
+            with conn:
+                if touches:
+                    self._write_touches(conn, touches)
+                conn.execute(
+                    "INSERT OR REPLACE INTO rationales (key, rationale, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, rationale, now, now),
+                )
+                if check:
+                    self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        count = conn.execute("SELECT COUNT(*) FROM rationales").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM rationales WHERE key IN ("
+                "SELECT key FROM rationales ORDER BY last_used LIMIT ?)",
+                (count - self.low_water,),
+            )
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM rationales").fetchone()[0]
+
+    def purge_expired(self) -> int:
+        """Deletes stale rows; returns how many were removed."""
+        with closing(self._connect()) as conn:
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM rationales WHERE created_at < ?", (self._clock() - self.ttl,)
+                )
+                return cursor.rowcount
+
+
+_rationale_cache: Optional[RationaleCache] = None
+_rationale_store: Optional[RationaleCache] = None
+_rationale_cache_lock = threading.Lock()
+
+
+def get_rationale_cache() -> RationaleCache:
+    """Returns the rationale cache for this process, stored under data/."""
+    global _rationale_cache
+    if _rationale_cache is None:
+        with _rationale_cache_lock:
+            if _rationale_cache is None:
+                _rationale_cache = RationaleCache()
+    return _rationale_cache
+
+
+def get_rationale_store() -> RationaleCache:
+    """Returns the store of offline-generated rationales, keyed with path_only=True."""
+    global _rationale_store
+    if _rationale_store is None:
+        with _rationale_cache_lock:
+            if _rationale_store is None:
+                _rationale_store = RationaleCache(
+                    RATIONALE_STORE_FILE, max_entries=STORE_MAX_ENTRIES, ttl=STORE_TTL_SECONDS
+                )
+    return _rationale_store
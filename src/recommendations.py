@@ -1,10 +1,20 @@
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
 
 import pandas as pd
 
-from src.books import filter_books, sequence_books
+from src.books import filter_books, get_book_index, sequence_books
 from src.roi import increment_stats
+from src.tracing import span
+
+if TYPE_CHECKING:
+    from src.path_table import PathTable
+
+
+QueryKey = Tuple[Optional[str], Optional[str], str, Optional[str], str]
 
 
 @dataclass(frozen=True)
@@ -17,29 +27,163 @@ class RecommendationResult:
     depth: str
 
 
+def _normalize_text(value: Any) -> Optional[str]:
+    # Falsy values skip a filter entirely, while whitespace still filters on ''.
+    if not value:
+        return None
+    return str(value).strip().lower()
+
+
+def normalize_query(args: Dict[str, Any]) -> QueryKey:
+    """
+    Reduces tool-call args to the tuple the recommendation actually depends on.
+
+    Mirrors filter_books/sequence_books: text inputs are compared stripped and
+    lowercased, and any depth other than 'short' yields a deep path.
+    """
+    depth = args.get("depth", "short")
+    return (
+        _normalize_text(args.get("category")),
+        _normalize_text(args.get("subcategory")),
+        str(args.get("level", "beginner") or "").strip().lower(),
+        _normalize_text(args.get("style")),
+        "short" if depth == "short" else "deep",
+    )
+
+
+class RecommendationCache:
+    """
+    Bounded LRU cache of computed paths, stored as book-ID tuples.
+
+    Keys include the BookIndex version of the catalog they were computed
+    from, so a reloaded catalog never serves stale paths.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: Optional[float] = 3600,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[int, QueryKey], Tuple[float, Tuple[object, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version: int, query: QueryKey) -> Optional[Tuple[object, ...]]:
+        key = (version, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None:
+                if self._clock() - entry[0] > self.ttl_seconds:
+                    del self._entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, version: int, query: QueryKey, book_ids: Tuple[object, ...]) -> None:
+        with self._lock:
+            self._entries[(version, query)] = (self._clock(), book_ids)
+            self._entries.move_to_end((version, query))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+RECOMMENDATION_CACHE = RecommendationCache()
+
+
+def compute_path(books_df: pd.DataFrame, args: Dict[str, Any]) -> pd.DataFrame:
+    """Runs filter_books + sequence_books for tool-call args, without caching."""
+    with span("filter_books", rows=len(books_df)):
+        filtered = filter_books(
+            books_df,
+            category=args.get("category"),
+            subcategory=args.get("subcategory"),
+            level=args.get("level", "beginner"),
+            style_pref=args.get("style"),
+        )
+    with span("sequence_books", rows=len(filtered)):
+        return sequence_books(filtered, depth=args.get("depth", "short"))
+
+
+def _cached_path(
+    books_df: pd.DataFrame,
+    args: Dict[str, Any],
+    cache: Optional[RecommendationCache],
+    path_table: Optional["PathTable"],
+) -> pd.DataFrame:
+    index = get_book_index(books_df)
+    if not index.has_unique_ids:
+        return compute_path(books_df, args)
+
+    query = normalize_query(args)
+    if path_table is not None:
+        table_ids = path_table.lookup(query)
+        if table_ids is not None:
+            positions = index.positions_for_ids(table_ids)
+            if positions is not None:
+                return books_df.take(positions)
+    if cache is None:
+        return compute_path(books_df, args)
+
+    cached_ids = cache.get(index.version, query)
+    if cached_ids is not None:
+        positions = index.positions_for_ids(cached_ids)
+        if positions is not None:
+            return books_df.take(positions)
+
+    path = compute_path(books_df, args)
+    cache.put(index.version, query, tuple(path["id"].tolist()) if not path.empty else ())
+    return path
+
+
 def execute_recommendation(
     books_df: pd.DataFrame,
     args: Dict[str, Any],
     stats_incrementer: Callable[..., object] = increment_stats,
+    cache: Optional[RecommendationCache] = RECOMMENDATION_CACHE,
+    path_table: Optional["PathTable"] = None,
 ) -> RecommendationResult:
-    """Executes deterministic recommendation logic from LLM-extracted args."""
+    """
+    Executes deterministic recommendation logic from LLM-extracted args.
+
+    A precomputed `path_table` built for this catalog is consulted first,
+    then paths are memoized per catalog version in `cache` (pass None to
+    bypass). Stats are recorded for every non-empty result either way.
+    """
     category = args.get("category")
     subcategory = args.get("subcategory")
     level = args.get("level", "beginner")
     style = args.get("style")
     depth = args.get("depth", "short")
 
-    filtered = filter_books(
-        books_df,
-        category=category,
-        subcategory=subcategory,
-        level=level,
-        style_pref=style,
-    )
+    with span("execute_recommendation") as current:
+        if (cache is not None or path_table is not None) and not books_df.empty:
+            path = _cached_path(books_df, args, cache, path_table)
+        else:
+            path = compute_path(books_df, args)
+        current.set(books=len(path))
 
-    path = sequence_books(filtered, depth=depth)
-    if not path.empty:
-        stats_incrementer(num_books=len(path), category=category)
+        if not path.empty:
+            with span("increment_stats"):
+                stats_incrementer(num_books=len(path), category=category)
 
     return RecommendationResult(
         path=path,
@@ -1,46 +1,313 @@
+import atexit
+import copy
+import glob
 import json
 import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
 STATS_FILE = os.path.join(DATA_DIR, 'roi_stats.json')
+EVENTS_FILE = os.path.join(DATA_DIR, 'roi_events.jsonl')
 
 DEFAULT_STATS = {
     "paths_generated": 0,
     "books_recommended": 0
 }
 
-def load_stats():
-    """Loads Library stats from the JSON file."""
-    if not os.path.exists(STATS_FILE):
-        return DEFAULT_STATS.copy()
-    
+FLUSH_EVERY = 20
+FLUSH_INTERVAL_SECONDS = 5.0
+COMPACT_AFTER_BYTES = 1024 * 1024
+
+# (timestamp, category, num_books)
+StatsEvent = Tuple[float, Optional[str], int]
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Holds an exclusive cross-process lock on `path` + '.lock'."""
+    with open(f"{path}.lock", "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _empty_counts() -> Dict[str, int]:
+    return DEFAULT_STATS.copy()
+
+
+def _empty_snapshot() -> dict:
+    return {**DEFAULT_STATS, "categories": {}, "daily": {}, "generation": 0}
+
+
+def _read_snapshot(path: str) -> dict:
+    if not os.path.exists(path):
+        return _empty_snapshot()
+
     try:
-        with open(STATS_FILE, 'r') as f:
+        with open(path, 'r') as f:
             data = json.load(f)
-            # Basic schema check/migration
-            if "paths_generated" not in data:
-                 return DEFAULT_STATS.copy()
-            # Remove 'topics_explored' if it exists from previous runs
-            if "topics_explored" in data:
-                del data["topics_explored"]
-            return data
     except (json.JSONDecodeError, IOError):
-        return DEFAULT_STATS.copy()
+        return _empty_snapshot()
+    # Basic schema check/migration
+    if "paths_generated" not in data:
+        return _empty_snapshot()
+    # Remove 'topics_explored' if it exists from previous runs
+    data.pop("topics_explored", None)
+    snapshot = _empty_snapshot()
+    snapshot.update(data)
+    return snapshot
 
-def increment_stats(num_books=0, category=None):
-    """Increments library stats and saves to file."""
-    stats = load_stats()
-    
-    stats["paths_generated"] += 1
-    stats["books_recommended"] += num_books
-    
-    # 'topics_explored' logic removed
-    
+
+def _write_atomic(path: str, data: dict) -> None:
+    # Write-then-rename so readers never see a half-written file.
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _day_bucket(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+def _apply_event(stats: dict, event: StatsEvent) -> None:
+    timestamp, category, num_books = event
+    buckets = [stats, stats["daily"].setdefault(_day_bucket(timestamp), _empty_counts())]
+    if category:
+        buckets.append(stats["categories"].setdefault(category, _empty_counts()))
+    for counts in buckets:
+        counts["paths_generated"] += 1
+        counts["books_recommended"] += num_books
+
+
+def _read_events(path: str) -> Iterator[StatsEvent]:
     try:
-        with open(STATS_FILE, 'w') as f:
-            json.dump(stats, f, indent=4)
-    except IOError:
-        pass 
-        
-    return stats
+        f = open(path, 'r')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                yield float(record["ts"]), record.get("category"), int(record["num_books"])
+            except (ValueError, KeyError, TypeError):
+                # A torn final line from a crashed writer; the rest is intact.
+                continue
+
+
+def _encode_event(event: StatsEvent) -> str:
+    timestamp, category, num_books = event
+    return json.dumps({"ts": timestamp, "category": category, "num_books": num_books}) + "\n"
+
+
+class StatsWriter:
+    """
+    Records recommendation events in an append-only log.
 
+    Events are buffered in memory and appended to `events_path` after
+    `flush_every` events or `flush_interval` seconds, under a cross-process
+    lock. Once the log passes `compact_after_bytes` it is folded into the
+    snapshot at `path` (totals plus per-category and per-day counts), and
+    readers combine that snapshot with whatever log tail is left.
+
+    Compaction first renames the log to a numbered segment, then writes a
+    snapshot that records the segment number; segments newer than the
+    snapshot are therefore still unfolded if a compaction was interrupted.
+
+    Reads are cached against the stat signature of both files: until another
+    flush or compaction touches them, load() costs two stat calls plus this
+    process's in-memory pending events.
+    """
+
+    def __init__(
+        self,
+        path: str = STATS_FILE,
+        events_path: str = EVENTS_FILE,
+        flush_every: int = FLUSH_EVERY,
+        flush_interval: Optional[float] = FLUSH_INTERVAL_SECONDS,
+        compact_after_bytes: Optional[int] = COMPACT_AFTER_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.events_path = events_path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.compact_after_bytes = compact_after_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending: List[StatsEvent] = []
+        self._timer: Optional[threading.Timer] = None
+        self._disk_cache: Optional[Tuple[tuple, dict]] = None
+
+    def pending(self) -> List[StatsEvent]:
+        with self._lock:
+            return list(self._pending)
+
+    def increment(self, num_books: int = 0, category: Optional[str] = None) -> None:
+        with self._lock:
+            self._pending.append((self._clock(), category, int(num_books)))
+            flush_now = len(self._pending) >= self.flush_every
+            if not flush_now and self._timer is None and self.flush_interval is not None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self.flush()
+
+    def flush(self) -> None:
+        """Appends pending events to the log, compacting it if it has grown large."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            pending = self._pending
+            self._pending = []
+
+        with _file_lock(self.path):
+            try:
+                with open(self.events_path, 'a') as f:
+                    f.write("".join(_encode_event(event) for event in pending))
+                    size = f.tell()
+            except OSError:
+                # Keep the events so the next flush can retry.
+                with self._lock:
+                    self._pending[:0] = pending
+                return
+            if self.compact_after_bytes is not None and size >= self.compact_after_bytes:
+                try:
+                    self._compact_locked()
+                except OSError:
+                    # The events are safely logged; compaction can wait for the next flush.
+                    pass
+
+    def _segment_path(self, generation: int) -> str:
+        root, ext = os.path.splitext(self.events_path)
+        return f"{root}.{generation}{ext}"
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        root, ext = os.path.splitext(self.events_path)
+        segments = []
+        for segment in glob.glob(f"{glob.escape(root)}.*{ext}"):
+            suffix = segment[len(root) + 1:len(segment) - len(ext)]
+            if suffix.isdigit():
+                segments.append((int(suffix), segment))
+        return sorted(segments)
+
+    def _aggregate_locked(self) -> dict:
+        """Returns the snapshot with every unfolded event applied."""
+        stats = _read_snapshot(self.path)
+        for generation, segment in self._segments():
+            if generation > stats["generation"]:
+                for event in _read_events(segment):
+                    _apply_event(stats, event)
+        for event in _read_events(self.events_path):
+            _apply_event(stats, event)
+        return stats
+
+    def _compact_locked(self) -> None:
+        stats = _read_snapshot(self.path)
+        folded = stats["generation"]
+        segments = self._segments()
+        latest = max([folded] + [generation for generation, _ in segments])
+        if os.path.exists(self.events_path):
+            latest += 1
+            os.replace(self.events_path, self._segment_path(latest))
+            segments.append((latest, self._segment_path(latest)))
+
+        for generation, segment in segments:
+            if generation > folded:
+                for event in _read_events(segment):
+                    _apply_event(stats, event)
+        stats["generation"] = latest
+        _write_atomic(self.path, stats)
+        for _, segment in segments:
+            os.remove(segment)
+
+    def compact(self) -> None:
+        """Flushes, then folds the whole log into the snapshot."""
+        self.flush()
+        with _file_lock(self.path):
+            self._compact_locked()
+
+    def _signature(self) -> tuple:
+        signature = []
+        for path in (self.path, self.events_path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+            else:
+                signature.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        return tuple(signature)
+
+    def _disk_metrics(self) -> dict:
+        """Returns the aggregated on-disk stats, re-reading only if the files changed."""
+        cached = self._disk_cache
+        if cached is not None and cached[0] == self._signature():
+            return cached[1]
+        with _file_lock(self.path):
+            signature = self._signature()
+            stats = self._aggregate_locked()
+        self._disk_cache = (signature, stats)
+        return stats
+
+    def metrics(self) -> dict:
+        """Returns totals, per-category and per-day counts, including unflushed events."""
+        stats = copy.deepcopy(self._disk_metrics())
+        for event in self.pending():
+            _apply_event(stats, event)
+        del stats["generation"]
+        stats["topics_explored"] = len(stats["categories"])
+        return stats
+
+    def load(self) -> Dict[str, int]:
+        """Returns the overall totals, including this process's unflushed events."""
+        disk = self._disk_metrics()
+        pending = self.pending()
+        return {
+            "paths_generated": disk["paths_generated"] + len(pending),
+            "books_recommended": disk["books_recommended"] + sum(event[2] for event in pending),
+        }
+
+
+_writer = StatsWriter()
+atexit.register(_writer.flush)
+
+
+def load_stats():
+    """Loads Library stats from the snapshot and event log."""
+    return _writer.load()
+
+def load_metrics():
+    """Loads totals plus per-category ('categories') and per-UTC-day ('daily') counts."""
+    return _writer.metrics()
+
+def increment_stats(num_books=0, category=None):
+    """Records one generated path and returns the updated totals; writes are batched (see StatsWriter)."""
+    _writer.increment(num_books, category)
+    return _writer.load()
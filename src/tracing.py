@@ -0,0 +1,276 @@
+"""
+Lightweight tracing of where a chat turn spends its time.
+
+    with start_trace("chat_turn"):
+        with span("filter_books", rows=len(df)):
+            ...
+
+Spans nest through a context variable, are timed with perf_counter, and
+share the trace id of the turn that opened the outermost one. When the root
+span closes, the whole trace goes to the configured exporters: a JSONL file
+and/or latency histograms in a MetricsRegistry, which src.metrics can serve
+as Prometheus text. A span that finishes after its root has been exported
+(say, a worker thread still running at a deadline) is exported on its own,
+with the same trace id and a `late` attribute, and counted as `span.late`.
+Disabled (the default), span() hands back one shared
+no-op object, so instrumented code costs a function call and an attribute
+check.
+
+Set HALCHEMY_TRACE_FILE (a path, or 1 for data/traces.jsonl) and/or
+HALCHEMY_METRICS_PORT to enable it in the app.
+"""
+import abc
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from src.metrics import METRICS, MetricsRegistry, start_metrics_server
+
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+TRACE_FILE = os.path.join(DATA_DIR, 'traces.jsonl')
+
+T = TypeVar("T")
+
+
+class Span:
+    """One timed operation; `start` and `end` are perf_counter readings."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "error", "_trace")
+
+    def __init__(self, name: str, trace: "_Trace", parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace.trace_id
+        self.span_id = next(_span_ids)
+        self.parent_id = parent_id
+        self.start = 0.0
+        self.end = 0.0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._trace = trace
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "started_at": self._trace.started_at + (self.start - self._trace.origin),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _Trace:
+    __slots__ = ("trace_id", "started_at", "origin", "spans", "exported")
+
+    def __init__(self, trace_id: Optional[str]):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self.exported = False
+
+
+_span_ids = itertools.count(1)
+_current: ContextVar[Optional[Span]] = ContextVar("halchemy_current_span", default=None)
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanScope:
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current.set(self.span)
+        self.span.start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        span = self.span
+        span.end = time.perf_counter()
+        # Streamlit's st.stop()/st.rerun() raise BaseExceptions; they aren't failures.
+        if exc_type is not None and issubclass(exc_type, Exception):
+            span.error = exc_type.__name__
+        _current.reset(self.token)
+        trace = span._trace
+        with self.tracer._lock:
+            late = trace.exported
+            if not late:
+                trace.spans.append(span)
+                trace.exported = span.parent_id is None
+        if late:
+            span.attributes["late"] = True
+            self.tracer._export([span])
+        elif span.parent_id is None:
+            self.tracer._export(trace.spans)
+        return False
+
+
+class Tracer:
+    """Creates spans and hands finished traces to its exporters."""
+
+    def __init__(self, enabled: bool = False, exporters: Sequence["Exporter"] = ()):
+        self.enabled = enabled
+        self.exporters = list(exporters)
+        # Orders a root's export against children finishing on other threads.
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool, exporters: Sequence["Exporter"] = ()) -> None:
+        self.exporters = list(exporters)
+        self.enabled = enabled
+
+    def trace(self, name: str, trace_id: Optional[str] = None, **attributes: Any):
+        """Opens the root span of a new trace, e.g. one chat turn."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return _SpanScope(self, Span(name, _Trace(trace_id), None, attributes))
+
+    def span(self, name: str, **attributes: Any):
+        """Opens a child of the current span, or a new trace if there is none."""
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current.get()
+        if parent is None:
+            return _SpanScope(self, Span(name, _Trace(None), None, attributes))
+        return _SpanScope(self, Span(name, parent._trace, parent.span_id, attributes))
+
+    def _export(self, spans: List[Span]) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception:
+                logger.warning("Trace exporter %s failed", type(exporter).__name__, exc_info=True)
+
+
+class Exporter(abc.ABC):
+    @abc.abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        """Receives the spans of one finished trace, or a single late span."""
+
+
+class JsonlExporter(Exporter):
+    """Appends one JSON line per span."""
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(lines)
+
+
+class MetricsExporter(Exporter):
+    """Records span durations as `span.<name>.seconds` histograms; errors and late spans as counters."""
+
+    def __init__(self, metrics: MetricsRegistry = METRICS):
+        self.metrics = metrics
+
+    def export(self, spans: List[Span]) -> None:
+        for span in spans:
+            self.metrics.observe(f"span.{span.name}.seconds", span.duration)
+            if span.error is not None:
+                self.metrics.increment(f"span.{span.name}.errors")
+            if span.attributes.get("late"):
+                self.metrics.increment("span.late")
+
+
+class MemoryExporter(Exporter):
+    """Keeps finished traces in memory; for tests and debugging."""
+
+    def __init__(self):
+        self.traces: List[List[Span]] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.traces.append(list(spans))
+
+
+TRACER = Tracer()
+
+
+def start_trace(name: str, trace_id: Optional[str] = None, **attributes: Any):
+    if not TRACER.enabled:
+        return NOOP_SPAN
+    return TRACER.trace(name, trace_id, **attributes)
+
+
+def span(name: str, **attributes: Any):
+    # Checked here too so the disabled path skips a method call.
+    if not TRACER.enabled:
+        return NOOP_SPAN
+    return TRACER.span(name, **attributes)
+
+
+def in_current_context(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Binds `func` to a copy of the caller's context, so spans it opens on
+    another thread join the caller's trace. Call once per submitted task.
+    """
+    if not TRACER.enabled:
+        return func
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+_configure_lock = threading.Lock()
+_configured = False
+
+
+def configure_from_env() -> None:
+    """Enables tracing from HALCHEMY_TRACE_FILE / HALCHEMY_METRICS_PORT, once per process."""
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        _configured = True
+        exporters: List[Exporter] = []
+        trace_file = os.environ.get("HALCHEMY_TRACE_FILE")
+        if trace_file:
+            exporters.append(JsonlExporter(TRACE_FILE if trace_file == "1" else trace_file))
+        port = os.environ.get("HALCHEMY_METRICS_PORT")
+        if port:
+            exporters.append(MetricsExporter())
+            start_metrics_server(int(port))
+        if exporters:
+            TRACER.configure(enabled=True, exporters=exporters)
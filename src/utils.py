@@ -1,34 +1,55 @@
 import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Mapping, Optional, Tuple
 
 import requests
-import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from src.cover_cache import CoverCache, get_cover_cache
+from src.tracing import in_current_context, span
 
 
 logger = logging.getLogger(__name__)
 
-@st.cache_data(show_spinner=False, ttl=3600)
-def fetch_book_cover(title, author):
-    """
-    Fetches the book cover image URL from Google Books API.
-    Returns a placeholder image if not found.
-    """
+GOOGLE_BOOKS_URL = "https://www.googleapis.com/books/v1/volumes"
+HTTP_POOL_SIZE = 16
+
+CoverKey = Tuple[str, str]
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Returns the process-wide pooled session used for cover lookups."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _lookup_cover_url(
+    session: requests.Session,
+    title: str,
+    author: str,
+    timeout: float = 5,
+    api_url: str = GOOGLE_BOOKS_URL,
+) -> Optional[str]:
+    """Queries Google Books for one cover; raises on transient failures."""
     query = f"intitle:{title}+inauthor:{author}"
-    url = "https://www.googleapis.com/books/v1/volumes"
     params = {"q": query, "maxResults": 1}
 
-    try:
-        response = requests.get(url, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-    except requests.Timeout:
-        logger.warning("Timed out fetching cover for %s by %s", title, author)
-        return None
-    except requests.RequestException as exc:
-        logger.warning("Google Books cover request failed for %s by %s: %s", title, author, exc)
-        return None
-    except ValueError as exc:
-        logger.warning("Google Books returned invalid JSON for %s by %s: %s", title, author, exc)
-        return None
+    response = session.get(api_url, params=params, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
 
     items = data.get("items", [])
     if items:
@@ -36,7 +57,100 @@ def fetch_book_cover(title, author):
         image_links = volume_info.get("imageLinks", {})
         # Prefer thumbnail, fallback to smallThumbnail
         return image_links.get("thumbnail") or image_links.get("smallThumbnail")
-    
+
     # Return None or a specific placeholder URL if you have one
     # For now, we'll return None and handle it in the UI
     return None
+
+
+def _request_cover_url(
+    session: requests.Session,
+    title: str,
+    author: str,
+    timeout: float = 5,
+    api_url: str = GOOGLE_BOOKS_URL,
+) -> Tuple[Optional[str], bool]:
+    """Returns (cover URL, definitive); failed lookups are not definitive and must not be cached."""
+    with span("fetch_book_cover", title=title) as current:
+        try:
+            return _lookup_cover_url(session, title, author, timeout, api_url), True
+        except requests.Timeout:
+            logger.warning("Timed out fetching cover for %s by %s", title, author)
+        except requests.RequestException as exc:
+            logger.warning("Google Books cover request failed for %s by %s: %s", title, author, exc)
+        except ValueError as exc:
+            logger.warning("Google Books returned invalid JSON for %s by %s: %s", title, author, exc)
+        current.set(failed=True)
+        return None, False
+
+
+def fetch_book_cover(title, author):
+    """
+    Fetches the book cover image URL from Google Books API.
+    Returns None if the book has no cover or the lookup failed. Results are
+    cached on disk (see src/cover_cache.py), including books that have no
+    cover, but failed lookups are not.
+    """
+    return fetch_book_covers(
+        [{"title": title, "author": author}],
+        cache=get_cover_cache(),
+    ).get((str(title), str(author)))
+
+
+def fetch_book_covers(
+    books: Iterable[Mapping[str, object]],
+    timeout: float = 5,
+    deadline: float = 8,
+    max_workers: int = 8,
+    session: Optional[requests.Session] = None,
+    api_url: str = GOOGLE_BOOKS_URL,
+    cache: Optional[CoverCache] = None,
+) -> Dict[CoverKey, Optional[str]]:
+    """
+    Fetches covers for several books concurrently over one pooled session.
+
+    Each request is bounded by `timeout` and the whole batch by `deadline`
+    seconds. Returns the definitive results, keyed by (title, author): a
+    URL, or None when the lookup completed without a cover. Failed lookups
+    and books still in flight at the deadline are left out, so callers can
+    keep what is returned and retry the rest. With a `cache`, fresh entries
+    skip the network and definitive results are stored.
+    """
+    keys = list(dict.fromkeys((str(book["title"]), str(book["author"])) for book in books))
+    covers: Dict[CoverKey, Optional[str]] = {}
+    if cache is not None and keys:
+        covers.update(cache.get_many(keys))
+        keys = [key for key in keys if key not in covers]
+    if not keys:
+        return covers
+
+    session = session or get_http_session()
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(keys)), thread_name_prefix="cover")
+    futures = {
+        executor.submit(in_current_context(_request_cover_url), session, title, author, timeout, api_url): (title, author)
+        for title, author in keys
+    }
+    done, not_done = wait(futures, timeout=deadline)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    if not_done:
+        logger.warning("Cover batch deadline hit; %d of %d lookups unfinished", len(not_done), len(keys))
+
+    definitive = {}
+    for future in done:
+        title, author = futures[future]
+        try:
+            url, is_definitive = future.result()
+        except Exception:
+            logger.warning("Cover lookup failed for %s by %s", title, author, exc_info=True)
+            continue
+        if is_definitive:
+            definitive[(title, author)] = url
+    covers.update(definitive)
+
+    if cache is not None and definitive:
+        try:
+            cache.put_many(definitive)
+        except sqlite3.Error as exc:
+            logger.warning("Could not store covers in the cache: %s", exc)
+    return covers
@@ -0,0 +1,156 @@
+"""Shared test helpers: fake OpenAI clients, a stub HTTP server and catalog setup."""
+import asyncio
+import json
+import threading
+import unittest
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+from openai import APIConnectionError
+
+from src.books import load_books
+from src.catalog import Catalog
+
+REQUEST = httpx.Request("POST", "https://api.openai.test/v1/chat/completions")
+CHUNKS = ("Starts ", "with A, ", None, "then B.")
+
+
+def use_uncached_catalog() -> None:
+    """
+    Serves the real catalog to code that calls get_catalog(), loaded without
+    the compiled cache so tests never write into data/. Call from setUpModule.
+    """
+    patcher = patch("src.catalog.get_catalog", return_value=Catalog(loader=partial(load_books, use_cache=False)))
+    patcher.start()
+    unittest.addModuleCleanup(patcher.stop)
+
+
+def status_error(cls, status, headers=None):
+    """An openai.APIStatusError subclass as the SDK raises it for `status`."""
+    return cls("error", response=httpx.Response(status, headers=headers, request=REQUEST), body=None)
+
+
+def completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content, tool_calls=None))])
+
+
+def stream_chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeCompletions:
+    """
+    Fake `client.chat.completions`.
+
+    Each call takes the next outcome from `schedule` (the last one repeats):
+    an exception is raised, a string is the reply, and None, like an empty
+    schedule, replies "Reply #<call number>". With stream=True the reply is
+    `chunks`, failing with a connection error at index `fail_after`.
+    """
+
+    def __init__(self, schedule=(), chunks=CHUNKS, fail_after=None):
+        self.schedule = list(schedule)
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def _outcome(self):
+        self.calls += 1
+        outcome = self.schedule[min(self.calls, len(self.schedule)) - 1] if self.schedule else None
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return f"Reply #{self.calls}" if outcome is None else outcome
+
+    def _stream(self):
+        for i, text in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise APIConnectionError(request=REQUEST)
+            yield stream_chunk(text)
+
+    def create(self, **kwargs):
+        content = self._outcome()
+        if kwargs.get("stream"):
+            return self._stream()
+        return completion(content)
+
+
+class AsyncFakeCompletions(FakeCompletions):
+    """Async FakeCompletions whose create() first sleeps `delay` seconds, recording cancellations and threads."""
+
+    def __init__(self, schedule=(), delay=0.0):
+        super().__init__(schedule)
+        self.delay = delay
+        self.cancelled = 0
+        self.threads = set()
+
+    async def create(self, **kwargs):
+        self.threads.add(threading.current_thread().name)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return completion(self._outcome())
+
+
+class FakeClient:
+    """Fake OpenAI client; arguments go to `completions_class`."""
+    completions_class = FakeCompletions
+
+    def __init__(self, *args, **kwargs):
+        self.completions = self.completions_class(*args, **kwargs)
+        self.chat = SimpleNamespace(completions=self.completions)
+
+
+class FakeAsyncClient(FakeClient):
+    completions_class = AsyncFakeCompletions
+
+
+class StubServer(ThreadingHTTPServer):
+    """Local HTTP server on a free port, serving from a daemon thread."""
+    daemon_threads = True
+
+    def __init__(self, handler):
+        super().__init__(("127.0.0.1", 0), handler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their timeout hang up mid-response; that's expected here.
+        pass
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler base with a JSON reply helper and no request logging."""
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def chat_completion_payload(content, model="gpt-4o-mini"):
+    """The JSON body of a /v1/chat/completions reply."""
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": model,
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+    }
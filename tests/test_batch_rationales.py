@@ -0,0 +1,162 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import pandas as pd
+from openai import AsyncOpenAI
+
+from src.batch_rationales import RationaleJob, format_query, generate_rationales, jobs_from_path_table
+from src.llm_client import RequestScheduler, get_sequence_rationale
+from src.rationale_cache import RationaleCache, rationale_key
+from tests.helpers import StubHandler, StubServer, chat_completion_payload
+
+
+class _FakeModelHandler(StubHandler):
+    """Answers /v1/chat/completions like OpenAI, naming the first book of the path."""
+    active = 0
+    peak = 0
+    requests = 0
+    failures_left = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        first_book = prompt.split("1. ", 1)[1].split(" by ", 1)[0]
+        with self.lock:
+            type(self).requests += 1
+            type(self).active += 1
+            type(self).peak = max(type(self).peak, type(self).active)
+            fail = type(self).failures_left > 0
+            type(self).failures_left -= int(fail)
+        try:
+            time.sleep(0.05)
+            if fail:
+                self.send_json(500, {"error": {"message": "overloaded", "type": "server_error"}})
+                return
+            self.send_json(200, chat_completion_payload(f"Starts with {first_book}.", body["model"]))
+        finally:
+            with self.lock:
+                type(self).active -= 1
+
+
+def _jobs(count):
+    return [
+        RationaleJob(f"query {i}", ({"id": i, "title": f"Book {i}", "author": "A"},))
+        for i in range(count)
+    ]
+
+
+class TestBatchRationales(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubServer(_FakeModelHandler)
+        cls.base_url = f"{cls.server.url}/v1"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        _FakeModelHandler.peak = 0
+        _FakeModelHandler.requests = 0
+        _FakeModelHandler.failures_left = 0
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = RationaleCache(os.path.join(self.tmp_dir.name, "store.sqlite3"), max_entries=1000)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _run(self, jobs, **kwargs):
+        async def run():
+            client = AsyncOpenAI(api_key="test", base_url=self.base_url, max_retries=0)
+            async with client:
+                return await generate_rationales(client, jobs, self.store, rng=lambda: 0.0, **kwargs)
+        return asyncio.run(run())
+
+    def test_generates_with_bounded_concurrency(self):
+        progress = []
+        report = self._run(_jobs(12), concurrency=3, on_progress=lambda r: progress.append(r.completed))
+
+        self.assertEqual((report.generated, report.failed, report.skipped), (12, 0, 0))
+        self.assertEqual(_FakeModelHandler.peak, 3)
+        self.assertEqual(progress, list(range(1, 13)))
+        self.assertGreater(report.throughput, 0)
+        self.assertIn("12/12 paths: 12 generated", report.summary())
+        key = rationale_key("anything", [5], "gpt-4o-mini", path_only=True)
+        self.assertEqual(self.store.get(key), "Starts with Book 5.")
+
+    def test_resume_skips_stored_paths(self):
+        self._run(_jobs(4))
+        _FakeModelHandler.requests = 0
+
+        report = self._run(_jobs(6))
+
+        self.assertEqual((report.skipped, report.generated), (4, 2))
+        self.assertEqual(_FakeModelHandler.requests, 2)
+        self.assertEqual(len(self.store), 6)
+
+    def test_server_errors_are_retried_then_reported(self):
+        _FakeModelHandler.failures_left = 2
+        report = self._run(_jobs(1), max_retries=3)
+        self.assertEqual(report.generated, 1)
+        self.assertEqual(_FakeModelHandler.requests, 3)
+
+        _FakeModelHandler.failures_left = 10
+        report = self._run(_jobs(2)[1:], max_retries=1)
+        self.assertEqual((report.generated, report.failed), (0, 1))
+        self.assertEqual(report.failures, ["query 1"])
+        self.assertEqual(len(self.store), 1)
+
+    def test_token_rate_is_enforced(self):
+        waits = []
+
+        async def record_wait(seconds):
+            waits.append(seconds)
+
+        scheduler = RequestScheduler(tokens_per_minute=60, max_concurrency=2, async_sleep=record_wait)
+        report = self._run(_jobs(3), scheduler=scheduler)
+
+        self.assertEqual(report.generated, 3)
+        self.assertEqual(len(waits), 2)
+        self.assertTrue(all(wait > 0 for wait in waits))
+
+    def test_serving_reads_the_store_first(self):
+        self._run(_jobs(1))
+        cache = RationaleCache(os.path.join(self.tmp_dir.name, "cache.sqlite3"))
+        books = [{"id": 0, "title": "Book 0", "author": "A"}]
+
+        rationale = get_sequence_rationale(None, "a different query", books, cache=cache, store=self.store)
+
+        self.assertEqual(rationale, "Starts with Book 0.")
+        self.assertEqual(len(cache), 0)
+
+    def test_jobs_from_path_table(self):
+        df = pd.DataFrame({"id": [1, 2, 3], "title": ["A", "B", "C"], "author": ["X", "Y", "Z"]})
+        paths = {
+            ("coding", None, "beginner", None, "short"): (1, 2),
+            ("coding", None, "beginner", "academic", "short"): (1, 2),
+            ("coding", "python", "advanced", None, "deep"): (3,),
+            ("history", None, "beginner", None, "short"): (),
+            ("history", None, "advanced", None, "short"): (9,),
+        }
+
+        jobs = jobs_from_path_table(paths, df)
+
+        self.assertEqual([job.book_ids() for job in jobs], [[1, 2], [3]])
+        self.assertEqual(jobs[0].books[1], {"id": 2, "title": "B", "author": "Y"})
+        self.assertEqual(
+            jobs[1].query, "I want a deep reading path on python (coding) at the advanced level."
+        )
+        self.assertEqual(
+            format_query(("coding", None, "beginner", "academic", "short")),
+            "I want a short reading path on coding at the beginner level, academic style.",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 import pandas as pd
-from src.books import filter_books, get_purchase_url, sequence_books
+from src.books import BookIndex, filter_books, get_book_index, get_purchase_url, sequence_books
 
 class TestBooksLogic(unittest.TestCase):
     def setUp(self):
@@ -104,6 +104,50 @@ class TestBooksLogic(unittest.TestCase):
 
         self.assertEqual(sequenced['id'].tolist(), [1, 2, 3])
 
+    def test_filter_returns_copy_in_frame_order(self):
+        df = self.df.iloc[::-1]
+
+        filtered = filter_books(df, category="Coding", level="all")
+        filtered.loc[filtered.index[0], 'title'] = 'Changed'
+
+        self.assertEqual(filtered['id'].tolist(), [10, 9, 8, 7, 6])
+        self.assertNotIn('Changed', df['title'].tolist())
+
+    def test_get_book_index_is_reused_per_frame(self):
+        index = get_book_index(self.df)
+
+        self.assertIs(get_book_index(self.df), index)
+        self.assertIsNot(get_book_index(self.df.copy()), index)
+
+    def test_filtering_leaves_the_frame_writable(self):
+        df = self.df.copy()
+        filter_books(df, category="Coding", level="all")
+
+        df.loc[0, 'difficulty'] = 5
+        df.loc[0, 'title'] = 'Changed'
+        df.loc[0, 'is_advanced'] = True
+
+        self.assertEqual(df.loc[0, ['difficulty', 'title']].tolist(), [5, 'Changed'])
+
+    def test_replacing_an_indexed_column_rebuilds_the_index(self):
+        df = self.df.copy()
+        index = get_book_index(df)
+
+        df['category'] = df['category'].str.replace('Habits', 'Cooking')
+
+        rebuilt = get_book_index(df)
+        self.assertIsNot(rebuilt, index)
+        self.assertGreater(rebuilt.version, index.version)
+        self.assertEqual(filter_books(df, category="cooking", level="all")['id'].tolist(), [1, 2, 3, 4, 5])
+
+    def test_book_index_lookup_matches_fallbacks(self):
+        index = BookIndex(self.df)
+
+        self.assertEqual(index.lookup("coding", subcategory="java", level="all").tolist(), [5, 6, 7, 8, 9])
+        self.assertEqual(index.lookup(" HABITS ", level="beginner").tolist(), [0, 1])
+        self.assertEqual(index.lookup("habits", level="all", style_pref="story-driven").tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(index.lookup("unknown").tolist(), [])
+
     def test_get_purchase_url_prefers_affiliate_url(self):
         url = get_purchase_url(
             {
@@ -0,0 +1,149 @@
+import itertools
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.books import BOOKS_FILE, BookIndex, get_book_index, load_books
+from src.catalog import Catalog, apply_changes, get_catalog
+from src.path_table import PathTable, catalog_fingerprint, row_hashes, save_path_table
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, "books.csv")
+        shutil.copyfile(BOOKS_FILE, self.csv_path)
+        self.loads = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _loader(self, path):
+        self.loads += 1
+        return load_books(path, use_cache=False)
+
+    def test_current_is_shared_not_copied(self):
+        catalog = Catalog(self.csv_path, loader=self._loader)
+
+        first = catalog.current()
+        second = catalog.current()
+
+        self.assertIs(first.books, second.books)
+        self.assertEqual(self.loads, 1)
+        self.assertIs(get_catalog(), get_catalog())
+
+    def test_refresh_only_swaps_when_source_changes(self):
+        catalog = Catalog(self.csv_path, loader=self._loader)
+        catalog.current()
+
+        self.assertFalse(catalog.refresh())
+
+        with open(self.csv_path, "a", encoding="utf-8") as f:
+            f.write(
+                "9999,New Book,New Author,coding,python,1,5,tactical/how-to,"
+                "procedural-skill,,Desc.,https://example.com,,True,False,False\n"
+            )
+
+        self.assertTrue(catalog.refresh())
+        self.assertEqual(catalog.current().version, 2)
+        self.assertIn(9999, catalog.current().books["id"].tolist())
+
+    def test_swap_leaves_held_snapshot_intact(self):
+        catalog = Catalog(self.csv_path, loader=self._loader)
+        original = catalog.current()
+        rows = len(original.books)
+
+        catalog.swap(original.books.head(10))
+
+        self.assertEqual((original.version, len(original.books)), (1, rows))
+        self.assertEqual(len(catalog.current().books), 10)
+
+    def test_apply_changes_touches_only_edited_rows(self):
+        old = load_books(self.csv_path, use_cache=False)
+        new = old.drop(index=[0, 5]).reset_index(drop=True)
+        new.loc[new["id"] == old.loc[10, "id"], "category"] = "cooking"
+        new.loc[new["id"] == old.loc[11, "id"], "is_beginner_friendly"] = True
+        added = old.iloc[[20]].assign(id=9999, style="academic")
+        new = pd.concat([new.iloc[:50], added, new.iloc[50:]], ignore_index=True)
+
+        books, index, diff = apply_changes(old, get_book_index(old), new)
+
+        self.assertEqual(diff.added, (9999,))
+        self.assertEqual(set(diff.changed), {old.loc[10, "id"], old.loc[11, "id"]})
+        self.assertEqual(set(diff.removed), {old.loc[0, "id"], old.loc[5, "id"]})
+        self.assertEqual(books["id"].tolist()[-1], 9999)
+        self.assertIs(get_book_index(books), index)
+
+        fresh = BookIndex(books)
+        categories = sorted(set(books["category"]))
+        subcategories = [None] + sorted(set(books["subcategory"].dropna()))
+        for category, subcategory, level, style in itertools.product(
+            categories,
+            subcategories,
+            ["beginner", "intermediate", "advanced", "all"],
+            [None, "tactical/how-to", "academic"],
+        ):
+            self.assertEqual(
+                index.lookup(category, subcategory, level, style).tolist(),
+                fresh.lookup(category, subcategory, level, style).tolist(),
+            )
+
+    def test_refresh_updates_index_and_fingerprint_incrementally(self):
+        catalog = Catalog(self.csv_path, loader=self._loader)
+        save_path_table(PathTable("stale", {}), catalog.paths_file)
+        self.assertIsNone(catalog.current().path_table)
+
+        with open(self.csv_path, "a", encoding="utf-8") as f:
+            f.write(
+                "9999,New Book,New Author,coding,python,1,5,tactical/how-to,"
+                "procedural-skill,,Desc.,https://example.com,,True,False,False\n"
+            )
+        expected = load_books(self.csv_path, use_cache=False)
+        save_path_table(PathTable(catalog_fingerprint(expected), {}), catalog.paths_file)
+
+        with mock.patch.object(BookIndex, "__init__", side_effect=AssertionError("full index build")), \
+                mock.patch("src.catalog.row_hashes", wraps=row_hashes) as hashed:
+            self.assertTrue(catalog.refresh())
+
+        self.assertEqual([len(call.args[0]) for call in hashed.call_args_list], [1])
+        snapshot = catalog.current()
+        self.assertIsNotNone(snapshot.path_table)
+        self.assertTrue(np.array_equal(snapshot.row_hashes, row_hashes(snapshot.books)))
+
+    def test_update_without_changes_keeps_snapshot(self):
+        catalog = Catalog(self.csv_path, loader=self._loader)
+        snapshot = catalog.current()
+
+        diff = catalog.update(load_books(self.csv_path, use_cache=False))
+
+        self.assertFalse(diff)
+        self.assertIs(catalog.current(), snapshot)
+
+    def test_watcher_applies_file_changes(self):
+        catalog = Catalog(self.csv_path, loader=self._loader)
+        original = catalog.current()
+        catalog.start_watching(interval=0.05)
+        try:
+            with open(self.csv_path, "a", encoding="utf-8") as f:
+                f.write(
+                    "9999,New Book,New Author,coding,python,1,5,tactical/how-to,"
+                    "procedural-skill,,Desc.,https://example.com,,True,False,False\n"
+                )
+            deadline = time.monotonic() + 5
+            while catalog.current() is original and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            catalog.stop_watching()
+
+        self.assertIn(9999, catalog.current().books["id"].tolist())
+        self.assertNotIn(9999, original.books["id"].tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from benchmarks.catalog import TAIL_FRACTION, compare, make_catalog, run_size
+from src.books import REQUIRED_COLS, load_books, validate_books
+
+
+class TestCatalogBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.source = load_books(use_cache=False)
+
+    def test_synthetic_catalog_matches_schema_and_mix(self):
+        df = make_catalog(20_000, source=self.source)
+
+        validate_books(df)
+        self.assertEqual(list(df.columns), list(self.source.columns))
+        self.assertTrue(set(REQUIRED_COLS) <= set(df.columns))
+        self.assertEqual(len(df), 20_000)
+        self.assertTrue(df["title"].is_unique)
+
+        real = self.source["category"].value_counts(normalize=True)
+        synthetic = df["category"].value_counts(normalize=True)
+        for category, share in real.items():
+            self.assertAlmostEqual(synthetic[category], share, delta=0.02)
+
+        tail = ~df["subcategory"].isin(set(self.source["subcategory"].dropna()))
+        tail &= df["subcategory"].notna()
+        self.assertAlmostEqual(tail.mean(), TAIL_FRACTION, delta=0.03)
+        self.assertGreater(df["subcategory"].nunique(), self.source["subcategory"].nunique())
+
+    def test_same_seed_same_catalog(self):
+        first = make_catalog(500, seed=3, source=self.source)
+        self.assertTrue(first.equals(make_catalog(500, seed=3, source=self.source)))
+        self.assertFalse(first.equals(make_catalog(500, seed=4, source=self.source)))
+
+    def test_run_size_reports_every_function(self):
+        results = run_size(300, repeat=1, source=self.source)
+        self.assertEqual(set(results), {
+            "filter_books", "sequence_books", "get_replacement_candidates", "load_books", "load_books_uncached",
+        })
+        for result in results.values():
+            self.assertGreater(result["throughput"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+
+    def test_compare_flags_regressions_past_threshold(self):
+        baseline = {"1000": {
+            "filter_books": {"throughput": 1000.0, "p50_ms": 1.0, "p99_ms": 2.0},
+            "sequence_books": {"throughput": 100.0, "p50_ms": 10.0, "p99_ms": 20.0},
+            "load_books": {"throughput": 50000.0, "p50_ms": 0.01, "p99_ms": 0.02},
+        }}
+        results = {"1000": {
+            "filter_books": {"throughput": 900.0, "p50_ms": 1.1, "p99_ms": 2.4},
+            "sequence_books": {"throughput": 50.0, "p50_ms": 20.0, "p99_ms": 21.0},
+            # Under the noise floor: ignored however much slower.
+            "load_books": {"throughput": 25000.0, "p50_ms": 0.02, "p99_ms": 0.04},
+            "get_replacement_candidates": {"throughput": 1.0, "p50_ms": 900.0, "p99_ms": 900.0},
+        }}
+
+        regressions = compare(results, baseline, threshold=0.25)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all("sequence_books" in r for r in regressions))
+        self.assertIn("p50_ms", regressions[0])
+        self.assertIn("throughput", regressions[1])
+        self.assertEqual(compare(results, baseline, threshold=1.5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
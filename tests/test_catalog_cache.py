@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from benchmarks.catalog import make_catalog
+from src.books import BOOKS_FILE, load_books
+from src.catalog_cache import TEXT_DTYPE, compiled_path, load_compiled, meta_path
+
+
+class TestCatalogCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, "books.csv")
+        shutil.copyfile(BOOKS_FILE, self.csv_path)
+        self.builds = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _build(self):
+        self.builds += 1
+        return load_books(self.csv_path, use_cache=False)
+
+    def test_compiled_catalog_matches_csv_load(self):
+        expected = load_books(self.csv_path, use_cache=False)
+
+        load_books(self.csv_path)
+        cached = load_books(self.csv_path)
+
+        self.assertTrue(os.path.exists(compiled_path(self.csv_path)))
+        pd.testing.assert_frame_equal(cached, expected)
+        self.assertEqual(cached["category"].dtype, TEXT_DTYPE)
+        self.assertTrue(pd.isna(cached.loc[0, "subcategory"]))
+
+    def test_cached_load_is_faster_on_a_large_catalog(self):
+        make_catalog(100_000, source=load_books(self.csv_path)).to_csv(self.csv_path, index=False)
+        load_books(self.csv_path)
+
+        def best_of(load):
+            timings = []
+            for _ in range(3):
+                started = time.perf_counter()
+                load()
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        uncached = best_of(lambda: load_books(self.csv_path, use_cache=False))
+        cached = best_of(lambda: load_books(self.csv_path))
+        self.assertLess(cached, uncached / 2)
+
+    def test_reuses_artifact_until_source_changes(self):
+        load_compiled(self.csv_path, self._build)
+        load_compiled(self.csv_path, self._build)
+        self.assertEqual(self.builds, 1)
+
+        # Same content with a new mtime only needs the hash check.
+        stat = os.stat(self.csv_path)
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        load_compiled(self.csv_path, self._build)
+        self.assertEqual(self.builds, 1)
+
+        with open(self.csv_path, "a", encoding="utf-8") as f:
+            f.write(
+                "9999,New Book,New Author,coding,python,1,5,tactical/how-to,"
+                "procedural-skill,,Desc.,https://example.com,,True,False,False\n"
+            )
+        df = load_compiled(self.csv_path, self._build)
+        self.assertEqual(self.builds, 2)
+        self.assertIn(9999, df["id"].tolist())
+
+    def test_rebuilds_when_artifact_is_corrupt(self):
+        load_compiled(self.csv_path, self._build)
+        with open(compiled_path(self.csv_path), "wb") as f:
+            f.write(b"not parquet")
+
+        df = load_compiled(self.csv_path, self._build)
+
+        self.assertEqual(self.builds, 2)
+        self.assertFalse(df.empty)
+        self.assertTrue(os.path.exists(meta_path(self.csv_path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
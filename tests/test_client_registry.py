@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.client_registry import ClientRegistry
+from src.metrics import MetricsRegistry
+from tests.helpers import StubHandler, StubServer, chat_completion_payload
+
+
+class _KeepAliveHandler(StubHandler):
+    """Minimal chat completions endpoint that keeps connections open."""
+    protocol_version = "HTTP/1.1"
+    active = 0
+    peak = 0
+    delay = 0.0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with self.lock:
+            type(self).active += 1
+            type(self).peak = max(type(self).peak, type(self).active)
+        try:
+            time.sleep(self.delay)
+            self.send_json(200, chat_completion_payload("ok"))
+        finally:
+            with self.lock:
+                type(self).active -= 1
+
+
+class TestClientRegistry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubServer(_KeepAliveHandler)
+        cls.base_url = f"{cls.server.url}/v1"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        _KeepAliveHandler.peak = 0
+        _KeepAliveHandler.delay = 0.0
+        self.registry = ClientRegistry(metrics=MetricsRegistry())
+
+    def tearDown(self):
+        self.registry.close()
+
+    def _ask(self, client):
+        return client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}])
+
+    def test_clients_are_keyed_by_api_key_and_base_url(self):
+        client = self.registry.get("sk-a", self.base_url)
+        self.assertIs(self.registry.get("sk-a", self.base_url), client)
+        self.assertIsNot(self.registry.get("sk-b", self.base_url), client)
+        self.assertIsNot(self.registry.get("sk-a", "http://127.0.0.1:1/v1"), client)
+        self.assertIsNot(self.registry.get_async("sk-a", self.base_url), client)
+
+    def test_connections_are_reused_across_lookups(self):
+        for _ in range(10):
+            self._ask(self.registry.get("sk-a", self.base_url))
+
+        report = self.registry.report()
+        self.assertEqual((report["requests"], report["connections"]), (10, 1))
+        self.assertAlmostEqual(report["reuse_rate"], 0.9)
+
+    def test_a_client_per_call_reuses_nothing(self):
+        metrics = MetricsRegistry()
+        for _ in range(3):
+            registry = ClientRegistry(metrics=metrics)
+            self._ask(registry.get("sk-a", self.base_url))
+            registry.close()
+        self.assertEqual(ClientRegistry(metrics=metrics).reuse_rate(), 0.0)
+
+    def test_pool_size_caps_open_connections(self):
+        _KeepAliveHandler.delay = 0.1
+        registry = ClientRegistry(pool_size=2, metrics=MetricsRegistry())
+        client = registry.get("sk-a", self.base_url)
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda _: self._ask(client), range(6)))
+        registry.close()
+
+        self.assertEqual(_KeepAliveHandler.peak, 2)
+        self.assertEqual(registry.report()["connections"], 2)
+
+    def test_async_clients_reuse_connections(self):
+        async def run():
+            client = self.registry.get_async("sk-a", self.base_url)
+            for _ in range(5):
+                await self._ask(client)
+            await self.registry.aclose()
+
+        asyncio.run(run())
+        self.assertEqual(self.registry.report()["connections"], 1)
+        self.assertAlmostEqual(self.registry.reuse_rate(), 0.8)
+
+    def test_least_recently_used_clients_are_evicted_and_closed(self):
+        registry = ClientRegistry(metrics=MetricsRegistry(), max_clients=2)
+        a = registry.get("sk-a", self.base_url)
+        b = registry.get("sk-b", self.base_url)
+        self.assertIs(registry.get("sk-a", self.base_url), a)
+
+        registry.get("sk-c", self.base_url)
+
+        self.assertTrue(b.is_closed())
+        self.assertFalse(a.is_closed())
+        self.assertIsNot(registry.get("sk-b", self.base_url), b)
+        self.assertEqual(registry.metrics.counter("openai.clients.evicted"), 2)
+        registry.close()
+
+    def test_idle_clients_expire(self):
+        now = [0.0]
+        registry = ClientRegistry(metrics=MetricsRegistry(), idle_seconds=60, clock=lambda: now[0])
+        a = registry.get("sk-a", self.base_url)
+        now[0] = 30
+        b = registry.get("sk-b", self.base_url)
+        now[0] = 70
+
+        self.assertIs(registry.get("sk-b", self.base_url), b)
+        self.assertTrue(a.is_closed())
+        registry.close()
+
+    def test_evicted_async_clients_are_closed_by_their_loop(self):
+        registry = ClientRegistry(metrics=MetricsRegistry(), max_clients=1)
+        a = registry.get_async("sk-a", self.base_url)
+        b = registry.get_async("sk-b", self.base_url)
+
+        self.assertEqual(registry.take_retired(), [a])
+        self.assertEqual(registry.take_retired(), [])
+        registry.get_async("sk-a", self.base_url)
+
+        asyncio.run(registry.aclose())
+        self.assertTrue(b.is_closed())
+
+    def test_no_requests_no_rate(self):
+        self.assertIsNone(self.registry.reuse_rate())
+
+
+if __name__ == "__main__":
+    unittest.main()
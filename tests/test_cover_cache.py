@@ -0,0 +1,56 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from src.cover_cache import CoverCache
+
+
+def _write_covers(path, worker):
+    cache = CoverCache(path)
+    for i in range(25):
+        cache.put_many({(f"Book {worker}-{i}", "Author"): f"http://covers/{worker}-{i}.jpg"})
+
+
+class TestCoverCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "covers.sqlite3")
+        self.now = [1000.0]
+        self.cache = CoverCache(self.path, hit_ttl=100, miss_ttl=10, clock=lambda: self.now[0])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_stores_hits_and_negative_results(self):
+        self.cache.put_many({("Found", "A"): "http://covers/found.jpg", ("Missing", "B"): None})
+
+        cached = self.cache.get_many([("Found", "A"), ("Missing", "B"), ("Unknown", "C")])
+
+        self.assertEqual(cached, {("Found", "A"): "http://covers/found.jpg", ("Missing", "B"): None})
+
+    def test_hits_and_misses_expire_separately(self):
+        self.cache.put_many({("Found", "A"): "http://covers/found.jpg", ("Missing", "B"): None})
+
+        self.now[0] += 11
+        self.assertEqual(self.cache.get_many([("Found", "A"), ("Missing", "B")]), {("Found", "A"): "http://covers/found.jpg"})
+        self.assertEqual(self.cache.purge_expired(), 1)
+
+        self.now[0] += 100
+        self.assertEqual(self.cache.get_many([("Found", "A")]), {})
+
+    def test_concurrent_writers_from_several_processes(self):
+        CoverCache(self.path).get_many([("warm", "up")])
+        processes = [multiprocessing.Process(target=_write_covers, args=(self.path, worker)) for worker in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        keys = [(f"Book {worker}-{i}", "Author") for worker in range(4) for i in range(25)]
+        self.assertTrue(all(process.exitcode == 0 for process in processes))
+        self.assertEqual(len(CoverCache(self.path).get_many(keys)), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
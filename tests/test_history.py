@@ -0,0 +1,88 @@
+import unittest
+
+import pandas as pd
+
+from src.history import compact_history, gather_slots
+from src.intent_parser import IntentVocabulary
+from src.llm_client import estimate_message_tokens, estimate_tokens
+
+
+def _vocab():
+    return IntentVocabulary.from_books(pd.DataFrame({
+        "id": range(3),
+        "category": ["coding", "coding", "history"],
+        "subcategory": ["python", "rust", "WWII"],
+    }))
+
+
+def _conversation(turns):
+    messages = []
+    for i, text in enumerate(turns):
+        messages.append({"role": "user", "content": text})
+        messages.append({"role": "assistant", "content": f"Reply {i}"})
+    return messages
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.vocab = _vocab()
+
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("abcd"), 1)
+        self.assertEqual(estimate_tokens("abcde"), 2)
+        self.assertEqual(estimate_tokens({"a": 1}), 2)
+        self.assertEqual(estimate_message_tokens([{"role": "user", "content": "abcd"}]), 5)
+
+    def test_short_history_is_unchanged(self):
+        messages = _conversation(["hi", "python please"])
+        self.assertEqual(compact_history(messages, self.vocab), messages)
+
+    def test_older_turns_fold_into_slot_summary(self):
+        messages = _conversation([
+            "I want to learn python",
+            "I'm a beginner",
+            "Something practical",
+            "Actually make it rust",
+            "and a deep dive",
+            "what do you think?",
+        ])
+        compacted = compact_history(messages, self.vocab, keep_turns=2, max_tokens=None)
+
+        self.assertEqual(compacted[1:], messages[-4:])
+        summary = compacted[0]
+        self.assertEqual(summary["role"], "system")
+        self.assertIn("8 earlier messages", summary["content"])
+        self.assertIn("topic: coding; niche: rust; level: beginner; style: tactical/how-to", summary["content"])
+        self.assertNotIn("depth", summary["content"])
+
+    def test_new_topic_clears_old_niche(self):
+        slots = gather_slots(_conversation(["python", "now ww2", "actually history in general"]), self.vocab)
+        self.assertEqual(slots, {"category": "history"})
+
+    def test_budget_folds_more_turns(self):
+        messages = _conversation([f"message {i} " + "x" * 400 for i in range(6)])
+        compacted = compact_history(messages, self.vocab, keep_turns=4, max_tokens=300, reserved_tokens=50)
+
+        self.assertLessEqual(estimate_message_tokens(compacted) + 50, 300)
+        self.assertEqual(compacted[-2:], messages[-2:])
+        self.assertLess(len(compacted), 9)
+
+    def test_latest_turn_is_always_kept(self):
+        messages = _conversation(["a" * 4000, "b" * 4000])
+        compacted = compact_history(messages, self.vocab, max_tokens=100)
+        self.assertEqual(compacted[-2:], messages[-2:])
+        self.assertEqual(compacted[0]["role"], "system")
+
+    def test_request_size_stays_bounded(self):
+        sizes = []
+        for length in (10, 50, 200):
+            messages = _conversation([f"beginner python question {i} " + "y" * 200 for i in range(length)])
+            sizes.append(estimate_message_tokens(compact_history(messages, self.vocab, max_tokens=1000)))
+        self.assertTrue(all(size <= 1000 for size in sizes))
+        # Only the digits in message numbers differ between session lengths.
+        self.assertLessEqual(max(sizes) - min(sizes), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.books import BOOKS_FILE, DataLoadingError, load_books
+from src.catalog_cache import compiled_path, load_compiled
+from src.ingest import ingest_books
+
+
+HEADER = (
+    "id,title,author,category,subcategory,difficulty,readability,style,learning_type,"
+    "chronology_hint,short_description,store_url,affiliate_url,"
+    "is_beginner_friendly,is_intermediate,is_advanced\n"
+)
+
+
+def _row(book_id, difficulty="1", beginner="True"):
+    return (
+        f"{book_id},Book {book_id},Author,coding,python,{difficulty},4,tactical/how-to,"
+        f"procedural-skill,,Desc.,https://example.com,,{beginner},False,False\n"
+    )
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, "books.csv")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, *rows):
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write(HEADER + "".join(rows))
+
+    def test_collects_every_row_error_across_chunks(self):
+        self._write(
+            _row(1),
+            _row(2, difficulty="6"),
+            _row(3, beginner="maybe"),
+            _row(1),
+            _row("x"),
+        )
+
+        report = ingest_books(self.csv_path, chunksize=2)
+
+        self.assertFalse(report.ok)
+        self.assertEqual(report.rows_read, 5)
+        self.assertEqual(report.rows_valid, 1)
+        self.assertEqual(
+            [(error.row, error.column) for error in report.errors],
+            [(1, "difficulty"), (2, "is_beginner_friendly"), (3, "id"), (4, "id")],
+        )
+        self.assertIn("Duplicate book ID: 1", report.errors[2].message)
+        self.assertIsNone(report.output_path)
+        self.assertFalse(os.path.exists(compiled_path(self.csv_path)))
+
+    def test_accepts_exactly_what_load_books_accepts(self):
+        for bad_row in (_row(1, difficulty="2.5"), _row(1, difficulty="6"), _row("1.5"), _row(1, beginner="maybe")):
+            with self.subTest(row=bad_row):
+                self._write(_row(2), bad_row)
+                self.assertFalse(ingest_books(self.csv_path).ok)
+                with self.assertRaises(DataLoadingError):
+                    load_books(self.csv_path, use_cache=False)
+
+        self._write(_row(2), _row(1, difficulty="5.0", beginner="yes"))
+        report = ingest_books(self.csv_path)
+        self.assertTrue(report.ok)
+        pd.testing.assert_frame_equal(
+            load_compiled(self.csv_path, lambda: self.fail("compiled catalog should have been reused")),
+            load_books(self.csv_path, use_cache=False),
+        )
+
+    def test_reports_missing_columns(self):
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write("id,title\n1,Book\n")
+
+        report = ingest_books(self.csv_path)
+
+        self.assertEqual(len(report.errors), 1)
+        self.assertIn("missing required columns", report.errors[0].message)
+
+    def test_clean_catalog_is_compiled_for_load_books(self):
+        shutil.copyfile(BOOKS_FILE, self.csv_path)
+
+        report = ingest_books(self.csv_path, chunksize=64)
+
+        self.assertTrue(report.ok)
+        self.assertEqual(report.output_path, compiled_path(self.csv_path))
+
+        def fail_build():
+            raise AssertionError("compiled catalog should have been reused")
+
+        pd.testing.assert_frame_equal(
+            load_compiled(self.csv_path, fail_build),
+            load_books(self.csv_path, use_cache=False),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import pandas as pd
+
+from benchmarks.intent_parser import evaluate, load_corpus
+from src.books import load_books
+from src.intent_parser import IntentVocabulary, get_intent_vocabulary, parse_intent
+
+
+def _catalog():
+    return pd.DataFrame({
+        "id": range(7),
+        "category": ["coding", "coding", "coding", "history", "history", "business", "science"],
+        "subcategory": ["python", "history", None, "WWII", "narrative", "psychology", "stats"],
+    })
+
+
+class TestIntentParser(unittest.TestCase):
+    def setUp(self):
+        self.vocab = IntentVocabulary.from_books(_catalog())
+
+    def test_fully_specified_message_is_confident(self):
+        parsed = parse_intent("Beginner Python, tactical, short", self.vocab)
+        self.assertTrue(parsed.confident)
+        self.assertEqual(parsed.args, {
+            "category": "coding",
+            "subcategory": "python",
+            "level": "beginner",
+            "style": "tactical/how-to",
+            "depth": "short",
+        })
+
+    def test_synonyms(self):
+        parsed = parse_intent("I'm new to programming, want a hands-on deep dive", self.vocab)
+        self.assertEqual(parsed.args["category"], "coding")
+        self.assertEqual(parsed.args["level"], "beginner")
+        self.assertEqual(parsed.args["style"], "tactical/how-to")
+        self.assertEqual(parsed.args["depth"], "deep")
+
+        parsed = parse_intent("intermediate ww2 stories, short", self.vocab)
+        self.assertEqual((parsed.args["category"], parsed.args["subcategory"]), ("history", "WWII"))
+
+    def test_category_named_as_subcategory_of_another(self):
+        parsed = parse_intent("coding history for beginners, narrative, quick", self.vocab)
+        self.assertEqual((parsed.args["category"], parsed.args["subcategory"]), ("coding", "history"))
+        self.assertEqual(parsed.args["style"], "story-driven")
+
+    def test_style_words_are_not_subcategories(self):
+        parsed = parse_intent("advanced history narrative, short", self.vocab)
+        self.assertEqual(parsed.args["subcategory"], None)
+        self.assertEqual(parsed.args["style"], "story-driven")
+
+    def test_missing_slots_lower_confidence(self):
+        self.assertFalse(parse_intent("I want to learn coding", self.vocab).confident)
+        self.assertEqual(parse_intent("beginner gardening, short, practical", self.vocab).confidence, 0)
+
+    def test_negation_conflict_and_unknown_words_fall_back(self):
+        for message in [
+            "not too advanced python, practical, short",
+            "beginner or advanced python, practical, short",
+            "beginner python practical short like Fluent Python by Ramalho",
+        ]:
+            with self.subTest(message=message):
+                self.assertFalse(parse_intent(message, self.vocab).confident)
+
+    def test_vocabulary_is_built_once_per_version(self):
+        books = _catalog()
+        vocab = get_intent_vocabulary(books, version=101)
+        self.assertIs(get_intent_vocabulary(books, version=101), vocab)
+        self.assertIsNot(get_intent_vocabulary(books, version=102), vocab)
+
+    def test_benchmark_corpus_has_no_wrong_bypasses(self):
+        report = evaluate(load_corpus(), IntentVocabulary.from_books(load_books(use_cache=False)))
+        self.assertEqual(report["errors"], [])
+        self.assertGreater(report["bypassed"], report["prompts"] // 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
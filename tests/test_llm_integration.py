@@ -1,7 +1,36 @@
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import json
+
+import pandas as pd
+
+import src.llm_client as llm_client
+from src.catalog import Catalog
 from src.llm_client import get_sequence_rationale, get_chat_completion
+from tests.helpers import use_uncached_catalog
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = """
+import sys
+import time
+started = time.perf_counter()
+import openai
+openai_seconds = time.perf_counter() - started
+started = time.perf_counter()
+import src.llm_client
+print(",".join(m for m in ("pandas", "pyarrow", "src.books", "src.catalog", "src.catalog_cache") if m in sys.modules))
+print(time.perf_counter() - started, openai_seconds)
+"""
+
+
+def setUpModule():
+    use_uncached_catalog()
+
 
 class TestLLMIntegration(unittest.TestCase):
     def test_get_sequence_rationale(self):
@@ -52,5 +81,78 @@ class TestLLMIntegration(unittest.TestCase):
         self.assertEqual(args['category'], 'coding')
         self.assertEqual(args['level'], 'beginner')
         
+
+class TestLazyPrompt(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.catalog = Catalog(os.path.join(self.tmp_dir.name, "books.csv"), loader=lambda path: self._books(["coding"]))
+        patcher = patch("src.catalog.get_catalog", return_value=self.catalog)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+        llm_client._prompt_cache = None
+        llm_client._catalog_retry_at = 0.0
+
+    def _books(self, categories):
+        return pd.DataFrame({"id": range(len(categories)), "category": pd.Series(categories, dtype=object)})
+
+    def _category_enum(self):
+        return llm_client.get_tools()[0]["function"]["parameters"]["properties"]["category"]["enum"]
+
+    def test_import_does_not_load_catalog(self):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        loaded, timings = result.stdout.split("\n")[:2]
+        self.assertEqual(loaded, "")
+        # Relative to openai's own import so slow machines scale both sides;
+        # pulling in pandas alone costs most of an openai import.
+        own_seconds, openai_seconds = map(float, timings.split())
+        self.assertLess(own_seconds, 0.25 * openai_seconds)
+
+    def test_prompt_is_memoized_per_catalog_version(self):
+        tools = llm_client.get_tools()
+        self.assertEqual(self._category_enum(), ["coding"])
+        self.assertIs(llm_client.get_tools(), tools)
+
+        # A new version with the same categories reuses the built schema.
+        self.catalog.swap(self._books(["coding", "coding"]))
+        self.assertIs(llm_client.get_tools(), tools)
+
+        self.catalog.swap(self._books(["coding", "history"]))
+        self.assertEqual(self._category_enum(), ["coding", "history"])
+        self.assertIn("Coding, History", llm_client.get_system_prompt())
+
+    def test_module_constants_are_still_available(self):
+        self.assertIs(llm_client.TOOLS, llm_client.get_tools())
+        self.assertEqual(llm_client.SYSTEM_PROMPT, llm_client.get_system_prompt())
+        with self.assertRaises(AttributeError):
+            llm_client.NOT_A_CONSTANT
+
+    def test_falls_back_when_catalog_is_empty(self):
+        self.catalog.swap(self._books([]))
+        self.assertEqual(self._category_enum(), llm_client.FALLBACK_CATEGORIES)
+
+    def test_failed_catalog_load_is_not_retried_on_every_call(self):
+        with patch("src.catalog.get_catalog", side_effect=OSError("unreadable")) as get_catalog:
+            self.assertEqual(self._category_enum(), llm_client.FALLBACK_CATEGORIES)
+            self.assertEqual(self._category_enum(), llm_client.FALLBACK_CATEGORIES)
+            self.assertEqual(get_catalog.call_count, 1)
+
+            llm_client._catalog_retry_at = 0.0
+            self._category_enum()
+            self.assertEqual(get_catalog.call_count, 2)
+
+        llm_client._catalog_retry_at = 0.0
+        self.assertEqual(self._category_enum(), ["coding"])
+
+    def test_chat_completion_uses_live_schema(self):
+        mock_client = MagicMock()
+        get_chat_completion(mock_client, [{"role": "user", "content": "hi"}])
+        kwargs = mock_client.chat.completions.create.call_args.kwargs
+        self.assertIs(kwargs["tools"], llm_client.get_tools())
+        self.assertEqual(kwargs["messages"][0]["content"], llm_client.get_system_prompt())
+
+
 if __name__ == '__main__':
     unittest.main()
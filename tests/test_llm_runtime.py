@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import openai
+
+from src.client_registry import ClientRegistry
+from src.llm_client import (
+    RATIONALE_FALLBACK,
+    TIMEOUT_MESSAGE,
+    LLMClientError,
+    RequestScheduler,
+    aget_chat_completion,
+    aget_sequence_rationale,
+)
+from src.llm_runtime import AsyncLLMRunner, LLMCallCancelled
+from src.metrics import MetricsRegistry
+from tests.helpers import REQUEST, FakeAsyncClient, use_uncached_catalog
+
+BOOKS = [{"id": 1, "title": "A", "author": "X"}]
+
+
+def setUpModule():
+    use_uncached_catalog()
+
+
+class TestAsyncCalls(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsRegistry()
+        self.scheduler = RequestScheduler(max_concurrency=32, metrics=self.metrics, async_sleep=self._no_sleep)
+
+    async def _no_sleep(self, seconds):
+        pass
+
+    def test_retries_then_replies(self):
+        client = FakeAsyncClient([openai.APITimeoutError(request=REQUEST), None])
+        message = asyncio.run(aget_chat_completion(
+            client, [{"role": "user", "content": "hi"}], scheduler=self.scheduler
+        ))
+        self.assertEqual(message.content, "Reply #2")
+        self.assertEqual(self.metrics.counter("llm.retries"), 1)
+
+    def test_chat_timeout_raises_user_facing_error(self):
+        client = FakeAsyncClient(delay=5)
+        with self.assertRaises(LLMClientError) as ctx:
+            asyncio.run(aget_chat_completion(
+                client, [{"role": "user", "content": "hi"}], scheduler=self.scheduler, timeout=0.05
+            ))
+        self.assertEqual(ctx.exception.user_message, TIMEOUT_MESSAGE)
+        self.assertEqual(client.completions.cancelled, 1)
+
+    def test_rationale_timeout_falls_back(self):
+        client = FakeAsyncClient(delay=5)
+        rationale = asyncio.run(aget_sequence_rationale(
+            client, "q", BOOKS, scheduler=self.scheduler, timeout=0.05
+        ))
+        self.assertEqual(rationale, RATIONALE_FALLBACK)
+
+
+class TestAsyncLLMRunner(unittest.TestCase):
+    def setUp(self):
+        self.runner = AsyncLLMRunner(name="test-llm-loop", registry=ClientRegistry(metrics=MetricsRegistry()))
+        self.scheduler = RequestScheduler(max_concurrency=32, metrics=MetricsRegistry())
+
+    def tearDown(self):
+        self.runner.close()
+
+    def _rationale(self, client, query="q"):
+        return aget_sequence_rationale(client, query, BOOKS, scheduler=self.scheduler)
+
+    def test_evicted_clients_are_closed_on_the_loop(self):
+        self.runner.registry.max_clients = 1
+        first = self.runner.client("sk-a")
+        self.runner.client("sk-b")
+
+        self.runner.submit(asyncio.sleep(0.05)).result(timeout=2)
+        self.assertTrue(first.is_closed())
+
+    def test_many_calls_share_one_loop_thread(self):
+        client = FakeAsyncClient(delay=0.2)
+        started = time.perf_counter()
+        futures = [self.runner.submit(self._rationale(client, f"q{i}")) for i in range(20)]
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(len(set(results)), 20)
+        self.assertEqual(client.completions.threads, {"test-llm-loop"})
+
+    def test_new_call_cancels_the_previous_one_from_the_session(self):
+        slow = FakeAsyncClient(delay=5)
+        outcome = {}
+
+        def first_call():
+            try:
+                self.runner.run(self._rationale(slow), session_id="s1")
+            except LLMCallCancelled as exc:
+                outcome["error"] = exc
+
+        waiter = threading.Thread(target=first_call)
+        waiter.start()
+        time.sleep(0.1)
+        other = self.runner.submit(self._rationale(FakeAsyncClient()), session_id="s2")
+        reply = self.runner.run(self._rationale(FakeAsyncClient()), session_id="s1")
+        waiter.join(timeout=2)
+
+        self.assertIsInstance(outcome.get("error"), LLMCallCancelled)
+        self.assertEqual(slow.completions.cancelled, 1)
+        self.assertEqual(reply, "Reply #1")
+        self.assertEqual(other.result(timeout=2), "Reply #1")
+
+    def test_cancel(self):
+        slow = FakeAsyncClient(delay=5)
+        future = self.runner.submit(self._rationale(slow), session_id="s1")
+        time.sleep(0.05)
+        self.assertTrue(self.runner.cancel("s1"))
+        self.assertFalse(self.runner.cancel("s1"))
+        self.assertTrue(future.cancelled())
+
+    def test_one_client_per_api_key(self):
+        self.assertIs(self.runner.client("sk-a"), self.runner.client("sk-a"))
+        self.assertIsNot(self.runner.client("sk-a"), self.runner.client("sk-b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
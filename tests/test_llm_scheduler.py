@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import openai
+
+from src.llm_client import (
+    LLMClientError,
+    RequestScheduler,
+    TokenBucket,
+    get_chat_completion,
+    get_sequence_rationale,
+)
+from src.metrics import MetricsRegistry
+from tests.helpers import REQUEST, FakeClient, status_error, use_uncached_catalog
+
+
+def setUpModule():
+    use_uncached_catalog()
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_reservations_queue_in_order(self):
+        fake = FakeTime()
+        bucket = TokenBucket(per_minute=60, capacity=2, clock=fake.clock)
+
+        self.assertEqual(bucket.reserve(1), 0)
+        self.assertEqual(bucket.reserve(1), 0)
+        self.assertAlmostEqual(bucket.reserve(1), 1.0)
+        self.assertAlmostEqual(bucket.reserve(1), 2.0)
+        fake.now += 10
+        self.assertEqual(bucket.reserve(1), 0)
+
+    def test_oversized_requests_are_clamped(self):
+        bucket = TokenBucket(per_minute=600, clock=lambda: 0.0)
+        self.assertEqual(bucket.reserve(10_000), 0)
+        self.assertAlmostEqual(bucket.reserve(10), 1.0)
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeTime()
+        self.metrics = MetricsRegistry()
+
+    def _scheduler(self, **kwargs):
+        kwargs.setdefault("rng", lambda: 1.0)
+        return RequestScheduler(metrics=self.metrics, clock=self.fake.clock, sleep=self.fake.sleep, **kwargs)
+
+    def test_retries_retryable_errors_with_backoff(self):
+        client = FakeClient([
+            status_error(openai.RateLimitError, 429),
+            openai.APITimeoutError(request=REQUEST),
+            status_error(openai.InternalServerError, 503),
+            "Because.",
+        ])
+        rationale = get_sequence_rationale(
+            client, "q", [{"title": "A", "author": "B"}], scheduler=self._scheduler()
+        )
+
+        self.assertEqual(rationale, "Because.")
+        self.assertEqual(client.completions.calls, 4)
+        self.assertEqual(self.fake.sleeps, [0.5, 1.0, 2.0])
+        self.assertEqual(self.metrics.counter("llm.retries"), 3)
+        self.assertEqual(self.metrics.counter("llm.requests"), 4)
+
+    def test_gives_up_after_max_retries(self):
+        client = FakeClient([status_error(openai.RateLimitError, 429)])
+        with self.assertRaises(LLMClientError) as ctx:
+            get_chat_completion(client, [{"role": "user", "content": "hi"}], scheduler=self._scheduler(max_retries=2))
+
+        self.assertIn("rate limit", ctx.exception.user_message)
+        self.assertEqual(client.completions.calls, 3)
+        self.assertEqual(self.metrics.counter("llm.failures"), 1)
+
+    def test_non_retryable_errors_fail_immediately(self):
+        client = FakeClient([status_error(openai.AuthenticationError, 401), "never"])
+        with self.assertRaises(LLMClientError):
+            get_chat_completion(client, [{"role": "user", "content": "hi"}], scheduler=self._scheduler())
+        self.assertEqual(client.completions.calls, 1)
+        self.assertEqual(self.fake.sleeps, [])
+
+    def test_backoff_is_jittered_capped_and_honors_retry_after(self):
+        scheduler = self._scheduler(rng=lambda: 0.5, backoff_base=1.0, backoff_max=4.0)
+        self.assertEqual([scheduler.backoff(attempt) for attempt in range(4)], [0.5, 1.0, 2.0, 2.0])
+
+        throttled = status_error(openai.RateLimitError, 429, headers={"retry-after": "3"})
+        self.assertEqual(scheduler.backoff(0, throttled), 3.0)
+
+    def test_request_rate_delays_calls(self):
+        scheduler = self._scheduler(requests_per_minute=60)
+        for _ in range(60):
+            scheduler.call(lambda: None)
+        self.assertEqual(self.fake.sleeps, [])
+
+        scheduler.call(lambda: None)
+        self.assertAlmostEqual(self.fake.sleeps[-1], 1.0)
+
+    def test_token_rate_delays_calls(self):
+        scheduler = self._scheduler(tokens_per_minute=600)
+        scheduler.call(lambda: None, estimated_tokens=600)
+        scheduler.call(lambda: None, estimated_tokens=300)
+
+        self.assertEqual(len(self.fake.sleeps), 1)
+        self.assertAlmostEqual(self.fake.sleeps[0], 30.0, places=5)
+        self.assertAlmostEqual(self.metrics.histogram("llm.wait_seconds")["max"], 30.0, places=5)
+
+    def test_concurrency_is_capped(self):
+        scheduler = RequestScheduler(max_concurrency=2, metrics=self.metrics)
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def request():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        threads = [threading.Thread(target=scheduler.call, args=(request,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(scheduler.queue_depth, 0)
+        self.assertGreaterEqual(self.metrics.histogram("llm.queue_depth")["max"], 2)
+
+    def test_sync_and_async_calls_share_the_cap(self):
+        scheduler = RequestScheduler(max_concurrency=2, metrics=self.metrics)
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def enter():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+
+        def leave():
+            with lock:
+                active[0] -= 1
+
+        def request():
+            enter()
+            time.sleep(0.02)
+            leave()
+
+        async def arequest():
+            enter()
+            await asyncio.sleep(0.02)
+            leave()
+
+        async def run_async():
+            await asyncio.gather(*(scheduler.acall(arequest) for _ in range(4)))
+
+        threads = [threading.Thread(target=scheduler.call, args=(request,)) for _ in range(4)]
+        threads.append(threading.Thread(target=asyncio.run, args=(run_async(),)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(scheduler._slots.in_use, 0)
+
+    def test_cancelled_async_waiter_gives_up_its_place(self):
+        scheduler = RequestScheduler(max_concurrency=1, metrics=self.metrics)
+
+        async def run():
+            scheduler._slots.acquire()
+            waiter = asyncio.ensure_future(scheduler.acall(lambda: asyncio.sleep(0)))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            scheduler._slots.release()
+            await scheduler.acall(lambda: asyncio.sleep(0))
+
+        asyncio.run(run())
+        self.assertEqual(scheduler._slots.in_use, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
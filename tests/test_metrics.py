@@ -0,0 +1,53 @@
+import threading
+import unittest
+
+from src.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_counters_and_histograms(self):
+        metrics = MetricsRegistry()
+        metrics.increment("requests")
+        metrics.increment("requests", 2)
+        for value in range(1, 101):
+            metrics.observe("latency", value / 100)
+
+        self.assertEqual(metrics.counter("requests"), 3)
+        self.assertEqual(metrics.counter("missing"), 0)
+        summary = metrics.histogram("latency")
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["mean"], 0.505)
+        self.assertEqual(summary["p50"], 0.5)
+        self.assertEqual(summary["p99"], 0.99)
+        self.assertEqual(summary["max"], 1.0)
+
+    def test_samples_are_bounded_but_counts_are_not(self):
+        metrics = MetricsRegistry(max_samples=10)
+        for value in range(100):
+            metrics.observe("latency", value)
+
+        summary = metrics.histogram("latency")
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["p50"], 94)
+
+    def test_reset_by_prefix(self):
+        metrics = MetricsRegistry()
+        metrics.increment("rationale.errors")
+        metrics.observe("rationale.ttft", 0.1)
+        metrics.increment("covers.errors")
+        metrics.reset("rationale.")
+
+        self.assertEqual(metrics.snapshot(), {"counters": {"covers.errors": 1}, "histograms": {}})
+
+    def test_concurrent_increments(self):
+        metrics = MetricsRegistry()
+        threads = [threading.Thread(target=lambda: [metrics.increment("n") for _ in range(1000)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(metrics.counter("n"), 8000)
+
+
+if __name__ == "__main__":
+    unittest.main()
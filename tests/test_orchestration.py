@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+
+from src.orchestration import assemble_path_extras
+
+BOOKS = [{"id": 1, "title": "A", "author": "X"}, {"id": 2, "title": "B", "author": "Y"}]
+DELAY = 0.3
+
+
+class TestAssemblePathExtras(unittest.TestCase):
+    def test_covers_and_rationale_run_concurrently(self):
+        covers_started = threading.Event()
+
+        def fetch_covers(books, cache=None):
+            covers_started.set()
+            time.sleep(DELAY)
+            return {(b["title"], b["author"]): f"http://covers/{b['id']}.jpg" for b in books}
+
+        def stream_rationale(client, user_query, books, model, cache, store):
+            # Covers must already be in flight before the first token arrives.
+            self.assertTrue(covers_started.wait(timeout=2))
+            time.sleep(DELAY / 2)
+            yield "Starts with A, "
+            time.sleep(DELAY / 2)
+            yield "then B."
+
+        updates = []
+        started = time.perf_counter()
+        extras = assemble_path_extras(
+            None, "q", BOOKS,
+            on_rationale=updates.append,
+            fetch_covers=fetch_covers,
+            stream_rationale=stream_rationale,
+        )
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, DELAY * 1.7)
+        self.assertEqual(extras.rationale, "Starts with A, then B.")
+        self.assertEqual(updates, ["Starts with A, ", "Starts with A, then B."])
+        self.assertEqual(extras.covers[("B", "Y")], "http://covers/2.jpg")
+
+    def test_cover_failure_keeps_rationale(self):
+        def fetch_covers(books, cache=None):
+            raise RuntimeError("boom")
+
+        extras = assemble_path_extras(
+            None, "q", BOOKS,
+            fetch_covers=fetch_covers,
+            stream_rationale=lambda *args, **kwargs: iter(["Because."]),
+        )
+        self.assertEqual(extras.rationale, "Because.")
+        self.assertEqual(extras.covers, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.path_table import (
+    PathTable,
+    build_path_table,
+    check_path_table,
+    load_path_table,
+    save_path_table,
+)
+from src.recommendations import execute_recommendation, normalize_query
+
+
+class TestPathTable(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {
+                "id": [1, 2, 3, 4, 5],
+                "title": [f"Book {i}" for i in range(1, 6)],
+                "author": ["A"] * 5,
+                "category": ["coding"] * 4 + ["habits"],
+                "subcategory": ["python", "python", "rust", None, None],
+                "difficulty": [3, 1, 2, 4, 1],
+                "readability": [5, 4, 3, 2, 5],
+                "style": ["tactical/how-to"] * 3 + ["academic", "story-driven"],
+                "learning_type": ["procedural-skill"] * 4 + ["behavioral-skill"],
+                "chronology_hint": [None] * 5,
+                "is_beginner_friendly": [True, True, False, True, True],
+                "is_intermediate": [True] * 5,
+                "is_advanced": [False, False, True, True, False],
+            }
+        )
+
+    def test_build_covers_parameter_space_and_matches_live_logic(self):
+        table = build_path_table(self.df)
+
+        # coding: 3 subcategory options, habits: 1; x 3 levels x 5 styles x 2 depths
+        self.assertEqual(len(table), (3 + 1) * 3 * 5 * 2)
+        self.assertEqual(table.lookup(normalize_query({"category": "coding", "level": "beginner"})), (2, 1, 4))
+        self.assertEqual(check_path_table(table, self.df), [])
+
+    def test_check_reports_stale_entries(self):
+        table = build_path_table(self.df)
+        query = normalize_query({"category": "coding", "subcategory": "python", "level": "beginner"})
+        table.paths[query] = (1,)
+
+        self.assertEqual(check_path_table(table, self.df), [query])
+
+    def test_round_trip_and_fingerprint_check(self):
+        table = build_path_table(self.df)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "books.paths.json")
+            save_path_table(table, path)
+
+            loaded = load_path_table(self.df, path)
+            self.assertEqual(loaded.paths, table.paths)
+
+            edited = self.df.assign(difficulty=[1, 1, 1, 1, 1])
+            self.assertIsNone(load_path_table(edited, path))
+
+    def test_execute_recommendation_serves_from_table(self):
+        query = normalize_query({"category": "coding", "level": "beginner"})
+        table = PathTable("unused", {query: (4, 1)})
+        stats_calls = []
+
+        result = execute_recommendation(
+            self.df,
+            {"category": "Coding", "level": "beginner"},
+            stats_incrementer=lambda **kwargs: stats_calls.append(kwargs),
+            cache=None,
+            path_table=table,
+        )
+
+        self.assertEqual(result.path["id"].tolist(), [4, 1])
+        self.assertEqual(stats_calls, [{"num_books": 2, "category": "Coding"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
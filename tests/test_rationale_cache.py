@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from openai import APIConnectionError
+
+from src.llm_client import (
+    RATIONALE_FALLBACK,
+    TTFT_METRIC,
+    RequestScheduler,
+    get_sequence_rationale,
+    stream_sequence_rationale,
+)
+from src.metrics import MetricsRegistry
+from src.rationale_cache import RationaleCache, rationale_key
+from tests.helpers import REQUEST, FakeClient
+
+BOOKS = [
+    {"id": 1, "title": "A", "author": "X"},
+    {"id": 2, "title": "B", "author": "Y"},
+]
+
+
+class TestRationaleCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "rationales.sqlite3")
+        self.now = [1000.0]
+        self.cache = RationaleCache(self.path, max_entries=3, ttl=100, clock=lambda: self.now[0])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_key_normalizes_query(self):
+        self.assertEqual(
+            rationale_key("Learn  Python", [1, 2], "m"),
+            rationale_key("learn python ", [1, 2], "m"),
+        )
+        self.assertNotEqual(rationale_key("q", [1, 2], "m"), rationale_key("q", [2, 1], "m"))
+        self.assertNotEqual(rationale_key("q", [1, 2], "m"), rationale_key("q", [1, 2], "other"))
+        self.assertEqual(
+            rationale_key("one", [1, 2], "m", path_only=True),
+            rationale_key("two", [1, 2], "m", path_only=True),
+        )
+
+    def test_entries_expire(self):
+        self.cache.put("k", "text")
+        self.now[0] += 50
+        self.assertEqual(self.cache.get("k"), "text")
+        self.now[0] += 60
+        self.assertIsNone(self.cache.get("k"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_evicts_least_recently_used_down_to_low_water(self):
+        cache = RationaleCache(self.path, max_entries=4, low_water=2, ttl=100, clock=lambda: self.now[0])
+        for key in "abcd":
+            self.now[0] += 1
+            cache.put(key, key.upper())
+        self.now[0] += 1
+        cache.get("a")
+        self.assertEqual(len(cache), 4)
+
+        self.now[0] += 1
+        cache.put("e", "E")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual([cache.get(key) for key in "abcde"], ["A", None, None, None, "E"])
+
+    def test_reads_do_not_take_the_write_lock(self):
+        self.cache.put("k", "text")
+        self.cache.put("j", "other")
+        cache = RationaleCache(self.path, ttl=100, clock=lambda: self.now[0], touch_batch=2)
+        writer = sqlite3.connect(self.path, isolation_level=None)
+        self.addCleanup(writer.close)
+
+        writer.execute("BEGIN IMMEDIATE")
+        self.now[0] += 10
+        self.assertEqual(cache.get("k"), "text")
+        writer.execute("COMMIT")
+
+        # The second read fills the batch and writes both touches.
+        self.now[0] += 10
+        cache.get("j")
+        rows = dict(writer.execute("SELECT key, last_used FROM rationales").fetchall())
+        self.assertEqual(rows, {"k": 1010.0, "j": 1020.0})
+
+    def test_shared_across_instances(self):
+        self.cache.put("k", "text")
+        self.assertEqual(RationaleCache(self.path, clock=lambda: self.now[0]).get("k"), "text")
+
+    def test_rationale_hit_skips_openai(self):
+        client = FakeClient()
+        first = get_sequence_rationale(client, "Learn X", BOOKS, cache=self.cache)
+        second = get_sequence_rationale(client, "learn x", BOOKS, cache=self.cache)
+
+        self.assertEqual(first, "Reply #1")
+        self.assertEqual(second, first)
+        self.assertEqual(client.completions.calls, 1)
+
+        get_sequence_rationale(client, "Learn X", BOOKS[::-1], cache=self.cache)
+        get_sequence_rationale(client, "Learn X", BOOKS, model="gpt-4o", cache=self.cache)
+        self.assertEqual(client.completions.calls, 3)
+
+    def test_path_only_reuses_across_queries(self):
+        client = FakeClient()
+        get_sequence_rationale(client, "first query", BOOKS, cache=self.cache, path_only=True)
+        result = get_sequence_rationale(client, "another query", BOOKS, cache=self.cache, path_only=True)
+
+        self.assertEqual(result, "Reply #1")
+        self.assertEqual(client.completions.calls, 1)
+
+    def test_fallback_is_not_cached(self):
+        failing = FakeClient([APIConnectionError(request=REQUEST)])
+        fallback = get_sequence_rationale(failing, "q", BOOKS, cache=self.cache)
+        self.assertIn("couldn't generate a rationale", fallback)
+
+        client = FakeClient()
+        self.assertEqual(get_sequence_rationale(client, "q", BOOKS, cache=self.cache), "Reply #1")
+
+
+class TestStreamingRationale(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = RationaleCache(os.path.join(self.tmp_dir.name, "rationales.sqlite3"))
+        self.metrics = MetricsRegistry()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _stream(self, client, **kwargs):
+        return list(stream_sequence_rationale(client, "q", BOOKS, cache=self.cache, metrics=self.metrics, **kwargs))
+
+    def test_yields_chunks_and_caches_full_text(self):
+        client = FakeClient()
+        self.assertEqual(self._stream(client), ["Starts ", "with A, ", "then B."])
+        self.assertEqual(self.metrics.histogram(TTFT_METRIC)["count"], 1)
+
+        self.assertEqual(self._stream(client), ["Starts with A, then B."])
+        self.assertEqual(get_sequence_rationale(client, "q", BOOKS, cache=self.cache), "Starts with A, then B.")
+        self.assertEqual(client.completions.calls, 1)
+
+    def test_mid_stream_failure_appends_fallback(self):
+        client = FakeClient(fail_after=2)
+        self.assertEqual(self._stream(client), ["Starts ", "with A, ", f"\n\n{RATIONALE_FALLBACK}"])
+        self.assertEqual(self.metrics.counter("rationale.stream_errors"), 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_failure_before_first_token_yields_fallback(self):
+        self.assertEqual(self._stream(FakeClient([APIConnectionError(request=REQUEST)])), [RATIONALE_FALLBACK])
+        self.assertEqual(self.metrics.histogram(TTFT_METRIC), {"count": 0})
+
+    def test_empty_stream_yields_fallback(self):
+        self.assertEqual(self._stream(FakeClient(chunks=(None,))), [RATIONALE_FALLBACK])
+        self.assertEqual(len(self.cache), 0)
+
+    def test_stream_holds_concurrency_slot_until_done(self):
+        scheduler = RequestScheduler(max_concurrency=1, metrics=self.metrics)
+
+        def slot_free():
+            return scheduler._slots.in_use == 0
+
+        stream = stream_sequence_rationale(FakeClient(), "q", BOOKS, metrics=self.metrics, scheduler=scheduler)
+        self.assertEqual(next(stream), "Starts ")
+        self.assertFalse(slot_free())
+        stream.close()
+        self.assertTrue(slot_free())
+
+        stream = stream_sequence_rationale(FakeClient(), "q", BOOKS, metrics=self.metrics, scheduler=scheduler)
+        self.assertEqual(list(stream), ["Starts ", "with A, ", "then B."])
+        self.assertTrue(slot_free())
+
+
+if __name__ == "__main__":
+    unittest.main()
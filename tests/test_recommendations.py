@@ -2,7 +2,7 @@ import unittest
 
 import pandas as pd
 
-from src.recommendations import execute_recommendation
+from src.recommendations import RecommendationCache, execute_recommendation, normalize_query
 
 
 class TestRecommendations(unittest.TestCase):
@@ -67,6 +67,72 @@ class TestRecommendations(unittest.TestCase):
         self.assertTrue(result.path.empty)
         self.assertEqual(stats_calls, [])
 
+    def _catalog(self):
+        return pd.DataFrame(
+            {
+                "id": [1, 2, 3, 4],
+                "title": ["Book 1", "Book 2", "Book 3", "Book 4"],
+                "author": ["A", "B", "C", "D"],
+                "category": ["coding"] * 4,
+                "subcategory": ["python"] * 4,
+                "difficulty": [3, 1, 2, 4],
+                "readability": [5, 4, 3, 2],
+                "style": ["tactical/how-to"] * 4,
+                "learning_type": ["procedural-skill"] * 4,
+                "chronology_hint": [0] * 4,
+                "is_beginner_friendly": [True] * 4,
+                "is_intermediate": [True] * 4,
+                "is_advanced": [False] * 4,
+            }
+        )
+
+    def test_cache_hit_returns_same_path_and_still_updates_stats(self):
+        df = self._catalog()
+        cache = RecommendationCache()
+        stats_calls = []
+
+        first = execute_recommendation(
+            df,
+            {"category": "coding", "level": "beginner", "depth": "short"},
+            stats_incrementer=lambda **kwargs: stats_calls.append(kwargs),
+            cache=cache,
+        )
+        second = execute_recommendation(
+            df,
+            {"category": " Coding ", "level": "Beginner"},
+            stats_incrementer=lambda **kwargs: stats_calls.append(kwargs),
+            cache=cache,
+        )
+
+        pd.testing.assert_frame_equal(first.path, second.path)
+        self.assertEqual(second.path["id"].tolist(), [2, 3, 1])
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "entries": 1})
+        self.assertEqual(len(stats_calls), 2)
+
+    def test_cache_is_invalidated_by_new_catalog_version(self):
+        cache = RecommendationCache()
+        args = {"category": "coding", "level": "beginner"}
+
+        execute_recommendation(self._catalog(), args, stats_incrementer=lambda **kwargs: None, cache=cache)
+        reloaded = self._catalog().assign(difficulty=[1, 2, 3, 4])
+        result = execute_recommendation(reloaded, args, stats_incrementer=lambda **kwargs: None, cache=cache)
+
+        self.assertEqual(result.path["id"].tolist(), [1, 2, 3])
+        self.assertEqual(cache.stats()["hits"], 0)
+
+    def test_cache_evicts_by_ttl_and_size(self):
+        now = [0.0]
+        cache = RecommendationCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+        queries = [normalize_query({"category": name}) for name in ("a", "b", "c")]
+
+        for query in queries:
+            cache.put(1, query, (1,))
+        self.assertIsNone(cache.get(1, queries[0]))
+        self.assertEqual(cache.get(1, queries[2]), (1,))
+
+        now[0] = 11.0
+        self.assertIsNone(cache.get(1, queries[2]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,201 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from src import roi
+from src.roi import StatsWriter
+
+DAY = 86400.0
+
+
+def _record_paths(stats_path, events_path, events):
+    writer = StatsWriter(stats_path, events_path, flush_every=7, flush_interval=None, compact_after_bytes=2048)
+    for i in range(events):
+        writer.increment(num_books=3, category=f"Topic {i % 3}")
+    writer.flush()
+
+
+class TestStatsWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "roi_stats.json")
+        self.events_path = os.path.join(self.tmp_dir.name, "roi_events.jsonl")
+        self.now = [10 * DAY]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _writer(self, **kwargs):
+        kwargs.setdefault("flush_interval", None)
+        return StatsWriter(self.path, self.events_path, clock=lambda: self.now[0], **kwargs)
+
+    def _log_lines(self):
+        with open(self.events_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_increments_are_buffered_until_flush(self):
+        writer = self._writer(flush_every=10)
+        writer.increment(num_books=4, category="History")
+        writer.increment(num_books=2)
+
+        self.assertFalse(os.path.exists(self.events_path))
+        self.assertEqual(writer.load(), {"paths_generated": 2, "books_recommended": 6})
+
+        writer.flush()
+        self.assertEqual(
+            self._log_lines(),
+            [
+                {"ts": 10 * DAY, "category": "History", "num_books": 4},
+                {"ts": 10 * DAY, "category": None, "num_books": 2},
+            ],
+        )
+        self.assertEqual(writer.pending(), [])
+
+    def test_flushes_after_n_events(self):
+        writer = self._writer(flush_every=3)
+        for _ in range(3):
+            writer.increment(num_books=1)
+
+        self.assertEqual(len(self._log_lines()), 3)
+
+    def test_flushes_on_timer(self):
+        writer = self._writer(flush_every=100, flush_interval=0.05)
+        writer.increment(num_books=5)
+        writer._timer.join(timeout=2)
+
+        self.assertEqual(self._log_lines()[0]["num_books"], 5)
+
+    def test_metrics_group_by_category_and_day(self):
+        writer = self._writer(flush_every=1)
+        writer.increment(num_books=3, category="History")
+        writer.increment(num_books=2, category="Tech")
+        self.now[0] += DAY
+        writer.increment(num_books=4, category="History")
+
+        metrics = writer.metrics()
+        self.assertEqual(metrics["paths_generated"], 3)
+        self.assertEqual(metrics["books_recommended"], 9)
+        self.assertEqual(metrics["topics_explored"], 2)
+        self.assertEqual(metrics["categories"]["History"], {"paths_generated": 2, "books_recommended": 7})
+        self.assertEqual(
+            metrics["daily"],
+            {
+                "1970-01-11": {"paths_generated": 2, "books_recommended": 5},
+                "1970-01-12": {"paths_generated": 1, "books_recommended": 4},
+            },
+        )
+
+    def test_compaction_folds_log_into_snapshot(self):
+        writer = self._writer(flush_every=1)
+        writer.increment(num_books=3, category="History")
+        before = writer.metrics()
+
+        writer.compact()
+        self.assertFalse(os.path.exists(self.events_path))
+        writer.increment(num_books=1, category="Tech")
+
+        self.assertEqual(writer.load(), {"paths_generated": 2, "books_recommended": 4})
+        self.assertEqual(writer.metrics()["categories"]["History"], before["categories"]["History"])
+
+    def test_compacts_once_log_grows(self):
+        writer = self._writer(flush_every=1, compact_after_bytes=200)
+        for _ in range(5):
+            writer.increment(num_books=1)
+
+        with open(self.path) as f:
+            self.assertGreater(json.load(f)["paths_generated"], 0)
+        self.assertEqual(writer.load()["paths_generated"], 5)
+
+    def test_interrupted_compaction_is_not_double_counted(self):
+        writer = self._writer(flush_every=1)
+        writer.increment(num_books=2)
+        writer.compact()
+        # Crash after renaming the log but before the snapshot was written.
+        writer.increment(num_books=5)
+        os.replace(self.events_path, os.path.join(self.tmp_dir.name, "roi_events.2.jsonl"))
+        # Crash after writing the snapshot but before deleting the segment.
+        with open(os.path.join(self.tmp_dir.name, "roi_events.1.jsonl"), "w") as f:
+            f.write(json.dumps({"ts": 0, "category": None, "num_books": 2}) + "\n")
+
+        self.assertEqual(writer.load(), {"paths_generated": 2, "books_recommended": 7})
+        writer.compact()
+        self.assertEqual(writer.load(), {"paths_generated": 2, "books_recommended": 7})
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ["roi_stats.json", "roi_stats.json.lock"])
+
+    def test_reads_are_cached_until_files_change(self):
+        writer = self._writer(flush_every=2)
+        other = self._writer(flush_every=1)
+        writer.increment(num_books=1)
+        writer.increment(num_books=1)
+
+        with mock.patch.object(writer, "_aggregate_locked", wraps=writer._aggregate_locked) as aggregate:
+            writer.load()
+            writer.increment(num_books=4)
+            self.assertEqual(writer.load(), {"paths_generated": 3, "books_recommended": 6})
+            self.assertEqual(aggregate.call_count, 1)
+
+            other.increment(num_books=10)
+            self.assertEqual(writer.load(), {"paths_generated": 4, "books_recommended": 16})
+            self.assertEqual(aggregate.call_count, 2)
+
+            other.compact()
+            self.assertEqual(writer.metrics()["paths_generated"], 4)
+            self.assertEqual(aggregate.call_count, 3)
+
+    def test_reads_legacy_stats_file(self):
+        with open(self.path, "w") as f:
+            json.dump({"paths_generated": 10, "books_recommended": 40, "topics_explored": 3}, f)
+        writer = self._writer(flush_every=1)
+        writer.increment(num_books=2)
+
+        self.assertEqual(writer.load(), {"paths_generated": 11, "books_recommended": 42})
+
+    def test_skips_torn_log_lines(self):
+        with open(self.events_path, "w") as f:
+            f.write(json.dumps({"ts": 0, "category": None, "num_books": 1}) + "\n")
+            f.write('{"ts": 0, "categ')
+
+        self.assertEqual(self._writer().load(), {"paths_generated": 1, "books_recommended": 1})
+
+    def test_threads_do_not_lose_increments(self):
+        writer = self._writer(flush_every=5, compact_after_bytes=4096)
+        threads = [threading.Thread(target=lambda: [writer.increment(num_books=1) for _ in range(200)])
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.flush()
+
+        self.assertEqual(writer.load(), {"paths_generated": 1600, "books_recommended": 1600})
+
+    def test_increment_stats_returns_updated_totals(self):
+        with mock.patch.object(roi, "_writer", self._writer(flush_every=10)):
+            roi.increment_stats(num_books=3, category="Habits")
+            totals = roi.increment_stats(num_books=5, category="Coding")
+
+        self.assertEqual(totals, {"paths_generated": 2, "books_recommended": 8})
+
+    def test_many_processes_do_not_lose_increments(self):
+        processes = [
+            multiprocessing.Process(target=_record_paths, args=(self.path, self.events_path, 150))
+            for _ in range(6)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+            self.assertEqual(process.exitcode, 0)
+
+        metrics = self._writer().metrics()
+        self.assertEqual(metrics["paths_generated"], 900)
+        self.assertEqual(metrics["books_recommended"], 2700)
+        self.assertEqual(metrics["categories"]["Topic 0"]["paths_generated"], 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
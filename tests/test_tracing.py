@@ -0,0 +1,214 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+from types import SimpleNamespace
+
+import pandas as pd
+
+from src.metrics import MetricsRegistry, render_prometheus, start_metrics_server
+from src.orchestration import assemble_path_extras
+from src.recommendations import execute_recommendation
+from src.tracing import (
+    NOOP_SPAN,
+    TRACER,
+    JsonlExporter,
+    MemoryExporter,
+    MetricsExporter,
+    in_current_context,
+    span,
+    start_trace,
+)
+from src.utils import fetch_book_covers
+
+
+def _books():
+    return pd.DataFrame({
+        "id": [1, 2, 3],
+        "title": ["Book 1", "Book 2", "Book 3"],
+        "author": ["A", "B", "C"],
+        "category": ["coding"] * 3,
+        "subcategory": ["python"] * 3,
+        "difficulty": [1, 2, 3],
+        "readability": [5, 4, 3],
+        "style": ["tactical/how-to"] * 3,
+        "learning_type": ["procedural-skill"] * 3,
+        "chronology_hint": [0] * 3,
+        "is_beginner_friendly": [True] * 3,
+        "is_intermediate": [True] * 3,
+        "is_advanced": [False] * 3,
+    })
+
+
+class FakeSession:
+    """Answers Google Books lookups with one thumbnail."""
+
+    def get(self, url, params=None, timeout=None):
+        title = params["q"].split("+inauthor:")[0].removeprefix("intitle:")
+        data = {"items": [{"volumeInfo": {"imageLinks": {"thumbnail": f"http://covers/{title}.jpg"}}}]}
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: data)
+
+
+def _tree(spans):
+    """(name, children) tuples with children sorted by name, so thread timing doesn't matter."""
+    def build(parent_id):
+        children = [s for s in spans if s.parent_id == parent_id]
+        return sorted((child.name, build(child.span_id)) for child in children)
+    return build(None)
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.memory = MemoryExporter()
+        self.metrics = MetricsRegistry()
+        TRACER.configure(enabled=True, exporters=[self.memory, MetricsExporter(self.metrics)])
+
+    def tearDown(self):
+        TRACER.configure(enabled=False)
+
+    def _recommendation_turn(self):
+        def stream_rationale(client, user_query, books, model, cache, store):
+            yield "Starts with Book 1, "
+            yield "ends with Book 3."
+
+        def fetch_covers(books, cache=None):
+            return fetch_book_covers(books, session=FakeSession(), api_url="http://books.test")
+
+        with start_trace("chat_turn", trace_id="turn-1", session_id="s1"):
+            result = execute_recommendation(
+                _books(),
+                {"category": "coding", "level": "beginner", "depth": "short"},
+                stats_incrementer=lambda **kwargs: None,
+                cache=None,
+            )
+            extras = assemble_path_extras(
+                None, "q", result.path.to_dict("records"),
+                fetch_covers=fetch_covers,
+                stream_rationale=stream_rationale,
+            )
+        return extras
+
+    def test_recommendation_flow_span_tree(self):
+        extras = self._recommendation_turn()
+        self.assertEqual(extras.covers[("Book 2", "B")], "http://covers/Book 2.jpg")
+
+        self.assertEqual(len(self.memory.traces), 1)
+        spans = self.memory.traces[0]
+        self.assertEqual(_tree(spans), [
+            ("chat_turn", [
+                ("assemble_path_extras", [
+                    ("fetch_book_covers", [("fetch_book_cover", [])] * 3),
+                    ("get_sequence_rationale", []),
+                ]),
+                ("execute_recommendation", [
+                    ("filter_books", []),
+                    ("increment_stats", []),
+                    ("sequence_books", []),
+                ]),
+            ]),
+        ])
+        self.assertEqual({s.trace_id for s in spans}, {"turn-1"})
+
+        by_id = {s.span_id: s for s in spans}
+        for child in spans:
+            self.assertGreaterEqual(child.duration, 0)
+            parent = by_id.get(child.parent_id)
+            if parent is not None:
+                self.assertGreaterEqual(child.start, parent.start)
+                self.assertLessEqual(child.end, parent.end)
+        attributes = {s.name: s.attributes for s in spans}
+        self.assertEqual(attributes["execute_recommendation"], {"books": 3})
+        self.assertEqual(attributes["get_sequence_rationale"]["chars"], len(extras.rationale))
+
+    def test_jsonl_export(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "traces.jsonl")
+            TRACER.configure(enabled=True, exporters=[JsonlExporter(path)])
+            self._recommendation_turn()
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual(len(records), 11)
+        root = next(r for r in records if r["parent_id"] is None)
+        self.assertEqual((root["name"], root["attributes"]), ("chat_turn", {"session_id": "s1"}))
+        ids = {r["span_id"] for r in records}
+        self.assertTrue(all(r["parent_id"] in ids for r in records if r is not root))
+        self.assertAlmostEqual(root["started_at"], time.time(), delta=60)
+
+    def test_prometheus_text_and_endpoint(self):
+        self._recommendation_turn()
+        text = render_prometheus(self.metrics)
+        self.assertIn("# TYPE halchemy_span_filter_books_seconds summary", text)
+        self.assertIn("halchemy_span_filter_books_seconds_count 1", text)
+        self.assertIn("halchemy_span_fetch_book_cover_seconds_count 3", text)
+
+        server = start_metrics_server(0, self.metrics)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                self.assertEqual(response.read().decode("utf-8"), render_prometheus(self.metrics))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_errors_are_recorded_but_control_flow_is_not(self):
+        with self.assertRaises(ValueError):
+            with start_trace("turn"):
+                with span("broken"):
+                    raise ValueError("boom")
+        with self.assertRaises(KeyboardInterrupt):
+            with start_trace("stopped"):
+                raise KeyboardInterrupt
+
+        errors = {s.name: s.error for trace in self.memory.traces for s in trace}
+        self.assertEqual(errors, {"broken": "ValueError", "turn": "ValueError", "stopped": None})
+        self.assertEqual(self.metrics.counter("span.broken.errors"), 1)
+
+    def test_span_outside_a_trace_starts_its_own(self):
+        with span("render_roadmap"):
+            pass
+        self.assertEqual([[s.name for s in trace] for trace in self.memory.traces], [["render_roadmap"]])
+
+    def test_span_finishing_after_its_root_is_exported_late(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def worker():
+            with span("fetch_book_cover"):
+                started.set()
+                release.wait(5)
+
+        with start_trace("chat_turn", trace_id="turn-1"):
+            thread = threading.Thread(target=in_current_context(worker))
+            thread.start()
+            started.wait(5)
+        release.set()
+        thread.join()
+
+        self.assertEqual([[s.name for s in trace] for trace in self.memory.traces], [["chat_turn"], ["fetch_book_cover"]])
+        late = self.memory.traces[1][0]
+        self.assertEqual(late.trace_id, "turn-1")
+        self.assertEqual(late.parent_id, self.memory.traces[0][0].span_id)
+        self.assertTrue(late.attributes["late"])
+        self.assertEqual(self.metrics.counter("span.late"), 1)
+
+    def test_disabled_tracing_is_a_shared_noop(self):
+        TRACER.configure(enabled=False)
+        func = len
+        self.assertIs(span("filter_books", rows=3), NOOP_SPAN)
+        self.assertIs(start_trace("chat_turn"), NOOP_SPAN)
+        self.assertIs(in_current_context(func), func)
+
+        with span("filter_books") as current:
+            self.assertIs(current, NOOP_SPAN)
+            current.set(rows=1)
+        self.assertIs(span("sequence_books"), NOOP_SPAN)
+        self._recommendation_turn()
+        self.assertEqual(self.memory.traces, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
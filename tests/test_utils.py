@@ -0,0 +1,117 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from src.cover_cache import CoverCache
+from src.utils import fetch_book_covers
+from tests.helpers import StubHandler, StubServer
+
+
+class _StubBooksHandler(StubHandler):
+    active = 0
+    peak = 0
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)["q"][0]
+        title = query.split("+inauthor:")[0].removeprefix("intitle:")
+        with self.lock:
+            type(self).requests += 1
+            type(self).active += 1
+            type(self).peak = max(type(self).peak, type(self).active)
+        try:
+            time.sleep(2 if title == "Slow" else 0.2)
+            if title == "Broken":
+                self.send_response(500)
+                self.end_headers()
+                return
+            items = [] if title == "Missing" else [
+                {"volumeInfo": {"imageLinks": {"thumbnail": f"http://covers/{title}.jpg"}}}
+            ]
+            self.send_json(200, {"items": items})
+        finally:
+            with self.lock:
+                type(self).active -= 1
+
+
+class TestFetchBookCovers(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubServer(_StubBooksHandler)
+        cls.api_url = f"{cls.server.url}/books/v1/volumes"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        _StubBooksHandler.peak = 0
+        _StubBooksHandler.requests = 0
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_fetches_covers_concurrently(self):
+        books = [{"title": f"Book {i}", "author": "Author"} for i in range(5)]
+
+        start = time.monotonic()
+        covers = fetch_book_covers(books, session=self.session, api_url=self.api_url)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(covers[("Book 3", "Author")], "http://covers/Book 3.jpg")
+        self.assertEqual(len(covers), 5)
+        self.assertGreater(_StubBooksHandler.peak, 1)
+        self.assertLess(elapsed, 0.2 * 5)
+
+    def test_returns_partial_results_at_deadline(self):
+        books = [
+            {"title": "Fast", "author": "A"},
+            {"title": "Slow", "author": "B"},
+            {"title": "Missing", "author": "C"},
+            {"title": "Broken", "author": "D"},
+        ]
+
+        covers = fetch_book_covers(books, deadline=1, session=self.session, api_url=self.api_url)
+
+        self.assertEqual(covers[("Fast", "A")], "http://covers/Fast.jpg")
+        self.assertIsNone(covers[("Missing", "C")])
+        self.assertNotIn(("Broken", "D"), covers)
+        self.assertNotIn(("Slow", "B"), covers)
+
+    def test_per_request_timeout(self):
+        covers = fetch_book_covers(
+            [{"title": "Slow", "author": "B"}],
+            timeout=0.5,
+            deadline=5,
+            session=self.session,
+            api_url=self.api_url,
+        )
+
+        self.assertEqual(covers, {})
+
+    def test_persistent_cache_skips_network_but_not_for_errors(self):
+        books = [
+            {"title": "Fast", "author": "A"},
+            {"title": "Missing", "author": "C"},
+            {"title": "Broken", "author": "D"},
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = CoverCache(os.path.join(tmp_dir, "covers.sqlite3"))
+
+            first = fetch_book_covers(books, session=self.session, api_url=self.api_url, cache=cache)
+            second = fetch_book_covers(books, session=self.session, api_url=self.api_url, cache=cache)
+
+        self.assertEqual(first, second)
+        # Only the failed lookup is retried; the confirmed miss is served from the cache.
+        self.assertEqual(_StubBooksHandler.requests, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
+import numpy as np
 import pandas as pd
-from src.books import normalize_books, validate_books
+from src.books import _parse_bool, normalize_books, parse_bool_column, validate_books
 
 class TestBookValidation(unittest.TestCase):
     def setUp(self):
@@ -50,6 +51,23 @@ class TestBookValidation(unittest.TestCase):
             validate_books(df)
         self.assertIn("outside 1-5 range", str(cm.exception))
 
+    def test_fractional_rating_is_rejected(self):
+        data = self.valid_data.copy()
+        data['difficulty'] = [2.5]
+        with self.assertRaises(ValueError) as cm:
+            validate_books(pd.DataFrame(data))
+        self.assertEqual(str(cm.exception), "Column 'difficulty' contains non-integer values")
+
+        data['difficulty'] = [3.0]
+        validate_books(pd.DataFrame(data))
+
+    def test_non_integer_id_is_rejected(self):
+        data = self.valid_data.copy()
+        data['id'] = ['B-1']
+        with self.assertRaises(ValueError) as cm:
+            validate_books(pd.DataFrame(data))
+        self.assertEqual(str(cm.exception), "Column 'id' contains non-integer book IDs")
+
     def test_duplicate_ids(self):
         data = {k: v * 2 for k, v in self.valid_data.items()} # Duplicate rows
         df = pd.DataFrame(data)
@@ -69,5 +87,39 @@ class TestBookValidation(unittest.TestCase):
         self.assertFalse(df.loc[0, 'is_intermediate'])
         self.assertFalse(df.loc[0, 'is_advanced'])
 
+    def test_parse_bool_column_matches_scalar_parser(self):
+        values = pd.Series([True, False, 'True', ' yes ', 'N', '', '0', '1', 1, 0, np.nan, None])
+
+        parsed = parse_bool_column(values)
+
+        self.assertEqual(parsed.dtype, bool)
+        self.assertEqual(parsed.tolist(), values.map(_parse_bool).tolist())
+
+    def test_normalize_books_reports_invalid_boolean_location(self):
+        data = {k: v * 3 for k, v in self.valid_data.items()}
+        data['is_intermediate'] = ['yes', 'no', 'maybe']
+
+        with self.assertRaises(ValueError) as cm:
+            normalize_books(pd.DataFrame(data))
+
+        self.assertEqual(
+            str(cm.exception),
+            "Invalid boolean value: maybe (column 'is_intermediate', row 2)",
+        )
+
+    def test_empty_frame_is_valid(self):
+        df = pd.DataFrame({col: pd.Series([], dtype=object) for col in self.valid_data})
+        # Should not raise
+        validate_books(df)
+        validate_books(normalize_books(df))
+
+    def test_non_boolean_level_column(self):
+        data = self.valid_data.copy()
+        data['is_advanced'] = ['False']
+        df = pd.DataFrame(data)
+        with self.assertRaises(ValueError) as cm:
+            validate_books(df)
+        self.assertIn("contains non-boolean values", str(cm.exception))
+
 if __name__ == '__main__':
     unittest.main()